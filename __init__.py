@@ -2,16 +2,47 @@
 爬虫模块 - 用于数据采集和存储到 Supabase
 统一架构，支持浏览器自动化和直接 API 调用两种模式
 """
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "2.0.0"
 
-# 导出主要类和函数
-from crawler.config.config import Config, SupabaseConfig, CrawlerConfig, CSQAQConfig
-from crawler.core.manager import CrawlerManager
-from crawler.core.base import BaseCrawler
-from crawler.core.browser_crawler import BrowserCrawler
-from crawler.core.api_crawler import APICrawler
-from crawler.database.supabase_client import SupabaseManager
+# 导出主要类和函数（按需导入，import crawler 时不加载 Playwright、Supabase 等较重的依赖）
+_EXPORTS = {
+    "Config": "crawler.config.config",
+    "SupabaseConfig": "crawler.config.config",
+    "CrawlerConfig": "crawler.config.config",
+    "CSQAQConfig": "crawler.config.config",
+    "CrawlerManager": "crawler.core.manager",
+    "BaseCrawler": "crawler.core.base",
+    "BrowserCrawler": "crawler.core.browser_crawler",
+    "APICrawler": "crawler.core.api_crawler",
+    "AsyncAPICrawler": "crawler.core.async_api_crawler",
+    "SupabaseManager": "crawler.database.supabase_client",
+}
+
+if TYPE_CHECKING:
+    from crawler.config.config import Config, SupabaseConfig, CrawlerConfig, CSQAQConfig
+    from crawler.core.manager import CrawlerManager
+    from crawler.core.base import BaseCrawler
+    from crawler.core.browser_crawler import BrowserCrawler
+    from crawler.core.api_crawler import APICrawler
+    from crawler.core.async_api_crawler import AsyncAPICrawler
+    from crawler.database.supabase_client import SupabaseManager
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "Config",
@@ -22,6 +53,7 @@ __all__ = [
     "BaseCrawler",
     "BrowserCrawler",
     "APICrawler",
+    "AsyncAPICrawler",
     "SupabaseManager",
 ]
 
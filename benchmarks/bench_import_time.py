@@ -0,0 +1,119 @@
+"""
+冷启动导入耗时测试
+在全新的解释器中导入爬虫模块（或创建爬虫），测量耗时并检查是否加载了不需要的重量级依赖，
+可以放进 CI 防止冷启动时间回退
+
+场景：
+1. import crawler：只导入顶层包
+2. API 爬虫：导入并创建 APICrawler（不应加载 Playwright、Supabase）
+3. 管理器：导入 CrawlerManager（不应加载 Playwright、Supabase）
+
+用法:
+    python3 -m crawler.benchmarks.bench_import_time [--rounds N] [--max-ms 毫秒]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# (场景名, 要执行的代码, 不应加载的模块)
+SCENARIOS: List[Tuple[str, str, Tuple[str, ...]]] = [
+    (
+        "import crawler",
+        "import crawler",
+        ("playwright", "supabase", "aiohttp", "httpx"),
+    ),
+    (
+        "创建 APICrawler",
+        "from crawler.config.config import Config, SupabaseConfig\n"
+        "from crawler.core.api_crawler import APICrawler\n"
+        "config = Config(supabase_config=SupabaseConfig(url='https://example.supabase.co', key='key'))\n"
+        "class BenchCrawler(APICrawler):\n"
+        "    def transform_data(self, raw_data):\n"
+        "        return raw_data\n"
+        "BenchCrawler(config, 'bench', 'bench', 'https://example.com/api')",
+        ("playwright", "supabase", "aiohttp"),
+    ),
+    (
+        "import CrawlerManager",
+        "from crawler.core.manager import CrawlerManager",
+        ("playwright", "supabase", "aiohttp"),
+    ),
+]
+
+_RUNNER = """
+import json, sys, time
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<bench>", "exec"))
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted({name.split(".")[0] for name in sys.modules})}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    """子进程环境：沿用当前的模块搜索路径，保证能导入 crawler 包"""
+    paths = [path or os.getcwd() for path in sys.path]
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(paths)}
+
+
+def measure(code: str, rounds: int) -> Tuple[List[float], set]:
+    """
+    在全新的解释器中执行代码
+
+    Returns:
+        (每次的耗时（毫秒）, 加载的顶层模块)
+    """
+    env = _child_env()
+    times = []
+    modules: set = set()
+    for _ in range(rounds):
+        output = subprocess.run(
+            [sys.executable, "-c", _RUNNER, code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["ms"])
+        modules.update(result["modules"])
+    return times, modules
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="冷启动导入耗时测试")
+    parser.add_argument("--rounds", type=int, default=5, help="每个场景的重复次数（取中位数）")
+    parser.add_argument("--max-ms", type=float, default=None, help="任一场景的中位数超过该值（毫秒）时返回非零退出码")
+    args = parser.parse_args()
+
+    print(f"每个场景在新的解释器中运行 {args.rounds} 次\n")
+    print(f"{'场景':<22}{'中位数 ms':>10}{'最小 ms':>10}  意外加载的模块")
+
+    failed = False
+    for name, code, forbidden in SCENARIOS:
+        try:
+            times, modules = measure(code, args.rounds)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<22}运行失败:\n{e.stderr}")
+            failed = True
+            continue
+
+        median = statistics.median(times)
+        loaded = sorted(set(forbidden) & modules)
+        print(f"{name:<22}{median:>10.1f}{min(times):>10.1f}  {', '.join(loaded) or '-'}")
+
+        if loaded or (args.max_ms is not None and median > args.max_ms):
+            failed = True
+
+    if failed:
+        print("\n❌ 冷启动检查未通过")
+        sys.exit(1)
+    print("\n✅ 冷启动检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+JSON 编解码器性能对比
+对比各编解码器在 CSQAQ 响应上的解码/编码吞吐量
+
+数据来源（按优先级）：
+1. 命令行传入的 JSON 文件（如 save_to_file 输出或保存下来的 API 响应）
+2. 响应缓存中记录的响应（需要先以 response_cache=True 运行过爬虫）
+3. 按箱子详情接口格式生成的模拟数据
+
+用法:
+    python3 -m crawler.benchmarks.bench_json_codec [文件 ...] [--rounds N]
+"""
+import argparse
+import os
+import random
+import time
+from typing import List, Tuple
+
+from crawler.config.config import CrawlerConfig
+from crawler.core.json_codec import ORJSON_AVAILABLE, get_codec
+from crawler.core.response_cache import DiskResponseCache
+
+_RARITIES = ["军规级", "受限", "保密", "隐秘", "非凡"]
+_WEAPONS = ["AK-47", "M4A1 消音型", "AWP", "沙漠之鹰", "格洛克 18 型", "USP 消音版"]
+
+
+def load_files(paths: List[str]) -> List[Tuple[str, bytes]]:
+    """读取 JSON 文件"""
+    payloads = []
+    for path in paths:
+        with open(path, "rb") as f:
+            payloads.append((os.path.basename(path), f.read()))
+    return payloads
+
+
+def load_cached_responses() -> List[Tuple[str, bytes]]:
+    """读取响应缓存中记录的 JSON 响应"""
+    config = CrawlerConfig()
+    if not os.path.exists(os.path.join(config.response_cache_dir, "responses.sqlite3")):
+        return []
+
+    cache = DiskResponseCache(config.response_cache_dir, ttl=None, max_bytes=config.response_cache_max_bytes)
+    try:
+        return [
+            (entry.url, entry.body)
+            for entry in cache.entries(include_expired=True)
+            if entry.status == 200 and "json" in entry.headers.get("Content-Type", "json")
+        ]
+    finally:
+        cache.close()
+
+
+def make_synthetic_payloads(count: int = 20, items: int = 500) -> List[Tuple[str, bytes]]:
+    """按箱子详情接口的响应格式生成模拟数据"""
+    rng = random.Random(0)
+    codec = get_codec("stdlib")
+    payloads = []
+    for box in range(count):
+        data = [
+            {
+                "id": rng.randint(1, 50000),
+                "short_name": f"{rng.choice(_WEAPONS)} | 模拟皮肤 {i}",
+                "rln": rng.choice(_RARITIES),
+                "img": f"https://csqaq.com/images/{box}/{i}.png",
+                "buff_sell_price": round(rng.uniform(0.1, 20000), 2),
+                "yyyp_sell_price": round(rng.uniform(0.1, 20000), 2),
+                "sell_num": rng.randint(0, 10000),
+                "rate": rng.random(),
+                "exterior": None,
+            }
+            for i in range(items)
+        ]
+        payloads.append((f"synthetic_{box}", codec.dumps({"code": 200, "msg": "Success", "data": data})))
+    return payloads
+
+
+def bench(codec_name: str, payloads: List[Tuple[str, bytes]], rounds: int) -> Tuple[float, float]:
+    """
+    测量编解码吞吐量
+
+    Returns:
+        (解码 MB/s, 编码 MB/s)
+    """
+    codec = get_codec(codec_name)
+    total_bytes = sum(len(body) for _, body in payloads) * rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decoded = [codec.loads(body) for _, body in payloads]
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for obj in decoded:
+            codec.dumps(obj, indent=True)
+    encode_time = time.perf_counter() - start
+
+    mb = total_bytes / 1024 / 1024
+    return mb / decode_time, mb / encode_time
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="JSON 编解码器性能对比")
+    parser.add_argument("files", nargs="*", help="JSON 文件（默认读取响应缓存，没有则使用模拟数据）")
+    parser.add_argument("--rounds", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    payloads = load_files(args.files) if args.files else load_cached_responses()
+    source = "文件" if args.files else "响应缓存"
+    if not payloads:
+        payloads = make_synthetic_payloads()
+        source = "模拟数据"
+
+    total = sum(len(body) for _, body in payloads)
+    print(f"数据来源: {source}，共 {len(payloads)} 个响应，{total / 1024 / 1024:.2f} MB，重复 {args.rounds} 次\n")
+
+    codec_names = ["stdlib"] + (["orjson"] if ORJSON_AVAILABLE else [])
+    if not ORJSON_AVAILABLE:
+        print("orjson 未安装，只测试标准库（安装方法: pip install orjson）\n")
+
+    results = {name: bench(name, payloads, args.rounds) for name in codec_names}
+
+    print(f"{'编解码器':<10}{'解码 MB/s':>12}{'编码 MB/s':>12}")
+    for name, (decode_speed, encode_speed) in results.items():
+        print(f"{name:<10}{decode_speed:>12.1f}{encode_speed:>12.1f}")
+
+    if "orjson" in results:
+        base_decode, base_encode = results["stdlib"]
+        decode_speed, encode_speed = results["orjson"]
+        print(f"\norjson 相对标准库: 解码 {decode_speed / base_decode:.1f}x，编码 {encode_speed / base_encode:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,54 @@
 核心爬虫模块
 包含基础爬虫类、API爬虫、浏览器爬虫和管理器
 """
-from crawler.core.base import BaseCrawler
-from crawler.core.api_crawler import APICrawler
-from crawler.core.browser_crawler import BrowserCrawler
-from crawler.core.manager import CrawlerManager
+import importlib
+from typing import TYPE_CHECKING
+
+# 按需导入，只使用 API 爬虫时不加载浏览器相关模块
+_EXPORTS = {
+    "BaseCrawler": "crawler.core.base",
+    "APICrawler": "crawler.core.api_crawler",
+    "AsyncAPICrawler": "crawler.core.async_api_crawler",
+    "BrowserCrawler": "crawler.core.browser_crawler",
+    "AsyncBrowserCrawler": "crawler.core.async_browser_crawler",
+    "CrawlerManager": "crawler.core.manager",
+    "CrawlerScheduler": "crawler.core.manager",
+    "JobQueue": "crawler.core.job_queue",
+    "SQLiteJobQueue": "crawler.core.job_queue",
+}
+
+if TYPE_CHECKING:
+    from crawler.core.base import BaseCrawler
+    from crawler.core.api_crawler import APICrawler
+    from crawler.core.async_api_crawler import AsyncAPICrawler
+    from crawler.core.browser_crawler import BrowserCrawler
+    from crawler.core.async_browser_crawler import AsyncBrowserCrawler
+    from crawler.core.manager import CrawlerManager, CrawlerScheduler
+    from crawler.core.job_queue import JobQueue, SQLiteJobQueue
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "BaseCrawler",
     "APICrawler",
+    "AsyncAPICrawler",
     "BrowserCrawler",
+    "AsyncBrowserCrawler",
     "CrawlerManager",
+    "CrawlerScheduler",
+    "JobQueue",
+    "SQLiteJobQueue",
 ]
 
@@ -2,11 +2,21 @@
 API 爬虫基类
 用于可以直接调用 API 的爬虫
 """
+import hashlib
+import threading
 import requests
-import time
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple, Callable
 
-from crawler.core.base import BaseCrawler
+from crawler.core.base import BaseCrawler, NOT_MODIFIED
+from crawler.core.retry import RetryPolicy
+from crawler.core.circuit_breaker import CircuitOpenError
+from crawler.core.session import create_session
+from crawler.core.validator_cache import ValidatorCache
+from crawler.core.response_cache import CachedResponse, make_request_key
+from crawler.core.json_stream import iter_json_items
+from crawler.core.pagination import Paginator, get_path
+from crawler.core.session_state import SessionState
 from crawler.config.config import Config
 
 
@@ -20,7 +30,8 @@ class APICrawler(BaseCrawler):
         target_table: str,
         api_url: str,
         unique_key: str = "qaq_id",
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        paginator: Optional[Paginator] = None
     ):
         """
         初始化 API 爬虫
@@ -32,29 +43,316 @@ class APICrawler(BaseCrawler):
             api_url: API 端点 URL
             unique_key: 唯一键字段名
             headers: 自定义请求头
+            paginator: 分页策略，设置后 fetch_data 逐页获取并流式返回数据
         """
         super().__init__(config, name, target_table, unique_key)
         self.api_url = api_url
+        self.paginator = paginator
+        
+        # 初始化 requests session（共享连接池，带限流和重试）
+        self.retry_policy = RetryPolicy.from_config(config.crawler)
+        self.session = create_session(
+            config,
+            headers=headers,
+            retry_policy=self.retry_policy,
+            rate_limiter=self.rate_limiter,
+            circuit_breaker=self.circuit_breaker,
+            proxy_pool=self.proxy_pool
+        )
+        
+        if self.proxy_pool:
+            self.logger.info(f"使用代理池: {len(self.proxy_pool)} 个代理")
+        
+        # 条件请求校验器缓存（ETag / Last-Modified）
+        self.validator_cache: Optional[ValidatorCache] = None
+        if config.crawler.conditional_requests:
+            self.validator_cache = ValidatorCache(config.crawler.validator_cache_path)
+        
+        # 从浏览器获取的会话状态（Cookie 和请求头），以及过期或被拒绝（401/403）时重新获取它的函数，
+        # 如 BrowserCrawler.harvest_session_state
+        self.session_state: Optional[SessionState] = None
+        self.session_state_provider: Optional[Callable[[], Optional[SessionState]]] = None
+        self._session_state_headers: List[str] = []
+        self._session_state_lock = threading.Lock()
+    
+    @property
+    def rate_limiter(self):
+        """限流器（替换时同步到会话）"""
+        return self._rate_limiter
+    
+    @rate_limiter.setter
+    def rate_limiter(self, limiter) -> None:
+        self._rate_limiter = limiter
+        if getattr(self, "session", None) is not None:
+            self.session.rate_limiter = limiter
+    
+    @property
+    def circuit_breaker(self):
+        """熔断器集合（替换时同步到会话）"""
+        return self._circuit_breaker
+    
+    @circuit_breaker.setter
+    def circuit_breaker(self, registry) -> None:
+        self._circuit_breaker = registry
+        if getattr(self, "session", None) is not None:
+            self.session.circuit_breaker = registry
+    
+    @property
+    def proxy_pool(self):
+        """代理池（替换时同步到会话）"""
+        return self._proxy_pool
+    
+    @proxy_pool.setter
+    def proxy_pool(self, pool) -> None:
+        self._proxy_pool = pool
+        if getattr(self, "session", None) is not None:
+            self.session.proxy_pool = pool
+    
+    @property
+    def target_url(self) -> Optional[str]:
+        return self.api_url
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        运行爬虫（每次运行重置重试预算，成功后提交条件请求校验器）
+        
+        数据没有全部保存成功时运行不算成功，校验器被丢弃，否则下次请求会得到 304 而不再获取和保存这些数据
+        
+        Returns:
+            运行结果字典
+        """
+        self.retry_policy.budget.reset()
+        result = super().run()
+        self.finish_validators(result["success"])
+        return result
+    
+    def finish_validators(self, success: bool, keys: Optional[Iterable[str]] = None) -> None:
+        """
+        运行结束时处理本次获取的校验器：成功则提交，失败则丢弃
+        
+        Args:
+            success: 本次运行是否成功
+            keys: 要提交的缓存键，None 表示全部
+        """
+        if not self.validator_cache:
+            return
+        if success:
+            self.validator_cache.commit(keys)
+        else:
+            self.validator_cache.discard()
+    
+    def apply_session_state(self, state: SessionState) -> None:
+        """
+        使用浏览器获取的会话状态：Cookie 写入会话，请求头替换上一次会话状态的请求头
+        
+        Args:
+            state: 会话状态
+        """
+        for name in self._session_state_headers:
+            self.session.headers.pop(name, None)
+        self.session.headers.update(state.headers)
+        self._session_state_headers = list(state.headers)
+        self.session.cookies.update(state.cookie_jar())
+        self.session_state = state
+        self.logger.info(f"使用浏览器会话状态: {len(state.cookies)} 个 Cookie, {len(state.headers)} 个请求头")
+    
+    def refresh_session_state(self, stale: Optional[SessionState] = None) -> bool:
+        """
+        通过 session_state_provider 重新获取会话状态（多个线程同时发现过期时只获取一次）
+        
+        Args:
+            stale: 调用方认为已失效的会话状态，当前会话状态已不是它且未过期时直接返回
+            
+        Returns:
+            是否有可用的会话状态
+        """
+        if not self.session_state_provider:
+            return False
+        with self._session_state_lock:
+            current = self.session_state
+            if current is not None and current is not stale and not current.is_expired():
+                return True
+            self.logger.info("从浏览器获取会话状态...")
+            state = self.session_state_provider()
+            if state is None:
+                self.logger.warning("未能从浏览器获取会话状态")
+                return False
+            self.apply_session_state(state)
+            return True
+    
+    def request(
+        self,
+        method: str = "GET",
+        url: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        conditional: bool = True
+    ) -> requests.Response:
+        """
+        发送请求（所有 API 请求的统一入口）
+        启用响应缓存时优先读取未过期的缓存；
+        启用条件请求时自动携带 If-None-Match / If-Modified-Since，
+        上游未变化时返回 304 响应
+        
+        Args:
+            method: HTTP 方法
+            url: 请求 URL，默认为 api_url
+            params: URL 参数
+            json_data: JSON 请求体
+            headers: 额外的请求头
+            stream: 是否流式读取响应体（流式响应不写入响应缓存）
+            conditional: 启用条件请求时是否携带校验器（分页请求不携带，避免 304 打断翻页）
+            
+        Returns:
+            响应对象
+        """
+        method = method.upper()
+        if method not in ("GET", "POST"):
+            raise ValueError(f"不支持的 HTTP 方法: {method}")
+        
+        url = url or self.api_url
+        headers = dict(headers or {})
+        
+        # 会话状态缺失或过期时先从浏览器获取（在查缓存之前，缓存键要包含当前的凭证）
+        state = self.session_state
+        if self.session_state_provider and (state is None or state.is_expired()):
+            self.refresh_session_state(state)
+            state = self.session_state
+        
+        response_key = None
+        if self.response_cache:
+            # 凭证不同的请求不共用缓存
+            response_key = make_request_key(
+                method, url, params, {"body": json_data, "headers": self._identity_headers(headers)}
+            )
+            cached = self.response_cache.get(response_key)
+            if cached:
+                self.logger.debug(f"命中响应缓存: {url}")
+                return cached.to_response()
+        
+        cache_key = None
+        if self.validator_cache and conditional:
+            cache_key = self.validator_cache.make_key(method, url, params, json_data)
+            headers.update(self.validator_cache.get_conditional_headers(cache_key))
+        
+        def send() -> requests.Response:
+            return self.session.request(
+                method,
+                url,
+                params=params,
+                json=json_data if method == "POST" else None,
+                headers=headers,
+                timeout=self.config.crawler.timeout,
+                stream=stream
+            )
+        
+        response = send()
+        
+        # 凭证被拒绝：从浏览器重新获取会话状态后重试一次
+        if response.status_code in (401, 403) and self.session_state_provider:
+            self.logger.warning(f"会话凭证被拒绝（{response.status_code}），从浏览器重新获取: {url}")
+            if self.refresh_session_state(state):
+                response.close()
+                response = send()
+        
+        if cache_key and response.status_code == 200:
+            self.validator_cache.remember(
+                cache_key,
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+        
+        if response_key and response.status_code == 200 and not stream and self._is_cacheable(response):
+            self.response_cache.set(response_key, CachedResponse.from_response(response))
+        
+        return response
+    
+    def _identity_headers(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        请求实际携带的请求头和 Cookie（包括 authorization、ApiToken 和浏览器会话状态等凭证），
+        用于生成响应缓存键和并发合并键
         
-        # 初始化 requests session
-        self.session = requests.Session()
-        
-        # 配置代理（如果提供）
-        if config.crawler.proxy:
-            self.session.proxies = {
-                "http": config.crawler.proxy,
-                "https": config.crawler.proxy
-            }
-            self.logger.info(f"使用代理: {config.crawler.proxy}")
-        
-        default_headers = {
-            "User-Agent": config.csqaq.user_agent,
-            "Accept": "application/json",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        }
-        if headers:
-            default_headers.update(headers)
-        self.session.headers.update(default_headers)
+        Args:
+            headers: 额外的请求头
+            
+        Returns:
+            请求头字典（Cookie 以字典形式放在 "Cookie" 键下）
+        """
+        return {**self.session.headers, **(headers or {}), "Cookie": self.session.cookies.get_dict()}
+    
+    def _is_cacheable(self, response: requests.Response) -> bool:
+        """响应体能解析为 JSON 且 is_cacheable_data 认可时才写入响应缓存"""
+        try:
+            data = self.json_codec.loads(response.content)
+        except Exception:
+            return False
+        return self.is_cacheable_data(data)
+    
+    def is_cacheable_data(self, data: Any) -> bool:
+        """
+        判断响应数据是否可以写入响应缓存（子类可重写）
+        默认拒绝无法提取数据列表的响应，以及带错误码的响应（{"code": ...} 不为 200）
+        
+        Args:
+            data: 解析后的响应数据
+            
+        Returns:
+            是否可以缓存
+        """
+        if isinstance(data, dict) and "code" in data and data["code"] != 200:
+            return False
+        return self.extract_items(data) is not None
+    
+    def request_json(
+        self,
+        method: str = "GET",
+        url: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """
+        发送请求并解析 JSON
+        相同请求（含请求头和条件请求校验器）并发时只发一次，所有调用方共享同一个解析结果（不要修改它）
+        
+        Args:
+            method: HTTP 方法
+            url: 请求 URL，默认为 api_url
+            params: URL 参数
+            json_data: JSON 请求体
+            headers: 额外的请求头
+            
+        Returns:
+            解析后的响应；上游未变化（304）时返回 NOT_MODIFIED
+            
+        Raises:
+            requests.RequestException: 请求失败或返回错误状态码
+        """
+        def call():
+            response = self.request(method, url, params=params, json_data=json_data, headers=headers)
+            if response.status_code == 304:
+                return NOT_MODIFIED
+            response.raise_for_status()
+            return self.json_codec.loads(response.content)
+        
+        if not self.single_flight:
+            return call()
+        
+        url = url or self.api_url
+        key_headers = self._identity_headers(headers)
+        if self.validator_cache:
+            # 携带的校验器不同，响应（200 / 304）也可能不同
+            key_headers.update(self.validator_cache.get_conditional_headers(
+                self.validator_cache.make_key(method, url, params, json_data)
+            ))
+        key = make_request_key(method, url, params, {"body": json_data, "headers": key_headers})
+        data, shared = self.single_flight.do(key, call)
+        if shared:
+            self.logger.debug(f"合并并发请求: {url} {params or ''}")
+        return data
     
     def fetch_data(
         self,
@@ -73,55 +371,137 @@ class APICrawler(BaseCrawler):
             authorization: 授权 token
             
         Returns:
-            API 返回的数据列表
+            API 返回的数据列表；启用 stream_json 或设置了分页策略时为逐条返回的迭代器；
+            上游未变化（304）时返回 NOT_MODIFIED
         """
         headers = {}
         if authorization:
             headers["authorization"] = authorization
         
+        if self.paginator:
+            return self.fetch_pages(self.paginator, method, params=params, json_data=json_data, headers=headers)
+        
         try:
-            time.sleep(self.config.crawler.delay)
+            if self.config.crawler.stream_json:
+                response = self.request(method, params=params, json_data=json_data, headers=headers, stream=True)
+                if response.status_code == 304:
+                    self.logger.info(f"数据未变化（304）: {self.api_url}")
+                    return NOT_MODIFIED
+                response.raise_for_status()
+                return iter_json_items(response.iter_content(self.config.crawler.stream_chunk_size))
             
-            if method.upper() == "GET":
-                response = self.session.get(
-                    self.api_url,
-                    params=params,
-                    headers=headers,
-                    timeout=self.config.crawler.timeout
-                )
-            elif method.upper() == "POST":
-                response = self.session.post(
-                    self.api_url,
-                    params=params,
-                    json=json_data,
-                    headers=headers,
-                    timeout=self.config.crawler.timeout
-                )
-            else:
-                raise ValueError(f"不支持的 HTTP 方法: {method}")
-            
-            response.raise_for_status()
-            data = response.json()
+            data = self.request_json(method, params=params, json_data=json_data, headers=headers)
+            if data is NOT_MODIFIED:
+                self.logger.info(f"数据未变化（304）: {self.api_url}")
+                return NOT_MODIFIED
             
-            # 处理不同的响应格式
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict):
-                # 尝试常见的字段名
-                for key in ['data', 'list', 'items', 'results']:
-                    if key in data and isinstance(data[key], list):
-                        return data[key]
-                # 如果整个字典就是一条数据
-                return [data]
+            return self.extract_items(data)
             
+        except CircuitOpenError as e:
+            self.logger.warning(f"跳过请求: {e}")
             return None
-            
         except requests.RequestException as e:
             self.logger.error(f"API 请求失败: {e}")
             return None
         except Exception as e:
             self.logger.error(f"获取数据失败: {e}")
             return None
-
-
-
+    
+    def fetch_pages(
+        self,
+        paginator: Optional[Paginator] = None,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        item_key: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐页获取数据并逐条返回
+        处理当前页的同时在后台线程预取下一页；某一页没有新数据（空页或全部重复）时停止翻页。
+        请求失败时抛出异常（由 BaseCrawler.run 记录为运行失败）。
+        
+        Args:
+            paginator: 分页策略，默认使用构造时传入的 paginator
+            method: HTTP 方法
+            params: 每页都携带的 URL 参数
+            json_data: 每页都携带的 JSON 请求体
+            headers: 额外的请求头
+            item_key: 用于去重的数据项字段，None 表示按整条数据内容去重
+            
+        Yields:
+            数据项
+        """
+        paginator = paginator or self.paginator
+        if paginator is None:
+            raise ValueError("未设置分页策略")
+        method = method.upper()
+        
+        seen = set()
+        page_count = 0
+        page_args = paginator.first_page()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.name}-prefetch")
+        try:
+            future = executor.submit(self._fetch_page, method, page_args, params, json_data, headers, paginator.items_path)
+            while future is not None:
+                data, items = future.result()
+                page_count += 1
+                
+                # 先发出下一页的请求，再处理当前页
+                next_args = None
+                if paginator.max_pages is None or page_count < paginator.max_pages:
+                    next_args = paginator.next_page(page_args, data, items)
+                future = None
+                if next_args is not None:
+                    future = executor.submit(
+                        self._fetch_page, method, next_args, params, json_data, headers, paginator.items_path
+                    )
+                
+                new_items = []
+                for item in items:
+                    key = self._item_identity(item, item_key)
+                    if key not in seen:
+                        seen.add(key)
+                        new_items.append(item)
+                self.logger.info(f"第 {page_count} 页: {len(items)} 条数据, 新数据 {len(new_items)} 条")
+                if not new_items:
+                    self.logger.info("本页没有新数据，停止翻页")
+                    break
+                
+                yield from new_items
+                page_args = next_args
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _fetch_page(
+        self,
+        method: str,
+        page_args: Dict[str, Any],
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+        items_path: Optional[str]
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        获取一页数据（在预取线程中执行）
+        
+        Returns:
+            (解析后的响应, 数据列表)
+        """
+        if method == "GET":
+            params = {**(params or {}), **page_args}
+        else:
+            json_data = {**(json_data or {}), **page_args}
+        
+        response = self.request(method, params=params, json_data=json_data, headers=headers, conditional=False)
+        response.raise_for_status()
+        data = self.json_codec.loads(response.content)
+        
+        items = get_path(data, items_path) if items_path else self.extract_items(data)
+        return data, items if isinstance(items, list) else []
+    
+    def _item_identity(self, item: Any, item_key: Optional[str]) -> Any:
+        """数据项的去重标识"""
+        if item_key and isinstance(item, dict) and item.get(item_key) is not None:
+            return item[item_key]
+        return hashlib.sha1(self.json_codec.dumps(item, sort_keys=True)).digest()
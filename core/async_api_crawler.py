@@ -0,0 +1,273 @@
+"""
+异步 API 爬虫基类
+基于 asyncio + aiohttp，支持有界并发的批量请求
+"""
+import asyncio
+import time
+from typing import Optional, Dict, Any, List
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from crawler.core.base import BaseCrawler
+from crawler.core.retry import RetryPolicy, CONNECTION
+from crawler.core.circuit_breaker import CircuitOpenError
+from crawler.core.response_cache import make_request_key
+from crawler.config.config import Config
+
+
+class AsyncAPICrawler(BaseCrawler):
+    """
+    异步 API 爬虫基类
+
+    与 APICrawler 接口一致，但 fetch_data 为协程；
+    transform_data / validate_data / save_to_database 沿用 BaseCrawler 的约定，
+    已有的 APICrawler 子类只需改为继承本类即可迁移。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        name: str,
+        target_table: str,
+        api_url: str,
+        unique_key: str = "qaq_id",
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        初始化异步 API 爬虫
+
+        Args:
+            config: 全局配置对象
+            name: 爬虫名称
+            target_table: 目标数据库表名
+            api_url: API 端点 URL
+            unique_key: 唯一键字段名
+            headers: 自定义请求头
+        """
+        super().__init__(config, name, target_table, unique_key)
+        self.api_url = api_url
+
+        self.headers = {
+            "User-Agent": config.csqaq.user_agent,
+            "Accept": "application/json",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        }
+        if headers:
+            self.headers.update(headers)
+
+        self.retry_policy = RetryPolicy.from_config(config.crawler)
+        
+        # 会话和并发信号量在事件循环内惰性创建
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        if not AIOHTTP_AVAILABLE:
+            self.logger.warning("aiohttp 未安装，异步爬虫将无法工作")
+            self.logger.warning("安装方法: pip install aiohttp")
+
+    @property
+    def target_url(self) -> Optional[str]:
+        return self.api_url
+
+    async def get_session(self) -> "aiohttp.ClientSession":
+        """
+        获取（必要时创建）连接池化的 aiohttp 会话
+
+        Returns:
+            aiohttp 会话
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.crawler.max_concurrency,
+                limit_per_host=self.config.crawler.pool_maxsize,
+                force_close=not self.config.crawler.keep_alive
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.config.crawler.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.config.crawler.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        """关闭会话，释放连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+    async def fetch_data(
+        self,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        authorization: Optional[str] = None,
+        url: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        异步获取数据（受 max_concurrency 限制，相同请求并发时共享一次网络调用）
+
+        Args:
+            method: HTTP 方法
+            params: URL 参数
+            json_data: JSON 请求体
+            authorization: 授权 token
+            url: 请求 URL，默认为 api_url
+
+        Returns:
+            API 返回的数据列表
+        """
+        if not AIOHTTP_AVAILABLE:
+            self.logger.error("aiohttp 未安装，无法发起异步请求")
+            return None
+
+        if method.upper() not in ("GET", "POST"):
+            raise ValueError(f"不支持的 HTTP 方法: {method}")
+
+        headers = {}
+        if authorization:
+            headers["authorization"] = authorization
+
+        url = url or self.api_url
+
+        try:
+            if self.single_flight:
+                key = make_request_key(method, url, params, {"body": json_data, "headers": {**self.headers, **headers}})
+                data, shared = await self.single_flight.do_async(
+                    key, lambda: self._request_json(method, url, params, json_data, headers)
+                )
+                if shared:
+                    self.logger.debug(f"合并并发请求: {url}")
+            else:
+                data = await self._request_json(method, url, params, json_data, headers)
+            return self.extract_items(data)
+
+        except CircuitOpenError as e:
+            self.logger.warning(f"跳过请求: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"API 请求失败: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"获取数据失败: {e}")
+            return None
+
+    async def _request_json(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        headers: Dict[str, str]
+    ) -> Any:
+        """
+        发送请求并解析 JSON（带熔断、代理轮换、限流和重试），失败时抛出异常
+
+        Returns:
+            解析后的响应
+        """
+        session = await self.get_session()
+        attempt = 0
+        while True:
+            if self.circuit_breaker:
+                self.circuit_breaker.before_request(url)
+            proxy = self.proxy_pool.choose() if self.proxy_pool else None
+            await self.rate_limiter.acquire_async(url, proxy)
+            try:
+                async with self._semaphore:
+                    start = time.monotonic()
+                    async with session.request(
+                        method.upper(),
+                        url,
+                        params=params,
+                        json=json_data if method.upper() == "POST" else None,
+                        headers=headers,
+                        proxy=proxy
+                    ) as response:
+                        if proxy:
+                            self.proxy_pool.report(proxy, response.status != 407, time.monotonic() - start)
+                        if self.circuit_breaker and response.status != 429:
+                            self.circuit_breaker.record(url, response.status < 500)
+                        reason = self.retry_policy.classify_status(response.status)
+                        delay = None
+                        if reason is not None:
+                            delay = self.retry_policy.get_delay(attempt, response.headers.get("Retry-After"))
+                        if delay is None or not self.retry_policy.should_retry(reason, attempt):
+                            response.raise_for_status()
+                            return self.json_codec.loads(await response.read())
+                        self.logger.warning(f"请求返回 {response.status}（{reason}），{delay:.2f}s 后重试 "
+                                            f"[{attempt + 1}/{self.retry_policy.max_retries}]: {url}")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if proxy:
+                    self.proxy_pool.report(proxy, False)
+                if self.circuit_breaker:
+                    self.circuit_breaker.record(url, False)
+                reason = CONNECTION if isinstance(e, aiohttp.ClientConnectionError) else self.retry_policy.classify_exception(e)
+                if not self.retry_policy.should_retry(reason, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                self.logger.warning(f"请求失败（{reason}），{delay:.2f}s 后重试 "
+                                    f"[{attempt + 1}/{self.retry_policy.max_retries}]: {e}")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch_many(
+        self,
+        requests: List[Dict[str, Any]]
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        并发执行多个请求（并发数受 max_concurrency 限制）
+
+        Args:
+            requests: 请求参数列表，每项为传给 fetch_data 的关键字参数
+
+        Returns:
+            与 requests 顺序一致的结果列表
+        """
+        return list(await asyncio.gather(
+            *(self.fetch_data(**kwargs) for kwargs in requests)
+        ))
+
+    async def run_async(self, **fetch_kwargs) -> Dict[str, Any]:
+        """
+        异步运行爬虫（主流程）
+        数据库和文件保存为阻塞操作，放到线程中执行
+
+        Args:
+            **fetch_kwargs: 传递给 fetch_data 的参数
+
+        Returns:
+            运行结果字典
+        """
+        self.logger.info(f"开始运行爬虫: {self.name}")
+        self.retry_policy.budget.reset()
+        await asyncio.to_thread(self.begin_sync)
+
+        try:
+            raw_data = await self.fetch_data(**fetch_kwargs)
+        except Exception as e:
+            result = self._new_result()
+            result["error"] = str(e)
+            self.logger.error(f"爬虫运行失败: {self.name}, 错误: {e}", exc_info=True)
+        else:
+            result = await asyncio.to_thread(self.process, raw_data)
+        finally:
+            await self.close()
+
+        await asyncio.to_thread(self.finish_sync, result)
+        return result
+
+    def run(self, **fetch_kwargs) -> Dict[str, Any]:
+        """
+        同步入口（供 CrawlerManager 调用）
+
+        Returns:
+            运行结果字典
+        """
+        return asyncio.run(self.run_async(**fetch_kwargs))
@@ -0,0 +1,331 @@
+"""
+异步浏览器爬虫基类
+基于 Playwright 异步 API，在一个浏览器的多个上下文中并发打开大量页面拦截 API，
+适用于商品详情页这类成千上万个页面的场景
+"""
+import asyncio
+import importlib.util
+import queue
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, AsyncIterator, Iterable, Iterator
+
+# Playwright 导入较慢，只检查是否安装，使用时再导入
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+
+from crawler.core.base import BaseCrawler
+from crawler.core.circuit_breaker import CircuitOpenError
+from crawler.core.proxy_pool import to_playwright_proxy, with_per_context_proxy
+from crawler.core.route_blocker import RouteBlocker, RouteStats
+from crawler.config.config import Config
+
+_DONE = object()
+
+
+@dataclass
+class PageResult:
+    """单个页面的拦截结果"""
+    url: str
+    data: Any = None  # 解析后的 API 响应，失败时为 None
+    error: Optional[str] = None
+    proxy: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # navigate / wait_response / total（秒）
+    route_stats: Optional[RouteStats] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncBrowserCrawler(BaseCrawler):
+    """
+    异步浏览器爬虫基类
+
+    启动一个浏览器，创建 browser_contexts 个上下文（每个上下文从代理池取一个代理），
+    由 browser_concurrency 个协程轮流分配到这些上下文中并发打开页面；
+    每个页面拦截到匹配 api_pattern 的响应即关闭，结果按完成顺序返回。
+    子类通常重写 get_page_urls()（如根据商品 ID 生成 page_goods 页面列表）和 transform_data()。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        name: str,
+        target_table: str,
+        api_pattern: str,
+        page_urls: Optional[List[str]] = None,
+        unique_key: str = "qaq_id",
+        concurrency: Optional[int] = None,
+        contexts: Optional[int] = None
+    ):
+        """
+        初始化异步浏览器爬虫
+
+        Args:
+            config: 全局配置对象
+            name: 爬虫名称
+            target_table: 目标数据库表名
+            api_pattern: 要拦截的 API URL 模式（用于匹配）
+            page_urls: 要访问的页面 URL 列表
+            unique_key: 唯一键字段名
+            concurrency: 同时打开的页面数，None 使用配置中的 browser_concurrency
+            contexts: 浏览器上下文数，None 使用配置中的 browser_contexts
+        """
+        super().__init__(config, name, target_table, unique_key)
+        self.api_pattern = api_pattern
+        self.page_urls = list(page_urls or [])
+        self.concurrency = max(1, concurrency or config.crawler.browser_concurrency)
+        self.contexts = max(1, contexts or config.crawler.browser_contexts)
+        self.route_blocker = RouteBlocker.from_config(config.crawler)
+
+        if not PLAYWRIGHT_AVAILABLE:
+            self.logger.warning("Playwright 未安装，浏览器爬虫将无法工作")
+            self.logger.warning("安装方法: pip install playwright && playwright install chromium")
+
+    @property
+    def target_url(self) -> Optional[str]:
+        return self.page_urls[0] if self.page_urls else None
+
+    def get_page_urls(self) -> List[str]:
+        """
+        获取要访问的页面 URL 列表（子类可重写）
+
+        Returns:
+            页面 URL 列表
+        """
+        return self.page_urls
+
+    async def intercept_many(self, page_urls: Iterable[str]) -> AsyncIterator[PageResult]:
+        """
+        并发打开多个页面并拦截 API 响应，按完成顺序逐个返回结果
+
+        Args:
+            page_urls: 页面 URL 列表
+
+        Yields:
+            页面拦截结果（失败的页面 ok 为 False）
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            self.logger.error("Playwright 未安装，无法使用浏览器自动化")
+            return
+
+        urls = list(page_urls)
+        if not urls:
+            return
+        concurrency = min(self.concurrency, len(urls))
+        context_count = min(self.contexts, concurrency)
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for url in urls:
+            pending.put_nowait(url)
+        results: asyncio.Queue = asyncio.Queue()
+
+        launch_options: Dict[str, Any] = {"headless": self.config.crawler.headless}
+        if self.proxy_pool:
+            with_per_context_proxy(launch_options)
+
+        self.logger.info(f"并发拦截 {len(urls)} 个页面（{concurrency} 个页面 / {context_count} 个上下文）")
+
+        from playwright.async_api import async_playwright
+        
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(**launch_options)
+            try:
+                contexts = []
+                for _ in range(context_count):
+                    proxy = self.proxy_pool.choose() if self.proxy_pool else None
+                    context_options = {
+                        "user_agent": self.config.csqaq.user_agent,
+                        **self.route_blocker.context_options()
+                    }
+                    if proxy:
+                        context_options["proxy"] = to_playwright_proxy(proxy)
+                    contexts.append((await browser.new_context(**context_options), proxy))
+
+                async def worker(context, proxy):
+                    while True:
+                        try:
+                            url = pending.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        await results.put(await self._intercept_page(context, proxy, url))
+
+                workers = [
+                    asyncio.create_task(worker(*contexts[i % context_count]))
+                    for i in range(concurrency)
+                ]
+                try:
+                    for _ in range(len(urls)):
+                        yield await results.get()
+                finally:
+                    # 调用方提前停止迭代时取消剩余页面
+                    for task in workers:
+                        task.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+            finally:
+                await browser.close()
+
+    async def _intercept_page(self, context: Any, proxy: Optional[str], url: str) -> PageResult:
+        """
+        在上下文中打开一个页面，拦截到并解析成功匹配的响应后立即关闭页面
+
+        Args:
+            context: 浏览器上下文
+            proxy: 上下文使用的代理
+            url: 页面 URL
+
+        Returns:
+            页面拦截结果
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        
+        result = PageResult(url=url, proxy=proxy)
+        timeout = self.config.crawler.browser_timeout / 1000
+        pattern = self.api_pattern.lower()
+        loop = asyncio.get_running_loop()
+        captured: asyncio.Future = loop.create_future()
+
+        async def handle_response(response):
+            if captured.done() or response.status != 200 or pattern not in response.url.lower():
+                return
+            try:
+                body = await response.body()
+                data = self.json_codec.loads(body)
+            except Exception as e:
+                self.logger.warning(f"解析响应 JSON 失败: {response.url}: {e}")
+                return
+            if not captured.done():
+                captured.set_result(data)
+
+        page = None
+        admitted = False  # 是否已通过熔断检查（之后的结果都要记入熔断器）
+        start = time.monotonic()
+        try:
+            if self.circuit_breaker:
+                self.circuit_breaker.before_request(url)
+                admitted = True
+            await self.rate_limiter.acquire_async(url, proxy)
+
+            page = await context.new_page()
+            result.route_stats = await self.route_blocker.install_async(page, self.api_pattern)
+            page.on("response", handle_response)
+
+            nav_start = time.monotonic()
+            deadline = nav_start + timeout
+            try:
+                await page.goto(url, wait_until="commit", timeout=timeout * 1000)
+                if proxy:
+                    self.proxy_pool.report(proxy, True, time.monotonic() - nav_start)
+            except PlaywrightTimeoutError:
+                if proxy and not captured.done():
+                    self.proxy_pool.report(proxy, False)
+            nav_end = time.monotonic()
+            result.timings["navigate"] = nav_end - nav_start
+
+            result.data = await asyncio.wait_for(captured, max(deadline - time.monotonic(), 0.001))
+            result.timings["wait_response"] = time.monotonic() - nav_end
+        except asyncio.TimeoutError:
+            result.error = f"{timeout:.1f}s 内未能拦截到 API 响应"
+        except CircuitOpenError as e:
+            result.error = str(e)
+        except Exception as e:
+            result.error = f"访问页面时出错: {e}"
+            if proxy:
+                self.proxy_pool.report(proxy, False)
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            result.timings["total"] = time.monotonic() - start
+
+        # 与 AsyncAPICrawler 一致：放行的请求都要记录结果，否则失败不会触发熔断，半开状态也无法恢复
+        if admitted:
+            self.circuit_breaker.record(url, result.ok)
+
+        if result.ok:
+            self.logger.info(f"✅ 拦截成功: {url} ({result.timings['total']:.2f}s)")
+        else:
+            self.logger.warning(f"拦截失败: {url}: {result.error}")
+        return result
+
+    async def fetch_data(self, page_urls: Optional[Iterable[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        拦截所有页面并合并数据列表
+
+        Args:
+            page_urls: 页面 URL 列表，默认为 get_page_urls()
+
+        Returns:
+            所有页面的数据列表，全部失败返回 None
+        """
+        items: List[Dict[str, Any]] = []
+        async for page_result in self.intercept_many(page_urls if page_urls is not None else self.get_page_urls()):
+            if page_result.ok:
+                items.extend(self.extract_items(page_result.data) or [])
+        return items or None
+
+    async def run_async(self, page_urls: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        异步运行爬虫（主流程）
+
+        拦截到的数据逐条送入 BaseCrawler 的流式处理（在线程中执行），
+        先完成的页面先转换、保存，不等待所有页面结束
+
+        Args:
+            page_urls: 页面 URL 列表，默认为 get_page_urls()
+
+        Returns:
+            运行结果字典（额外包含 page_count 和 page_failed）
+        """
+        self.logger.info(f"开始运行爬虫: {self.name}")
+        await asyncio.to_thread(self.begin_sync)
+        urls = list(page_urls if page_urls is not None else self.get_page_urls())
+
+        items: "queue.Queue[Any]" = queue.Queue()
+
+        def iter_items() -> Iterator[Dict[str, Any]]:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    return
+                yield item
+
+        processing = asyncio.ensure_future(asyncio.to_thread(self.process, iter_items()))
+        page_failed = 0
+        error = None
+        try:
+            async for page_result in self.intercept_many(urls):
+                if not page_result.ok:
+                    page_failed += 1
+                    continue
+                for item in self.extract_items(page_result.data) or []:
+                    items.put(item)
+        except Exception as e:
+            error = str(e)
+            self.logger.error(f"浏览器自动化失败: {e}", exc_info=True)
+        finally:
+            items.put(_DONE)
+            result = await processing
+
+        result["page_count"] = len(urls)
+        result["page_failed"] = page_failed
+        if error:
+            result["success"] = False
+            result["error"] = error
+        elif page_failed:
+            # 有页面没有拦截到数据：本次同步不完整，不推进 last_sync_time
+            result["success"] = False
+            result["error"] = result["error"] or f"{page_failed}/{len(urls)} 个页面拦截失败"
+        await asyncio.to_thread(self.finish_sync, result)
+        return result
+
+    def run(self, page_urls: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        同步入口（供 CrawlerManager 调用）
+
+        Returns:
+            运行结果字典
+        """
+        return asyncio.run(self.run_async(page_urls))
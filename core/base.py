@@ -3,13 +3,33 @@
 定义所有爬虫的通用接口和功能
 """
 import logging
-import json
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterator, Iterable
+from datetime import datetime, timezone
 
 from crawler.database.supabase_client import SupabaseManager
+from crawler.database.models import DataSource
 from crawler.config.config import Config
+from crawler.core.rate_limiter import RateLimiter
+from crawler.core.circuit_breaker import CircuitBreakerRegistry
+from crawler.core.proxy_pool import ProxyPool
+from crawler.core.singleflight import SingleFlight
+from crawler.core.response_cache import ResponseCache
+from crawler.core.json_stream import JSONArrayWriter
+from crawler.core.json_codec import JSONCodec, get_codec
+from crawler.core.fingerprint import FingerprintStore
+
+
+class _NotModified:
+    """上游数据未变化（HTTP 304）时 fetch_data 的返回值"""
+    
+    def __repr__(self) -> str:
+        return "NOT_MODIFIED"
+
+
+NOT_MODIFIED = _NotModified()
 
 
 class BaseCrawler(ABC):
@@ -39,16 +59,66 @@ class BaseCrawler(ABC):
         # 设置日志（必须在其他操作之前）
         self.logger = logging.getLogger(f"Crawler.{name}")
         
-        # 初始化 Supabase 客户端
-        self.supabase: Optional[SupabaseManager] = None
-        if config.supabase:
-            try:
-                self.supabase = SupabaseManager(
-                    url=config.supabase.url,
-                    key=config.supabase.key
-                )
-            except Exception as e:
-                self.logger.warning(f"Supabase 初始化失败: {e}")
+        # 按主机限流（注册到 CrawlerManager 后替换为管理器共享的限流器）
+        self.rate_limiter = RateLimiter.from_config(config.crawler)
+        
+        # 按主机熔断（未启用时为 None；注册到 CrawlerManager 后替换为共享的熔断器集合）
+        self.circuit_breaker: Optional[CircuitBreakerRegistry] = CircuitBreakerRegistry.from_config(config.crawler)
+        
+        # 代理池（未配置代理时为 None；注册到 CrawlerManager 后替换为共享的代理池）
+        self.proxy_pool: Optional[ProxyPool] = ProxyPool.from_config(config.crawler)
+        
+        # 并发请求合并（注册到 CrawlerManager 后替换为共享实例，跨爬虫合并）
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if config.crawler.single_flight else None
+        
+        # JSON 编解码器（响应解析和文件输出共用）
+        self.json_codec: JSONCodec = get_codec(config.crawler.json_codec)
+        
+        # 磁盘响应缓存（未启用时为 None）
+        self.response_cache: Optional[ResponseCache] = ResponseCache.from_config(config.crawler)
+        
+        # 原始数据指纹（未启用 skip_unchanged 时为 None）
+        self.fingerprint_store: Optional[FingerprintStore] = FingerprintStore.from_config(config.crawler)
+        
+        # 依赖的爬虫名称（CrawlerManager.run_all 在这些爬虫成功后才运行本爬虫）
+        self.depends_on: List[str] = []
+        
+        # 同步状态（data_sources 表中的记录名称和本次运行开始时读取的上次状态）
+        self.sync_source_name = name
+        self.last_sync: Optional[DataSource] = None
+        self._sync_started_at: Optional[datetime] = None
+        
+        # Supabase 客户端在第一次使用时创建（见 supabase 属性）
+        self._supabase: Optional[SupabaseManager] = None
+        self._supabase_initialized = False
+        self._supabase_lock = threading.Lock()
+    
+    @property
+    def supabase(self) -> Optional[SupabaseManager]:
+        """Supabase 客户端（第一次访问时创建，未配置或初始化失败时为 None）"""
+        if not self._supabase_initialized:
+            with self._supabase_lock:
+                if not self._supabase_initialized:
+                    if self.config.supabase:
+                        try:
+                            self._supabase = SupabaseManager(
+                                url=self.config.supabase.url,
+                                key=self.config.supabase.key
+                            )
+                        except Exception as e:
+                            self.logger.warning(f"Supabase 初始化失败: {e}")
+                    self._supabase_initialized = True
+        return self._supabase
+    
+    @supabase.setter
+    def supabase(self, client: Optional[SupabaseManager]) -> None:
+        self._supabase = client
+        self._supabase_initialized = True
+    
+    @property
+    def target_url(self) -> Optional[str]:
+        """上游 URL（CrawlerManager 运行前据此检查熔断状态），None 表示不检查"""
+        return None
     
     @abstractmethod
     def fetch_data(self) -> Optional[List[Dict[str, Any]]]:
@@ -172,8 +242,8 @@ class BaseCrawler(ABC):
         if filename is None:
             filename = f"{self.name}_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(filename, "wb") as f:
+            f.write(self.json_codec.dumps(data, indent=True))
         
         self.logger.info(f"数据已保存到文件: {filename}")
         return filename
@@ -186,54 +256,329 @@ class BaseCrawler(ABC):
             运行结果字典
         """
         self.logger.info(f"开始运行爬虫: {self.name}")
+        self.begin_sync()
         
-        result = {
-            "crawler_name": self.name,
-            "success": False,
-            "data_count": 0,
-            "saved_count": 0,
-            "error": None
-        }
+        result = self._new_result()
         
         try:
             # 1. 获取数据
             raw_data = self.fetch_data()
             if not raw_data:
                 result["error"] = "未能获取数据"
-                return result
+            else:
+                self._process(raw_data, result)
             
-            # 2. 转换数据
-            transformed_data = self.transform_data(raw_data)
-            if not transformed_data:
-                result["error"] = "数据转换后为空"
-                return result
+        except Exception as e:
+            result["error"] = str(e)
+            self.logger.error(f"爬虫运行失败: {self.name}, 错误: {e}", exc_info=True)
+        
+        self.finish_fingerprints(result["success"])
+        self.finish_sync(result)
+        return result
+    
+    @property
+    def sync_enabled(self) -> bool:
+        """是否在 data_sources 表记录同步状态"""
+        return self.config.crawler.sync_state and self.config.crawler.save_to_db and self.supabase is not None
+    
+    @property
+    def last_sync_time(self) -> Optional[datetime]:
+        """上次成功同步的开始时间（由 begin_sync 读取；未记录同步状态或从未成功时为 None）"""
+        return self.last_sync.last_sync_time if self.last_sync else None
+    
+    def begin_sync(self) -> Optional[DataSource]:
+        """
+        运行开始时读取上次同步状态，并把数据源标记为 syncing
+        写入失败只记录警告，不影响运行
+        
+        Returns:
+            上次的同步状态，未启用或不存在时为 None
+        """
+        self.last_sync = None
+        self._sync_started_at = None
+        if not self.sync_enabled:
+            return None
+        
+        self._sync_started_at = datetime.now(timezone.utc)
+        try:
+            self.last_sync = self.supabase.get_data_source(self.sync_source_name)
+            self.supabase.upsert_data_source(
+                self.sync_source_name,
+                api_endpoint=self.target_url,
+                sync_status="syncing",
+                error_message=None
+            )
+        except Exception as e:
+            self.logger.warning(f"记录同步状态失败: {e}")
+        
+        if self.last_sync_time:
+            self.logger.info(f"上次成功同步: {self.last_sync_time.isoformat()}")
+        return self.last_sync
+    
+    def finish_sync(self, result: Dict[str, Any]) -> None:
+        """
+        运行结束时记录同步结果
+        成功时 last_sync_time 记为本次运行的开始时间（运行期间发生的变化在下次增量运行中获取），total_synced 加 1；
+        数据库保存有失败（db_stats["failed"] > 0）时即使 success 为 True 也记为失败
+        
+        Args:
+            result: 运行结果字典
+        """
+        if self._sync_started_at is None:
+            return
+        
+        db_failed = (result.get("db_stats") or {}).get("failed", 0)
+        success = bool(result.get("success")) and not db_failed
+        fields: Dict[str, Any] = {
+            "sync_status": "success" if success else "failed",
+            "error_message": result.get("error") or (f"保存失败 {db_failed} 条" if db_failed else None),
+        }
+        if success:
+            fields["last_sync_time"] = self._sync_started_at.isoformat()
+            fields["total_synced"] = (self.last_sync.total_synced if self.last_sync else 0) + 1
+        self._sync_started_at = None
+        
+        try:
+            self.supabase.upsert_data_source(self.sync_source_name, **fields)
+        except Exception as e:
+            self.logger.warning(f"记录同步状态失败: {e}")
+    
+    def process(self, raw_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        处理已获取的原始数据（转换、验证、保存）
+        用于数据由外部获取的场景（如异步爬虫）
+        
+        Args:
+            raw_data: 原始数据列表
             
-            # 3. 验证数据
-            valid_data = self.validate_data(transformed_data)
-            if not valid_data:
-                result["error"] = "验证后无有效数据"
+        Returns:
+            运行结果字典（格式与 run() 相同）
+        """
+        result = self._new_result()
+        
+        try:
+            if not raw_data:
+                result["error"] = "未能获取数据"
                 return result
             
-            result["data_count"] = len(valid_data)
-            
-            # 4. 保存到文件（如果启用）
-            if self.config.crawler.save_to_file:
-                self.save_to_file(valid_data)
-            
-            # 5. 保存到数据库（如果启用）
-            if self.config.crawler.save_to_db and self.supabase:
-                db_stats = self.save_to_database(valid_data, upsert=True)
-                result["saved_count"] = db_stats["success"]
-                result["db_stats"] = db_stats
-            elif self.config.crawler.save_to_db and not self.supabase:
-                self.logger.warning("数据库保存已启用但 Supabase 未初始化")
-            
-            result["success"] = True
-            self.logger.info(f"爬虫运行完成: {self.name}, 获取 {result['data_count']} 条数据")
+            self._process(raw_data, result)
             
         except Exception as e:
             result["error"] = str(e)
             self.logger.error(f"爬虫运行失败: {self.name}, 错误: {e}", exc_info=True)
         
+        self.finish_fingerprints(result["success"])
         return result
-
+    
+    def _new_result(self) -> Dict[str, Any]:
+        """创建空的运行结果字典"""
+        return {
+            "crawler_name": self.name,
+            "success": False,
+            "data_count": 0,
+            "saved_count": 0,
+            "changed_count": 0,
+            "skipped_count": 0,
+            "error": None
+        }
+    
+    def is_unchanged(self, raw_data: Any, key: Any = "") -> bool:
+        """
+        检查原始数据是否与上次成功处理时相同（未启用 skip_unchanged 时始终为 False）
+        数据变化时记录待提交的新指纹，由 finish_fingerprints 在运行结束时提交
+        
+        Args:
+            raw_data: 原始数据
+            key: 数据键（如箱子 qaq_id），同一爬虫只有一份数据时使用默认值
+            
+        Returns:
+            数据是否未变化
+        """
+        if not self.fingerprint_store:
+            return False
+        digest = FingerprintStore.digest(raw_data, self.json_codec)
+        if self.fingerprint_store.check(self.name, str(key), digest):
+            return False
+        self.logger.info(f"数据指纹未变化，跳过处理: {self.name}" + (f" key={key}" if key != "" else ""))
+        return True
+    
+    def finish_fingerprints(self, success: bool, keys: Optional[Iterable[Any]] = None) -> None:
+        """
+        运行结束时处理本次记录的指纹：成功则提交，失败则丢弃
+        
+        Args:
+            success: 本次运行是否成功
+            keys: 要提交的数据键，None 表示全部
+        """
+        if not self.fingerprint_store:
+            return
+        if success:
+            self.fingerprint_store.commit(self.name, None if keys is None else [str(key) for key in keys])
+        else:
+            self.fingerprint_store.discard(self.name)
+    
+    def _process(self, raw_data: List[Dict[str, Any]], result: Dict[str, Any]) -> None:
+        """
+        数据处理流水线：转换 -> 验证 -> 保存，结果写入 result
+        
+        Args:
+            raw_data: 原始数据列表
+            result: 运行结果字典
+        """
+        # 上游未变化：跳过转换和保存
+        if raw_data is NOT_MODIFIED:
+            result["success"] = True
+            result["status"] = "unchanged"
+            result["skipped_count"] = 1
+            self.logger.info(f"数据未变化，跳过处理: {self.name}")
+            return
+        
+        # 流式数据：分批处理（边解析边保存，不计算指纹）
+        if isinstance(raw_data, Iterator):
+            self._process_stream(raw_data, result)
+            return
+        
+        # 原始数据与上次成功处理时相同：跳过转换和保存
+        if self.is_unchanged(raw_data):
+            result["success"] = True
+            result["status"] = "unchanged"
+            result["skipped_count"] = 1
+            return
+        
+        # 2. 转换数据
+        transformed_data = self.transform_data(raw_data)
+        if not transformed_data:
+            result["error"] = "数据转换后为空"
+            return
+        
+        # 3. 验证数据
+        valid_data = self.validate_data(transformed_data)
+        if not valid_data:
+            result["error"] = "验证后无有效数据"
+            return
+        
+        result["data_count"] = len(valid_data)
+        
+        # 4. 保存到文件（如果启用）
+        if self.config.crawler.save_to_file:
+            self.save_to_file(valid_data)
+        
+        # 5. 保存到数据库（如果启用）
+        if self.config.crawler.save_to_db and self.supabase:
+            db_stats = self.save_to_database(valid_data, upsert=True)
+            if not self._record_save(result, db_stats, len(valid_data)):
+                return
+        elif self.config.crawler.save_to_db and not self.supabase:
+            self.logger.warning("数据库保存已启用但 Supabase 未初始化")
+        
+        result["success"] = True
+        result["status"] = "changed"
+        result["changed_count"] = 1
+        self.logger.info(f"爬虫运行完成: {self.name}, 获取 {result['data_count']} 条数据")
+    
+    def _record_save(self, result: Dict[str, Any], db_stats: Dict[str, int], expected: int) -> bool:
+        """
+        记录数据库保存结果；有失败或保存的条数少于有效数据条数时记录错误
+        （不算成功运行，待提交的指纹和校验器会被丢弃，下次重新处理）
+        
+        Args:
+            result: 运行结果字典
+            db_stats: save_to_database 返回的统计
+            expected: 有效数据条数
+            
+        Returns:
+            是否全部保存成功
+        """
+        result["saved_count"] = db_stats["success"]
+        result["db_stats"] = db_stats
+        if db_stats["failed"] or db_stats["success"] < expected:
+            result["error"] = f"保存失败: 有效数据 {expected} 条，保存成功 {db_stats['success']} 条，失败 {db_stats['failed']} 条"
+            self.logger.error(result["error"])
+            return False
+        return True
+    
+    def _process_stream(self, raw_data: Iterator[Dict[str, Any]], result: Dict[str, Any]) -> None:
+        """
+        流式数据处理：每凑满 batch_size 条就转换、验证并保存一批，
+        第一批数据到达即开始处理，内存占用与响应大小无关
+        
+        Args:
+            raw_data: 原始数据迭代器
+            result: 运行结果字典
+        """
+        batch_size = self.config.crawler.batch_size
+        save_to_db = self.config.crawler.save_to_db and self.supabase
+        if self.config.crawler.save_to_db and not self.supabase:
+            self.logger.warning("数据库保存已启用但 Supabase 未初始化")
+        
+        writer = None
+        if self.config.crawler.save_to_file:
+            writer = JSONArrayWriter(
+                f"{self.name}_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                codec=self.json_codec
+            )
+        
+        db_stats = {"success": 0, "failed": 0, "inserted": 0, "updated": 0}
+        raw_count = 0
+        try:
+            while True:
+                batch = list(islice(raw_data, batch_size))
+                if not batch:
+                    break
+                raw_count += len(batch)
+                
+                transformed_data = self.transform_data(batch)
+                valid_data = self.validate_data(transformed_data) if transformed_data else []
+                if not valid_data:
+                    continue
+                
+                result["data_count"] += len(valid_data)
+                if writer:
+                    writer.write_items(valid_data)
+                if save_to_db:
+                    batch_stats = self.save_to_database(valid_data, upsert=True)
+                    for key in db_stats:
+                        db_stats[key] += batch_stats.get(key, 0)
+        finally:
+            if writer:
+                writer.close()
+                self.logger.info(f"数据已保存到文件: {writer.filename}")
+        
+        if not raw_count:
+            result["error"] = "未能获取数据"
+            return
+        if not result["data_count"]:
+            result["error"] = "验证后无有效数据"
+            return
+        
+        if save_to_db and not self._record_save(result, db_stats, result["data_count"]):
+            return
+        
+        result["success"] = True
+        result["status"] = "changed"
+        result["changed_count"] = 1
+        self.logger.info(f"爬虫运行完成: {self.name}, 流式处理 {raw_count} 条原始数据, 有效 {result['data_count']} 条")
+    
+    @staticmethod
+    def extract_items(data: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        从 API 响应中提取数据列表
+        
+        Args:
+            data: 解析后的响应数据
+            
+        Returns:
+            数据列表，无法识别的格式返回 None
+        """
+        # 处理不同的响应格式
+        if isinstance(data, list):
+            return data
+        elif isinstance(data, dict):
+            # 尝试常见的字段名
+            for key in ['data', 'list', 'items', 'results']:
+                if key in data and isinstance(data[key], list):
+                    return data[key]
+            # 如果整个字典就是一条数据
+            return [data]
+        
+        return None
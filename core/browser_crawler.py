@@ -2,16 +2,24 @@
 浏览器爬虫基类
 用于需要浏览器自动化拦截 API 的爬虫
 """
+import importlib.util
 import logging
-from typing import Optional, Dict, Any, List
+import time
+import requests
+from typing import Optional, Dict, Any, List, Tuple, Union
 
-try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+# Playwright 导入较慢，只检查是否安装，使用时再导入
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
 
 from crawler.core.base import BaseCrawler
+from crawler.core.retry import RetryPolicy
+from crawler.core.circuit_breaker import CircuitOpenError
+from crawler.core.session import create_session
+from crawler.core.session_state import SessionState
+from crawler.core.browser_pool import BrowserPool
+from crawler.core.route_blocker import RouteBlocker, RouteStats
+from crawler.core.response_cache import CachedResponse, make_request_key
+from crawler.core.proxy_pool import to_playwright_proxy
 from crawler.config.config import Config
 
 
@@ -42,169 +50,440 @@ class BrowserCrawler(BaseCrawler):
         self.page_url = page_url
         self.api_pattern = api_pattern
         
+        # 浏览器池（由 CrawlerManager 注入共享实例，否则第一次拦截时创建爬虫自己的）
+        self.browser_pool: Optional[BrowserPool] = None
+        self._owns_browser_pool = False
+        
+        # 最近一次拦截的各阶段耗时（秒）：queue 等待浏览器池、rate_limit 限流、navigate 导航、
+        # wait_response 导航后等待目标响应、body 读取并解析响应体、total 总耗时
+        self.last_intercept_timings: Dict[str, float] = {}
+        
+        # 页面请求拦截规则（图片、字体、统计脚本等），以及最近一次拦截的请求统计
+        self.route_blocker = RouteBlocker.from_config(self.config.crawler)
+        self.last_route_stats = RouteStats()
+        
+        # 拦截时获取的会话状态（按 intercept_apis 的模式名称，intercept_api 为 "api"），
+        # 以及启用 browser_handoff 时直接调用 API 的 HTTP 会话
+        self.session_states: Dict[str, SessionState] = {}
+        self._direct_session = None
+        
         if not PLAYWRIGHT_AVAILABLE:
             self.logger.warning("Playwright 未安装，浏览器爬虫将无法工作")
             self.logger.warning("安装方法: pip install playwright && playwright install chromium")
     
+    @property
+    def target_url(self) -> Optional[str]:
+        return self.page_url
+    
+    def get_browser_pool(self) -> BrowserPool:
+        """
+        获取浏览器池，未注入共享浏览器池时创建爬虫自己的
+        
+        Returns:
+            浏览器池
+        """
+        if self.browser_pool is None:
+            self.browser_pool = BrowserPool.from_config(self.config.crawler)
+            self._owns_browser_pool = True
+        return self.browser_pool
+    
+    def close(self) -> None:
+        """关闭爬虫自己创建的浏览器池（共享的浏览器池由 CrawlerManager 关闭）和直接请求的 HTTP 会话"""
+        if self._owns_browser_pool and self.browser_pool:
+            self.browser_pool.close()
+            self.browser_pool = None
+            self._owns_browser_pool = False
+        if self._direct_session is not None:
+            self._direct_session.close()
+            self._direct_session = None
+    
     def intercept_api(
         self,
         timeout: Optional[int] = None,
-        wait_after_load: int = 2000
-    ) -> Optional[Dict[str, Any]]:
+        wait_after_load: int = 2000,
+        raw: bool = False
+    ) -> Optional[Union[Dict[str, Any], bytes]]:
         """
         使用浏览器拦截 API 响应
         
+        拦截到目标响应并解析成功后立即返回，不再固定等待；
+        各阶段耗时记录在 last_intercept_timings 中
+        
+        Args:
+            timeout: 总超时时间（毫秒，从开始导航算起），如果为 None 使用配置中的值
+            wait_after_load: 页面加载完成后仍未拦截到响应时，等待多久（毫秒）滚动页面触发懒加载
+            raw: 是否返回未解析的响应体字节（由调用方自行解析）
+            
+        Returns:
+            API 响应数据（raw 为 True 时为响应体字节），失败返回 None
+        """
+        return self.intercept_apis({"api": self.api_pattern}, timeout, wait_after_load, raw).get("api")
+    
+    def intercept_apis(
+        self,
+        patterns: Dict[str, str],
+        timeout: Optional[int] = None,
+        wait_after_load: int = 2000,
+        raw: bool = False,
+        harvest_session: Optional[bool] = None
+    ) -> Dict[str, Union[Dict[str, Any], bytes]]:
+        """
+        一次页面加载拦截多个 API 响应
+        
+        全部模式都拦截到（或超时）即返回；每个模式取第一个解析成功的匹配响应
+        
         Args:
-            timeout: 超时时间（毫秒），如果为 None 使用配置中的值
-            wait_after_load: 页面加载后等待时间（毫秒）
+            patterns: {名称: API URL 模式}，如 {"container": "container_data_info", "chart": "chartAll"}
+            timeout: 总超时时间（毫秒，从开始导航算起），如果为 None 使用配置中的值
+            wait_after_load: 页面加载完成后仍有模式未拦截到时，等待多久（毫秒）滚动页面触发懒加载
+            raw: 是否返回未解析的响应体字节
+            harvest_session: 是否记录拦截到的请求的 Cookie 和请求头到 session_states
+                （此时不读取响应缓存），None 表示使用配置中的 browser_handoff
             
         Returns:
-            API 响应数据，失败返回 None
+            {名称: API 响应数据}，只包含拦截到的模式
         """
         if not PLAYWRIGHT_AVAILABLE:
             self.logger.error("Playwright 未安装，无法使用浏览器自动化")
-            return None
+            return {}
         
         timeout = timeout or self.config.crawler.browser_timeout
+        started = time.monotonic()
+        timings: Dict[str, float] = {}
+        self.last_intercept_timings = timings
+        route_stats = RouteStats()
+        self.last_route_stats = route_stats
+        results: Dict[str, Union[Dict[str, Any], bytes]] = {}
+        if harvest_session is None:
+            harvest_session = self.config.crawler.browser_handoff
+        session_states: Optional[Dict[str, SessionState]] = {} if harvest_session else None
+        
+        # 优先读取响应缓存（需要会话状态时必须真正访问页面）
+        cache_keys = {}
+        if self.response_cache:
+            for name, pattern in patterns.items():
+                cache_keys[name] = make_request_key("BROWSER", self.page_url, {"api_pattern": pattern})
+                cached = None if harvest_session else self.response_cache.get(cache_keys[name])
+                if cached:
+                    results[name] = cached.body if raw else self.json_codec.loads(cached.body)
+            if results:
+                self.logger.info(f"命中响应缓存: {self.page_url} ({', '.join(results)})")
+        
+        missing = {name: pattern for name, pattern in patterns.items() if name not in results}
+        if not missing:
+            timings["total"] = time.monotonic() - started
+            return results
+        
+        # 与 AsyncBrowserCrawler 一致：按页面 URL 熔断，放行的页面加载都要记录结果
+        if self.circuit_breaker:
+            try:
+                self.circuit_breaker.before_request(self.page_url)
+            except CircuitOpenError as e:
+                self.logger.warning(f"跳过页面: {e}")
+                timings["total"] = time.monotonic() - started
+                return results
+        
         self.logger.info(f"使用浏览器访问页面并拦截 API: {self.page_url}")
         
+        # 配置代理（从代理池选择，每个上下文单独设置）
+        context_options = {
+            "user_agent": self.config.csqaq.user_agent,
+            **self.route_blocker.context_options()
+        }
+        proxy = self.proxy_pool.choose() if self.proxy_pool else None
+        if proxy:
+            context_options["proxy"] = to_playwright_proxy(proxy)
+            self.logger.info(f"使用代理: {proxy}")
+        
+        captured = None
         try:
-            with sync_playwright() as p:
-                # 配置浏览器启动选项
-                launch_options = {"headless": self.config.crawler.headless}
-                
-                # 配置代理（如果提供）
-                context_options = {
-                    "user_agent": self.config.csqaq.user_agent
-                }
-                if self.config.crawler.proxy:
-                    # 解析代理 URL
-                    proxy_url = self.config.crawler.proxy
-                    # 移除协议前缀
-                    if proxy_url.startswith("http://"):
-                        proxy_url = proxy_url[7:]
-                    elif proxy_url.startswith("https://"):
-                        proxy_url = proxy_url[8:]
-                    
-                    # 解析用户名密码（如果有）
-                    if "@" in proxy_url:
-                        auth_part, server_part = proxy_url.rsplit("@", 1)
-                        if ":" in auth_part:
-                            username, password = auth_part.split(":", 1)
-                            context_options["proxy"] = {
-                                "server": f"http://{server_part}",
-                                "username": username,
-                                "password": password
-                            }
-                        else:
-                            context_options["proxy"] = {"server": f"http://{server_part}"}
-                    else:
-                        context_options["proxy"] = {"server": f"http://{proxy_url}"}
-                    
-                    self.logger.info(f"使用代理: {self.config.crawler.proxy}")
-                
-                browser = p.chromium.launch(**launch_options)
-                context = browser.new_context(**context_options)
-                page = context.new_page()
-                
-                captured_response = [None]
-                response_received = [False]
-                
-                def handle_response(response):
-                    """拦截响应"""
-                    response_url = response.url
-                    if self.api_pattern.lower() in response_url.lower():
-                        self.logger.info(f"✅ 检测到目标 API: {response_url}")
-                        
-                        if response.status == 200:
-                            try:
-                                data = response.json()
-                                captured_response[0] = data
-                                response_received[0] = True
-                                self.logger.info("✅ 成功拦截到 API 响应")
-                            except Exception as e:
-                                self.logger.warning(f"解析响应 JSON 失败: {e}")
-                
-                page.on("response", handle_response)
-                
-                # 访问页面
-                try:
-                    self.logger.info("正在加载页面...")
-                    page.goto(self.page_url, wait_until="load", timeout=timeout)
-                    self.logger.info("页面加载完成")
-                    
-                    # 等待 JavaScript 执行
-                    page.wait_for_timeout(wait_after_load)
-                    
-                    # 等待 API 响应（如果支持）
-                    if hasattr(page, 'wait_for_response'):
-                        try:
-                            self.logger.info("等待 API 响应...")
-                            response = page.wait_for_response(
-                                lambda r: self.api_pattern.lower() in r.url.lower() and r.status == 200,
-                                timeout=20000
-                            )
-                            self.logger.info(f"✅ 获取到响应: {response.url}")
-                            try:
-                                data = response.json()
-                                captured_response[0] = data
-                                response_received[0] = True
-                            except Exception as e:
-                                self.logger.warning(f"解析响应失败: {e}")
-                        except Exception as e:
-                            self.logger.warning(f"等待响应超时: {e}")
-                    
-                    # 轮询等待
-                    if not response_received[0]:
-                        max_wait = 15
-                        wait_interval = 200
-                        waited = 0
-                        
-                        while not response_received[0] and waited < max_wait * 1000:
-                            page.wait_for_timeout(wait_interval)
-                            waited += wait_interval
-                            if waited % 2000 == 0:
-                                self.logger.info(f"等待中... ({waited/1000:.1f}s)")
-                        
-                        if not response_received[0]:
-                            self.logger.warning("未能拦截到 API 响应")
-                            # 尝试滚动页面
-                            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                            page.wait_for_timeout(3000)
-                            
-                except PlaywrightTimeoutError:
-                    self.logger.warning("页面加载超时，但可能已拦截到响应")
-                except Exception as e:
-                    self.logger.error(f"访问页面时出错: {e}")
-                
-                browser.close()
-                
-                if captured_response[0]:
-                    return captured_response[0]
-                else:
-                    return None
-                    
+            captured = self.get_browser_pool().run(
+                lambda context: self._intercept_page(
+                    context, missing, proxy, timeout, wait_after_load, raw, started, timings, route_stats,
+                    session_states
+                ),
+                context_options
+            )
         except Exception as e:
             self.logger.error(f"浏览器自动化失败: {e}")
+            return results
+        finally:
+            timings["total"] = time.monotonic() - started
+            if self.circuit_breaker:
+                self.circuit_breaker.record(self.page_url, captured is not None and len(captured) == len(missing))
+            self.logger.info(
+                "拦截耗时: " + ", ".join(f"{phase}={seconds:.3f}s" for phase, seconds in timings.items())
+            )
+            if route_stats.blocked:
+                self.logger.info(
+                    f"拦截了 {route_stats.blocked} 个请求 {route_stats.blocked_by_type}，"
+                    f"估计节省 {route_stats.bytes_saved / 1024:.1f} KB"
+                    + (f"（{route_stats.estimated} 个按类型估计）" if route_stats.estimated else "")
+                    + (f"（{route_stats.unknown_size} 个大小未知）" if route_stats.unknown_size else "")
+                    + f"，实际加载 {route_stats.bytes_loaded / 1024:.1f} KB"
+                )
+        
+        if session_states:
+            self.session_states.update(session_states)
+        
+        for name, (data, body) in captured.items():
+            results[name] = data
+            if name in cache_keys:
+                self.response_cache.set(cache_keys[name], CachedResponse(
+                    url=self.page_url,
+                    status=200,
+                    body=body,
+                    headers={"Content-Type": "application/json"},
+                    created_at=time.time()
+                ))
+        return results
+    
+    def _intercept_page(
+        self,
+        context: Any,
+        patterns: Dict[str, str],
+        proxy: Optional[str],
+        timeout: int,
+        wait_after_load: int,
+        raw: bool,
+        started: float,
+        timings: Dict[str, float],
+        route_stats: RouteStats,
+        session_states: Optional[Dict[str, SessionState]] = None
+    ) -> Dict[str, Tuple[Union[Dict[str, Any], bytes], bytes]]:
+        """
+        在浏览器上下文中打开页面并拦截 API 响应（在浏览器池的工作线程中执行）
+        
+        导航只等待到服务器开始返回页面（commit），之后等待匹配的响应事件，
+        全部模式拦截到并解析成功即返回；所有等待共用一个截止时间。
+        
+        Args:
+            context: 浏览器上下文
+            patterns: {名称: API URL 模式}
+            proxy: 使用的代理 URL
+            timeout: 总超时时间（毫秒）
+            wait_after_load: 页面加载完成后等待多久（毫秒）滚动页面
+            raw: 是否返回未解析的响应体字节
+            started: intercept_apis 开始的时间（monotonic）
+            timings: 各阶段耗时（秒），原地写入
+            route_stats: 请求拦截统计，原地写入
+            session_states: 拦截到的请求的会话状态，原地写入，None 表示不记录
+            
+        Returns:
+            {名称: (拦截到的数据, 响应体字节)}，只包含拦截到的模式
+        """
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+        
+        job_start = time.monotonic()
+        timings["queue"] = job_start - started
+        lowered = {name: pattern.lower() for name, pattern in patterns.items()}
+        captured: Dict[str, Tuple[Union[Dict[str, Any], bytes], bytes]] = {}
+        
+        def match_name(response) -> Optional[str]:
+            """响应匹配的、尚未拦截到的模式名称"""
+            if response.status != 200:
+                return None
+            url = response.url.lower()
+            for name, pattern in lowered.items():
+                if name not in captured and pattern in url:
+                    return name
+            return None
+        
+        def matches(response) -> bool:
+            return match_name(response) is not None
+        
+        def remaining_ms() -> int:
+            return int((deadline - time.monotonic()) * 1000)
+        
+        page = context.new_page()
+        self.route_blocker.install(page, list(patterns.values()), route_stats)
+        
+        # 导航期间到达的响应由事件处理器收集，之后到达的由 wait_for_event 等待
+        pending = []
+        loaded_at = []
+        page.on("response", lambda response: pending.append(response) if matches(response) else None)
+        page.on("load", lambda *_: loaded_at.append(time.monotonic()))
+        
+        # 访问页面
+        self.rate_limiter.acquire(self.page_url, proxy)
+        nav_start = time.monotonic()
+        timings["rate_limit"] = nav_start - job_start
+        deadline = nav_start + timeout / 1000
+        try:
+            self.logger.info("正在加载页面...")
+            page.goto(self.page_url, wait_until="commit", timeout=max(remaining_ms(), 1))
+            if proxy:
+                self.proxy_pool.report(proxy, True, time.monotonic() - nav_start)
+        except PlaywrightTimeoutError:
+            self.logger.warning("页面加载超时，但可能已拦截到响应")
+            if proxy and not pending:
+                self.proxy_pool.report(proxy, False)
+        except Exception as e:
+            self.logger.error(f"访问页面时出错: {e}")
+            if proxy:
+                self.proxy_pool.report(proxy, False)
+            return captured
+        nav_end = time.monotonic()
+        timings["navigate"] = nav_end - nav_start
+        timings["body"] = 0.0
+        
+        scrolled = False
+        while True:
+            while pending:
+                response = pending.pop(0)
+                name = match_name(response)
+                if name is None:
+                    continue
+                received = time.monotonic()
+                try:
+                    body = response.body()
+                    data = body if raw else self.json_codec.loads(body)
+                except Exception as e:
+                    self.logger.warning(f"解析响应 JSON 失败: {e}")
+                    continue
+                captured[name] = (data, body)
+                if session_states is not None:
+                    try:
+                        session_states[name] = SessionState.from_playwright(
+                            response.request,
+                            context.cookies([response.url]),
+                            self.config.crawler.session_state_ttl
+                        )
+                    except Exception as e:
+                        self.logger.warning(f"获取会话状态失败: {e}")
+                timings["wait_response"] = max(0.0, received - nav_end)
+                timings["body"] += time.monotonic() - received
+                self.logger.info(f"✅ 成功拦截到 API 响应: {response.url}" + (f" ({name})" if len(lowered) > 1 else ""))
+            
+            if len(captured) == len(lowered):
+                return captured
+            
+            remaining = remaining_ms()
+            if remaining <= 0:
+                missing = [name for name in lowered if name not in captured]
+                self.logger.warning(
+                    f"未能拦截到 API 响应（{timeout / 1000:.1f}s 内）"
+                    + (f": {', '.join(missing)}" if len(lowered) > 1 else "")
+                )
+                timings["wait_response"] = time.monotonic() - nav_end
+                return captured
+            
+            # 页面加载完成一段时间后仍没有目标请求：滚动一次页面，触发懒加载的请求
+            wait = remaining
+            if not scrolled and loaded_at:
+                scroll_in = int((loaded_at[0] + wait_after_load / 1000 - time.monotonic()) * 1000)
+                if scroll_in <= 0:
+                    scrolled = True
+                    try:
+                        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    except Exception as e:
+                        self.logger.debug(f"滚动页面失败: {e}")
+                    continue
+                wait = min(wait, scroll_in)
+            elif not scrolled:
+                # 尚未触发 load 事件：定期醒来检查是否需要滚动
+                wait = min(wait, max(wait_after_load, 100))
+            
+            try:
+                response = page.wait_for_event("response", predicate=matches, timeout=max(wait, 1))
+            except PlaywrightTimeoutError:
+                continue
+            except Exception as e:
+                self.logger.error(f"等待 API 响应时出错: {e}")
+                timings["wait_response"] = time.monotonic() - nav_end
+                return captured
+            if response not in pending:
+                pending.append(response)
+    
+    def can_share_page_load(self) -> bool:
+        """
+        是否可以与访问同一页面的其他浏览器爬虫共用一次页面加载（由 CrawlerManager 分组）
+        
+        只有使用默认 fetch_data 的爬虫可以共用；重写了 fetch_data 的子类可能需要自定义的页面操作，
+        也可以重写本方法返回 True 表示接受 intercept_apis 拦截到的数据
+        
+        Returns:
+            是否可以共用
+        """
+        return type(self).fetch_data is BrowserCrawler.fetch_data
+    
+    def harvest_session_state(self, name: str = "api", pattern: Optional[str] = None) -> Optional[SessionState]:
+        """
+        访问页面并获取 API 请求的会话状态（Cookie、请求头和请求模板）
+        可作为 APICrawler.session_state_provider，凭证过期时由 API 爬虫调用
+        
+        Args:
+            name: 会话状态的名称
+            pattern: API URL 模式，默认为 api_pattern
+            
+        Returns:
+            会话状态，未拦截到请求返回 None
+        """
+        self.intercept_apis({name: pattern or self.api_pattern}, harvest_session=True)
+        return self.session_states.get(name)
+    
+    def fetch_direct(self, raw: bool = False) -> Optional[Union[Dict[str, Any], bytes]]:
+        """
+        使用之前拦截时获取的会话状态直接发 HTTP 请求（不打开浏览器）
+        
+        Args:
+            raw: 是否返回未解析的响应体字节
+            
+        Returns:
+            API 响应数据；没有会话状态、会话状态已过期、凭证被拒绝（401/403）或请求失败时返回 None
+        """
+        state = self.session_states.get("api")
+        if state is None:
+            return None
+        if state.is_expired():
+            self.logger.info("会话状态已过期，使用浏览器重新获取")
+            del self.session_states["api"]
+            return None
+        
+        if self._direct_session is None:
+            self._direct_session = create_session(
+                self.config,
+                retry_policy=RetryPolicy.from_config(self.config.crawler),
+                rate_limiter=self.rate_limiter,
+                circuit_breaker=self.circuit_breaker,
+                proxy_pool=self.proxy_pool
+            )
+        
+        try:
+            response = self._direct_session.request(
+                state.method,
+                state.url,
+                data=state.body,
+                headers=state.headers,
+                cookies=state.cookie_jar(),
+                timeout=self.config.crawler.timeout
+            )
+            if response.status_code in (401, 403):
+                self.logger.warning(f"会话凭证被拒绝（{response.status_code}），使用浏览器重新获取")
+                self.session_states.pop("api", None)
+                return None
+            response.raise_for_status()
+            self.logger.info(f"使用会话状态直接请求 API: {state.url}")
+            return response.content if raw else self.json_codec.loads(response.content)
+        except CircuitOpenError as e:
+            self.logger.warning(f"跳过请求: {e}")
+            return None
+        except (requests.RequestException, ValueError) as e:
+            self.logger.warning(f"直接请求 API 失败，使用浏览器: {e}")
             return None
     
     def fetch_data(self) -> Optional[List[Dict[str, Any]]]:
         """
         获取数据（浏览器爬虫的默认实现）
         子类可以重写此方法以自定义行为
+        启用 browser_handoff 时优先使用会话状态直接请求 API，失败再使用浏览器
+        （Playwright 只能一次性读取完整的响应体，浏览器爬虫不使用 stream_json）
         """
-        api_response = self.intercept_api()
+        api_response = self.fetch_direct() if self.config.crawler.browser_handoff else None
+        if api_response is None:
+            api_response = self.intercept_api()
+        
         if api_response:
-            # 如果响应是列表，直接返回
-            if isinstance(api_response, list):
-                return api_response
-            # 如果响应是字典，尝试提取数据
-            elif isinstance(api_response, dict):
-                # 尝试常见的字段名
-                for key in ['data', 'list', 'items', 'results']:
-                    if key in api_response and isinstance(api_response[key], list):
-                        return api_response[key]
-                # 如果整个字典就是一条数据
-                return [api_response]
+            return self.extract_items(api_response)
         return None
 
@@ -0,0 +1,236 @@
+"""
+浏览器池模块
+长期持有已启动的浏览器，每个任务使用新的浏览器上下文，
+重复拦截页面只需一次页面导航，而不是一次浏览器启动
+"""
+import atexit
+import importlib.util
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+# Playwright 导入较慢，只检查是否安装，在工作线程中再导入
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+
+from crawler.config.config import CrawlerConfig
+from crawler.core.proxy_pool import with_per_context_proxy
+
+
+class BrowserPool:
+    """
+    浏览器池（线程安全，可在多个爬虫之间共享）
+
+    Playwright 同步 API 的对象只能在创建它的线程中使用，因此每个浏览器由一个专用的
+    工作线程持有：run() 把任务放入队列，由空闲的工作线程在新建的浏览器上下文中执行，
+    调用方阻塞等待结果。上下文在任务结束后关闭，浏览器本身保留给下一个任务。
+
+    浏览器使用 max_uses 次后重启（防止内存泄漏），崩溃或断开连接时在下一个任务前重启。
+    浏览器和工作线程在第一次 run() 时才启动，创建浏览器池本身不会启动浏览器。
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_uses: int = 50,
+        headless: bool = True,
+        launch_options: Optional[Dict[str, Any]] = None,
+        per_context_proxy: bool = False
+    ):
+        """
+        初始化浏览器池
+
+        Args:
+            size: 浏览器数量（即可同时执行的任务数）
+            max_uses: 每个浏览器执行多少个任务后重启，0 表示不重启
+            headless: 是否无头模式
+            launch_options: 额外的浏览器启动参数
+            per_context_proxy: 是否按上下文设置代理（Chromium 需要在启动时声明）
+        """
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.launch_options = {"headless": headless, **(launch_options or {})}
+        if per_context_proxy:
+            with_per_context_proxy(self.launch_options)
+
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"jobs": 0, "failures": 0, "launches": 0, "recycles": 0, "crashes": 0}
+        self.logger = logging.getLogger("BrowserPool")
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> "BrowserPool":
+        """
+        从爬虫配置创建浏览器池
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            浏览器池
+        """
+        return cls(
+            size=config.browser_pool_size,
+            max_uses=config.browser_max_uses,
+            headless=config.headless,
+            per_context_proxy=bool(config.proxy or config.proxy_list or config.proxy_file)
+        )
+
+    def _start(self) -> None:
+        """启动工作线程（调用方持有锁）"""
+        if self._workers:
+            return
+        for i in range(self.size):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"BrowserPool-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        atexit.register(self.close)
+
+    def _incr(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def run(
+        self,
+        job: Callable[[Any], Any],
+        context_options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        在新的浏览器上下文中执行任务
+
+        Args:
+            job: 任务函数，参数为浏览器上下文（BrowserContext），在工作线程中执行
+            context_options: 创建上下文的参数（user_agent、proxy 等）
+            timeout: 等待结果的超时时间（秒），None 表示一直等待
+
+        Returns:
+            任务函数的返回值（任务抛出的异常原样抛出）
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright 未安装，无法使用浏览器池")
+
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("浏览器池已关闭")
+            self._start()
+            self._jobs.put((job, context_options or {}, future))
+        return future.result(timeout)
+
+    def _worker_loop(self) -> None:
+        """工作线程：持有一个 Playwright 实例和一个浏览器，依次执行任务"""
+        playwright = None
+        browser = None
+        uses = 0
+
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            job, context_options, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if browser is not None and (
+                    not browser.is_connected() or (self.max_uses and uses >= self.max_uses)
+                ):
+                    if browser.is_connected():
+                        self._incr("recycles")
+                        self.logger.info(f"浏览器已执行 {uses} 个任务，重启")
+                    else:
+                        self._incr("crashes")
+                        self.logger.warning("浏览器已断开连接，重启")
+                    self._close_browser(browser)
+                    browser = None
+
+                if browser is None:
+                    if playwright is None:
+                        from playwright.sync_api import sync_playwright
+                        playwright = sync_playwright().start()
+                    browser = playwright.chromium.launch(**self.launch_options)
+                    uses = 0
+                    self._incr("launches")
+                    self.logger.info("浏览器已启动")
+
+                uses += 1
+                context = browser.new_context(**context_options)
+                try:
+                    result = job(context)
+                finally:
+                    try:
+                        context.close()
+                    except Exception:
+                        pass
+            except BaseException as e:
+                self._incr("failures")
+                future.set_exception(e)
+                # 启动失败时 Playwright 驱动可能已不可用，下次任务重新创建
+                if browser is None and playwright is not None:
+                    self._stop_playwright(playwright)
+                    playwright = None
+            else:
+                self._incr("jobs")
+                future.set_result(result)
+
+        if browser is not None:
+            self._close_browser(browser)
+        if playwright is not None:
+            self._stop_playwright(playwright)
+
+    def _close_browser(self, browser: Any) -> None:
+        try:
+            browser.close()
+        except Exception as e:
+            self.logger.debug(f"关闭浏览器失败: {e}")
+
+    def _stop_playwright(self, playwright: Any) -> None:
+        try:
+            playwright.stop()
+        except Exception as e:
+            self.logger.debug(f"停止 Playwright 失败: {e}")
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        关闭浏览器池：等待已提交的任务执行完毕，然后关闭所有浏览器
+
+        Args:
+            timeout: 等待每个工作线程退出的超时时间（秒）
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            for _ in workers:
+                self._jobs.put(None)
+
+        for worker in workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout)
+        if workers:
+            self.logger.info("浏览器池已关闭")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取浏览器池统计
+
+        Returns:
+            浏览器数、已完成/失败的任务数、启动/重启/崩溃次数
+        """
+        with self._lock:
+            return {"size": self.size, "started": bool(self._workers), **self._stats}
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
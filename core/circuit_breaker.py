@@ -0,0 +1,295 @@
+"""
+熔断模块
+按主机（或接口）统计最近请求的失败率，上游故障时快速失败，冷却后放行少量探测请求
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from crawler.config.config import CrawlerConfig
+
+# 熔断器状态
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开时拒绝请求"""
+
+    def __init__(self, key: str, retry_after: float):
+        """
+        Args:
+            key: 熔断的主机或接口
+            retry_after: 距离允许探测还需等待的秒数
+        """
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(f"{key} 已熔断，{retry_after:.1f}s 后允许探测")
+
+
+class CircuitBreaker:
+    """
+    单个主机（或接口）的熔断器
+
+    - closed: 正常放行，记录最近 window_size 次请求的结果，
+      至少 min_calls 次且失败率达到 failure_threshold 时打开
+    - open: 直接拒绝请求，cooldown 秒后进入 half_open
+    - half_open: 最多放行 half_open_max_calls 个探测请求，
+      全部成功则关闭，任一失败则重新打开
+    """
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 打开熔断的失败率（0~1）
+            window_size: 统计失败率的最近请求数
+            min_calls: 开始判断失败率所需的最少请求数
+            cooldown: 打开后的冷却时间（秒）
+            half_open_max_calls: 半开状态下放行的探测请求数
+        """
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self.state = CLOSED
+        self._results = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def _open(self, now: float) -> None:
+        """打开熔断器（调用方持有锁）"""
+        self.state = OPEN
+        self._opened_at = now
+        self._results.clear()
+
+    def retry_after(self) -> float:
+        """
+        查询当前是否放行（不改变状态）
+
+        Returns:
+            距离允许请求还需等待的秒数，0 表示放行
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return 0.0
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if self.state == OPEN or self._probes >= self.half_open_max_calls:
+                return max(0.0, remaining)
+            return 0.0
+
+    def before_request(self, key: str = "") -> None:
+        """
+        请求前检查，熔断时抛出 CircuitOpenError
+
+        Args:
+            key: 主机或接口（用于错误信息）
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            now = time.monotonic()
+            remaining = self.cooldown - (now - self._opened_at)
+            if self.state == OPEN:
+                if remaining > 0:
+                    raise CircuitOpenError(key, remaining)
+                self.state = HALF_OPEN
+                self._opened_at = now
+                self._probes = 0
+                self._probe_successes = 0
+            elif self._probes >= self.half_open_max_calls:
+                # 探测请求未回报结果（如被中断）时，冷却期过后允许重新探测
+                if remaining > 0:
+                    raise CircuitOpenError(key, remaining)
+                self._opened_at = now
+                self._probes = 0
+                self._probe_successes = 0
+
+            self._probes += 1
+
+    def record_success(self) -> None:
+        """记录一次成功请求"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    self.state = CLOSED
+                    self._results.clear()
+            elif self.state == CLOSED:
+                self._results.append(True)
+
+    def record_failure(self) -> None:
+        """记录一次失败请求（超时、连接错误、5xx）"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._open(now)
+                return
+            if self.state == OPEN:
+                return
+
+            self._results.append(False)
+            if len(self._results) >= self.min_calls:
+                failures = self._results.count(False)
+                if failures / len(self._results) >= self.failure_threshold:
+                    self._open(now)
+
+
+class CircuitBreakerRegistry:
+    """
+    按主机（或接口）划分的熔断器集合
+
+    同一实例可被多个爬虫共享（由 CrawlerManager 注入），
+    一个爬虫触发的熔断对访问同一上游的其他爬虫同样生效。
+    """
+
+    def __init__(
+        self,
+        scope: str = "host",
+        failure_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        初始化熔断器集合
+
+        Args:
+            scope: 熔断粒度，"host" 按主机，"endpoint" 按主机 + 路径
+            其余参数见 CircuitBreaker
+        """
+        if scope not in ("host", "endpoint"):
+            raise ValueError(f"不支持的熔断粒度: {scope}")
+        self.scope = scope
+        self.failure_threshold = failure_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> Optional["CircuitBreakerRegistry"]:
+        """
+        从爬虫配置创建熔断器集合
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            熔断器集合，未启用时返回 None
+        """
+        if not config.circuit_breaker:
+            return None
+        return cls(
+            scope=config.circuit_scope,
+            failure_threshold=config.circuit_failure_threshold,
+            window_size=config.circuit_window,
+            min_calls=config.circuit_min_calls,
+            cooldown=config.circuit_cooldown
+        )
+
+    def get_key(self, url: str) -> str:
+        """
+        获取 URL 对应的熔断键
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            主机名，或主机名 + 路径
+        """
+        parsed = urlparse(url)
+        if not parsed.netloc:
+            return url
+        if self.scope == "endpoint":
+            return f"{parsed.netloc}{parsed.path}"
+        return parsed.netloc
+
+    def get_breaker(self, url: str) -> CircuitBreaker:
+        """
+        获取 URL 所属主机（或接口）的熔断器
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            熔断器
+        """
+        key = self.get_key(url)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(
+                        failure_threshold=self.failure_threshold,
+                        window_size=self.window_size,
+                        min_calls=self.min_calls,
+                        cooldown=self.cooldown,
+                        half_open_max_calls=self.half_open_max_calls
+                    )
+                    self._breakers[key] = breaker
+        return breaker
+
+    def before_request(self, url: str) -> None:
+        """
+        请求前检查，熔断时抛出 CircuitOpenError
+
+        Args:
+            url: 请求 URL
+        """
+        self.get_breaker(url).before_request(self.get_key(url))
+
+    def retry_after(self, url: str) -> float:
+        """
+        查询 URL 是否处于熔断中（不占用探测名额）
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            距离允许请求还需等待的秒数，0 表示放行
+        """
+        return self.get_breaker(url).retry_after()
+
+    def record(self, url: str, success: bool) -> None:
+        """
+        记录请求结果
+
+        Args:
+            url: 请求 URL
+            success: 是否成功
+        """
+        breaker = self.get_breaker(url)
+        if success:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def states(self) -> Dict[str, str]:
+        """
+        获取所有熔断器的状态
+
+        Returns:
+            {熔断键: 状态}
+        """
+        with self._lock:
+            return {key: breaker.state for key, breaker in self._breakers.items()}
@@ -0,0 +1,130 @@
+"""
+Cron 表达式模块
+解析标准 5 字段 cron 表达式（分 时 日 月 周），计算下一次触发时间
+"""
+from datetime import datetime, timedelta
+from typing import FrozenSet, Tuple
+
+# 各字段的取值范围
+_FIELDS: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),  # 0 和 7 都表示周日
+)
+
+# 常用别名
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# 查找下一次触发时间的最大迭代次数（防止 "0 0 31 2 *" 这类永远不会触发的表达式死循环）
+_MAX_STEPS = 100000
+
+
+def _parse_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    """
+    解析单个字段（支持 *、a-b、*/n、a-b/n、a/n 和逗号分隔的列表）
+
+    Raises:
+        ValueError: 字段格式错误或超出范围
+    """
+    values = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"步长必须大于 0: {part}")
+
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, end_text = base.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(base)
+            end = high if step_text else start
+
+        if not low <= start <= end <= high:
+            raise ValueError(f"取值超出范围 {low}-{high}: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """
+    Cron 表达式（本地时间）
+
+    日和周都被限制时（都不是 *），满足任意一个即触发，与标准 cron 一致。
+    """
+
+    def __init__(self, expression: str):
+        """
+        解析 cron 表达式
+
+        Args:
+            expression: 5 字段表达式（如 "*/15 * * * *"、"0 3 * * 1-5"）或别名（如 "@hourly"）
+
+        Raises:
+            ValueError: 表达式格式错误
+        """
+        self.expression = expression
+        fields = ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式需要 5 个字段（分 时 日 月 周）: {expression!r}")
+
+        try:
+            parsed = [_parse_field(text, low, high) for text, (_, low, high) in zip(fields, _FIELDS)]
+        except ValueError as e:
+            raise ValueError(f"无效的 cron 表达式 {expression!r}: {e}") from None
+
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 统一为 Python 的星期（周一为 0），cron 中 0 和 7 表示周日
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        计算严格晚于指定时间的下一次触发时间
+
+        Args:
+            moment: 起始时间
+
+        Returns:
+            下一次触发时间（秒和微秒为 0）
+
+        Raises:
+            ValueError: 表达式永远不会触发
+        """
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(_MAX_STEPS):
+            if t.month not in self.months:
+                # 跳到下个月 1 日 0 点
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron 表达式永远不会触发: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
@@ -0,0 +1,156 @@
+"""
+数据指纹存储
+按爬虫和键（如箱子 qaq_id）记录上次成功处理的原始数据哈希，
+数据未变化时跳过转换、写文件和入库
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable, Tuple
+
+from crawler.config.config import CrawlerConfig
+from crawler.core.json_codec import JSONCodec
+
+
+class FingerprintStore:
+    """
+    数据指纹存储（SQLite 存储）
+
+    与 ValidatorCache 相同，新指纹先放入待提交区，只有数据处理成功后才提交，
+    避免"数据没保存成功，下次却因为指纹相同被跳过"的情况。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化指纹存储
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " crawler TEXT,"
+            " key TEXT,"
+            " digest TEXT,"
+            " updated_at REAL,"
+            " PRIMARY KEY (crawler, key))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> Optional["FingerprintStore"]:
+        """
+        从爬虫配置创建指纹存储
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            指纹存储，未启用时返回 None
+        """
+        if not config.skip_unchanged:
+            return None
+        return cls(config.fingerprint_path)
+
+    @staticmethod
+    def digest(data: Any, codec: JSONCodec) -> str:
+        """
+        计算数据指纹（按键排序后的 JSON 的 SHA-256）
+
+        Args:
+            data: 原始数据
+            codec: JSON 编解码器
+
+        Returns:
+            十六进制指纹
+        """
+        return hashlib.sha256(codec.dumps(data, sort_keys=True)).hexdigest()
+
+    def get(self, crawler: str, key: str) -> Optional[str]:
+        """
+        获取已提交的指纹
+
+        Args:
+            crawler: 爬虫名称
+            key: 数据键
+
+        Returns:
+            指纹，不存在返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM fingerprints WHERE crawler = ? AND key = ?", (crawler, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def check(self, crawler: str, key: str, digest: str) -> bool:
+        """
+        检查数据是否变化；变化时记录待提交的新指纹
+
+        Args:
+            crawler: 爬虫名称
+            key: 数据键
+            digest: 本次数据的指纹
+
+        Returns:
+            数据是否变化
+        """
+        if self.get(crawler, key) == digest:
+            return False
+        with self._lock:
+            self._pending[(crawler, key)] = digest
+        return True
+
+    def commit(self, crawler: str, keys: Optional[Iterable[str]] = None) -> int:
+        """
+        提交指定爬虫待提交的指纹
+
+        Args:
+            crawler: 爬虫名称
+            keys: 要提交的数据键，None 表示该爬虫的全部
+
+        Returns:
+            提交的条数
+        """
+        with self._lock:
+            if keys is None:
+                keys = [key for name, key in self._pending if name == crawler]
+            rows = []
+            for key in keys:
+                digest = self._pending.pop((crawler, key), None)
+                if digest:
+                    rows.append((crawler, key, digest, time.time()))
+            if rows:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO fingerprints (crawler, key, digest, updated_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        return len(rows)
+
+    def discard(self, crawler: str) -> None:
+        """
+        丢弃指定爬虫待提交的指纹（运行失败时调用）
+
+        Args:
+            crawler: 爬虫名称
+        """
+        with self._lock:
+            for pending_key in [k for k in self._pending if k[0] == crawler]:
+                del self._pending[pending_key]
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
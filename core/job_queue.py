@@ -0,0 +1,356 @@
+"""
+任务队列
+把爬取工作拆成独立任务（如一个箱子一个任务），由多个工作进程领取执行。
+支持租约、可见性超时、确认和去重：工作进程崩溃后，租约到期的任务会被其他工作进程重新领取
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from crawler.config.config import CrawlerConfig
+
+
+@dataclass
+class Job:
+    """已领取的任务"""
+    id: Any  # 队列内的任务 ID
+    payload: Dict[str, Any] = field(default_factory=dict)
+    key: Optional[str] = None  # 去重键
+    attempts: int = 0  # 已领取次数（含本次）
+    lease_token: Optional[str] = None  # 本次租约的凭证，确认 / 放回时校验
+    leased_until: float = 0.0  # 租约到期时间（Unix 时间戳）
+
+
+class JobQueue(ABC):
+    """
+    任务队列接口
+
+    任务被领取后在 visibility_timeout 秒内对其他工作进程不可见；
+    工作进程处理完调用 ack() 确认，失败调用 nack() 放回（超过 max_attempts 次后标记为失败）；
+    未确认就崩溃的任务在租约到期后自动重新可见。
+    同一去重键的任务在等待或处理中时，重复入队会被忽略。
+    多台机器共同处理时需要基于消息中间件（Redis、SQS 等）实现该接口。
+    """
+
+    @abstractmethod
+    def enqueue(self, payload: Dict[str, Any], key: Optional[str] = None, delay: float = 0.0) -> bool:
+        """
+        添加任务
+
+        Args:
+            payload: 任务内容（可 JSON 序列化）
+            key: 去重键，None 表示不去重
+            delay: 延迟多少秒后可被领取
+
+        Returns:
+            是否已添加（同一去重键的任务在等待或处理中时返回 False）
+        """
+        pass
+
+    def enqueue_many(self, items: Iterable[Tuple[Dict[str, Any], Optional[str]]]) -> int:
+        """
+        批量添加任务
+
+        Args:
+            items: (任务内容, 去重键) 列表
+
+        Returns:
+            实际添加的任务数
+        """
+        return sum(1 for payload, key in items if self.enqueue(payload, key))
+
+    @abstractmethod
+    def lease(self, limit: int = 1, visibility_timeout: Optional[float] = None) -> List[Job]:
+        """
+        领取任务
+
+        Args:
+            limit: 最多领取的任务数
+            visibility_timeout: 租约时长（秒），None 使用队列默认值
+
+        Returns:
+            领取到的任务（队列为空时为空列表）
+        """
+        pass
+
+    @abstractmethod
+    def ack(self, job: Job) -> bool:
+        """
+        确认任务完成
+
+        Args:
+            job: 已领取的任务
+
+        Returns:
+            是否确认成功（租约已过期并被其他工作进程领取时返回 False）
+        """
+        pass
+
+    @abstractmethod
+    def nack(self, job: Job, error: Optional[str] = None, delay: float = 0.0) -> bool:
+        """
+        任务处理失败，放回队列（领取次数达到上限时标记为失败，不再领取）
+
+        Args:
+            job: 已领取的任务
+            error: 错误信息
+            delay: 延迟多少秒后可再次被领取
+
+        Returns:
+            是否操作成功（租约已失效时返回 False）
+        """
+        pass
+
+    @abstractmethod
+    def extend(self, job: Job, visibility_timeout: Optional[float] = None) -> bool:
+        """
+        延长租约（处理时间可能超过可见性超时时定期调用）
+
+        Args:
+            job: 已领取的任务
+            visibility_timeout: 从现在起的租约时长（秒），None 使用队列默认值
+
+        Returns:
+            是否延长成功（租约已失效时返回 False）
+        """
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取各状态的任务数
+
+        Returns:
+            {状态: 任务数}
+        """
+        return {}
+
+    def close(self) -> None:
+        """释放资源"""
+        pass
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig, name: str = "default") -> "JobQueue":
+        """
+        从爬虫配置创建任务队列
+
+        Args:
+            config: 爬虫配置
+            name: 队列名称（同一存储中的不同队列互不影响）
+
+        Returns:
+            任务队列（本地 SQLite 实现）
+        """
+        return SQLiteJobQueue(
+            config.job_queue_path,
+            name=name,
+            visibility_timeout=config.job_visibility_timeout,
+            max_attempts=config.job_max_attempts
+        )
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    基于 SQLite 的任务队列
+
+    只适用于同一台机器上的多个进程：数据库使用 WAL 模式，依赖本机共享内存，
+    不能放在 NFS、SMB 等网络文件系统上供多台机器共用。
+    领取任务在 BEGIN IMMEDIATE 事务中完成，同一任务不会同时被两个工作进程领取。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "default",
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5
+    ):
+        """
+        初始化任务队列
+
+        Args:
+            path: SQLite 数据库文件路径
+            name: 队列名称
+            visibility_timeout: 默认租约时长（秒）
+            max_attempts: 每个任务最多领取次数，达到后标记为失败
+        """
+        self.path = path
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # 自动提交模式，事务由 BEGIN IMMEDIATE 显式开启；其他进程持有写锁时最多等待 30 秒
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " queue TEXT NOT NULL,"
+            " key TEXT,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"  # pending / leased / done / failed
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_token TEXT,"
+            " available_at REAL NOT NULL,"  # pending: 可领取时间；leased: 租约到期时间
+            " last_error TEXT,"
+            " created_at REAL,"
+            " updated_at REAL)"
+        )
+        # 等待或处理中的任务按去重键唯一，完成后可以再次入队
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs (queue, key)"
+            " WHERE key IS NOT NULL AND status IN ('pending', 'leased')"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_available ON jobs (queue, status, available_at)"
+        )
+
+    def enqueue(self, payload: Dict[str, Any], key: Optional[str] = None, delay: float = 0.0) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (queue, key, payload, status, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'pending', ?, ?, ?)",
+                (self.name, key, json.dumps(payload, ensure_ascii=False), now + delay, now, now)
+            )
+        return cursor.rowcount > 0
+
+    def enqueue_many(self, items: Iterable[Tuple[Dict[str, Any], Optional[str]]]) -> int:
+        now = time.time()
+        rows = [
+            (self.name, key, json.dumps(payload, ensure_ascii=False), now, now, now)
+            for payload, key in items
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (queue, key, payload, status, available_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, 'pending', ?, ?, ?)",
+                    rows
+                )
+                added = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def lease(self, limit: int = 1, visibility_timeout: Optional[float] = None) -> List[Job]:
+        timeout = self.visibility_timeout if visibility_timeout is None else visibility_timeout
+        jobs = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                # 租约到期且已达到领取上限的任务（工作进程反复崩溃）标记为失败
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', lease_token = NULL, updated_at = ?,"
+                    " last_error = COALESCE(last_error, '租约到期未确认')"
+                    " WHERE queue = ? AND status = 'leased' AND available_at <= ? AND attempts >= ?",
+                    (now, self.name, now, self.max_attempts)
+                )
+                # 等待中的任务和租约已到期的任务都可以领取
+                rows = self._conn.execute(
+                    "SELECT id, key, payload, attempts FROM jobs"
+                    " WHERE queue = ? AND status IN ('pending', 'leased') AND available_at <= ?"
+                    " ORDER BY available_at, id LIMIT ?",
+                    (self.name, now, max(1, limit))
+                ).fetchall()
+                for job_id, key, payload, attempts in rows:
+                    token = uuid.uuid4().hex
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'leased', lease_token = ?, attempts = ?,"
+                        " available_at = ?, updated_at = ? WHERE id = ?",
+                        (token, attempts + 1, now + timeout, now, job_id)
+                    )
+                    jobs.append(Job(
+                        id=job_id,
+                        payload=json.loads(payload),
+                        key=key,
+                        attempts=attempts + 1,
+                        lease_token=token,
+                        leased_until=now + timeout
+                    ))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def _update_leased(self, job: Job, sql: str, params: tuple) -> bool:
+        """只更新仍持有租约的任务"""
+        with self._lock:
+            cursor = self._conn.execute(
+                sql + " WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                params + (job.id, job.lease_token)
+            )
+        return cursor.rowcount > 0
+
+    def ack(self, job: Job) -> bool:
+        return self._update_leased(
+            job,
+            "UPDATE jobs SET status = 'done', lease_token = NULL, last_error = NULL, updated_at = ?",
+            (time.time(),)
+        )
+
+    def nack(self, job: Job, error: Optional[str] = None, delay: float = 0.0) -> bool:
+        now = time.time()
+        status = "failed" if job.attempts >= self.max_attempts else "pending"
+        return self._update_leased(
+            job,
+            "UPDATE jobs SET status = ?, lease_token = NULL, last_error = ?, available_at = ?, updated_at = ?",
+            (status, error, now + delay, now)
+        )
+
+    def extend(self, job: Job, visibility_timeout: Optional[float] = None) -> bool:
+        now = time.time()
+        timeout = self.visibility_timeout if visibility_timeout is None else visibility_timeout
+        extended = self._update_leased(
+            job,
+            "UPDATE jobs SET available_at = ?, updated_at = ?",
+            (now + timeout, now)
+        )
+        if extended:
+            job.leased_until = now + timeout
+        return extended
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE queue = ? GROUP BY status", (self.name,)
+            ).fetchall()
+        return {"pending": 0, "leased": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def purge(self, statuses: Iterable[str] = ("done",)) -> int:
+        """
+        删除指定状态的任务
+
+        Args:
+            statuses: 要删除的状态
+
+        Returns:
+            删除的任务数
+        """
+        statuses = list(statuses)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE queue = ? AND status IN ({', '.join('?' * len(statuses))})",
+                (self.name, *statuses)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
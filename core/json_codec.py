@@ -0,0 +1,97 @@
+"""
+JSON 编解码器
+安装了 orjson 时直接从响应字节解码（无需先转成 str），否则回退到标准库 json
+"""
+import json
+import logging
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class JSONCodec:
+    """JSON 编解码器（标准库实现）"""
+
+    name = "stdlib"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        解码 JSON
+
+        Args:
+            data: JSON 字节串或字符串
+
+        Returns:
+            解码后的对象
+        """
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+        """
+        编码为 UTF-8 JSON 字节串（不转义非 ASCII 字符）
+
+        Args:
+            obj: 要编码的对象
+            indent: 是否使用 2 空格缩进
+            sort_keys: 是否按键排序（用于生成稳定的指纹）
+
+        Returns:
+            JSON 字节串（与 orjson 的输出格式一致）
+        """
+        if indent:
+            text = json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+        else:
+            # 与 orjson 一致的紧凑格式
+            text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+        return text.encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """基于 orjson 的 JSON 编解码器"""
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+
+
+_codecs: Dict[str, JSONCodec] = {}
+
+
+def get_codec(name: str = "auto") -> JSONCodec:
+    """
+    获取 JSON 编解码器
+
+    Args:
+        name: "auto"（有 orjson 则用 orjson）、"orjson" 或 "stdlib"
+
+    Returns:
+        编解码器实例
+    """
+    if name == "auto":
+        name = "orjson" if ORJSON_AVAILABLE else "stdlib"
+
+    if name == "orjson" and not ORJSON_AVAILABLE:
+        logging.getLogger("JSONCodec").warning("orjson 未安装，回退到标准库 json（安装方法: pip install orjson）")
+        name = "stdlib"
+
+    if name not in ("orjson", "stdlib"):
+        raise ValueError(f"不支持的 JSON 编解码器: {name}")
+
+    codec = _codecs.get(name)
+    if codec is None:
+        codec = OrjsonCodec() if name == "orjson" else JSONCodec()
+        _codecs[name] = codec
+    return codec
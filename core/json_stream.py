@@ -0,0 +1,230 @@
+"""
+流式 JSON 解析
+从分块到达的响应体中逐条解析出数据列表中的元素，无需先构造完整文档
+"""
+import codecs
+import json
+from typing import Iterable, Iterator, Optional, Tuple, Any, List, Dict
+
+from crawler.core.json_codec import JSONCodec, get_codec
+
+# 与 BaseCrawler.extract_items 一致的数据列表字段
+DEFAULT_ITEM_KEYS = ("data", "list", "items", "results")
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+
+class _StreamBuffer:
+    """分块文本缓冲区，按需读取后续数据块"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        读取更多数据：至少追加与当前未消费部分等量的数据，
+        使反复重试解析的总代价保持线性
+
+        Returns:
+            是否读到了新数据
+        """
+        if self.eof:
+            return False
+
+        # 丢弃已消费的部分
+        self.text = self.text[self.pos:]
+        self.pos = 0
+
+        target = max(len(self.text), 1)
+        parts = []
+        size = 0
+        while size < target:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                parts.append(self._decoder.decode(b"", final=True))
+                self.eof = True
+                break
+            if chunk:
+                part = self._decoder.decode(chunk)
+                parts.append(part)
+                size += len(part)
+
+        self.text += "".join(parts)
+        return size > 0 or bool(parts and parts[-1])
+
+    def peek(self) -> Optional[str]:
+        """跳过空白并返回下一个字符，数据结束时返回 None"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char: str) -> None:
+        """消费指定字符"""
+        actual = self.peek()
+        if actual != char:
+            raise ValueError(f"JSON 格式错误: 期望 {char!r}，实际为 {actual!r}")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        """解析下一个完整的 JSON 值"""
+        if self.peek() is None:
+            raise ValueError("JSON 数据不完整")
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # 值恰好在缓冲区末尾，或数字后面不是分隔符时（如 "1." 可能是 "1.5" 的一部分），
+            # 需要读取更多数据确认
+            truncated = end == len(self.text) or (
+                isinstance(value, (int, float)) and self.text[end] not in _DELIMITERS
+            )
+            if truncated and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(buffer: _StreamBuffer) -> Iterator[Any]:
+    """逐个解析数组元素（缓冲区位于 '[' 处）"""
+    buffer.expect("[")
+    if buffer.peek() == "]":
+        buffer.pos += 1
+        return
+    while True:
+        yield buffer.decode_value()
+        char = buffer.peek()
+        buffer.pos += 1
+        if char is None:
+            raise ValueError("JSON 数据不完整")
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"JSON 格式错误: 数组中出现 {char!r}")
+
+
+def iter_json_items(
+    chunks: Iterable[bytes],
+    keys: Tuple[str, ...] = DEFAULT_ITEM_KEYS
+) -> Iterator[Dict[str, Any]]:
+    """
+    流式解析数据列表
+
+    规则与 BaseCrawler.extract_items 一致：顶层是数组时逐条返回数组元素；
+    顶层是对象时按 keys 的顺序（优先级）取第一个值为数组的字段，返回其元素；
+    都不满足时把整个对象作为一条数据返回。
+
+    只有优先级更高的字段都已出现（且不是数组）时才能流式返回当前数组，
+    否则先完整解析该数组，读完整个对象后再按优先级选择。
+    常见的 {"code": ..., "data": [...]} 响应中 data 优先级最高，总是流式返回。
+
+    Args:
+        chunks: 响应体数据块（UTF-8 字节）
+        keys: 数据列表所在的字段名（按优先级排列）
+
+    Yields:
+        数据项
+    """
+    buffer = _StreamBuffer(chunks)
+    first = buffer.peek()
+
+    if first == "[":
+        yield from _iter_array(buffer)
+        return
+
+    if first != "{":
+        value = buffer.decode_value()
+        if isinstance(value, dict):
+            yield value
+        return
+
+    # 顶层对象：逐个字段解析，遇到可以确定是最终结果的数组字段时开始流式返回
+    buffer.expect("{")
+    skipped = {}
+    best: Optional[Tuple[int, List[Any]]] = None  # 已完整解析的候选数组（优先级, 元素）
+    if buffer.peek() == "}":
+        buffer.pos += 1
+    else:
+        while True:
+            key = buffer.decode_value()
+            buffer.expect(":")
+            if key in keys and buffer.peek() == "[":
+                priority = keys.index(key)
+                if best is None and all(k in skipped for k in keys[:priority]):
+                    yield from _iter_array(buffer)
+                    return
+                value = buffer.decode_value()
+                if best is None or priority < best[0]:
+                    best = (priority, value)
+                skipped[key] = value
+            else:
+                skipped[key] = buffer.decode_value()
+
+            char = buffer.peek()
+            buffer.pos += 1
+            if char is None:
+                raise ValueError("JSON 数据不完整")
+            if char == "}":
+                break
+            if char != ",":
+                raise ValueError(f"JSON 格式错误: 对象中出现 {char!r}")
+
+    if best is not None:
+        yield from best[1]
+        return
+
+    # 没有数据列表：整个对象就是一条数据
+    yield skipped
+
+
+class JSONArrayWriter:
+    """
+    增量写入 JSON 数组文件
+    与 BaseCrawler.save_to_file 的输出格式一致，但不需要把所有数据放在内存中
+    """
+
+    def __init__(self, filename: str, codec: Optional[JSONCodec] = None):
+        """
+        初始化写入器
+
+        Args:
+            filename: 文件路径
+            codec: JSON 编解码器，None 时使用默认编解码器
+        """
+        self.filename = filename
+        self.codec = codec or get_codec()
+        self._file = open(filename, "wb")
+        self._file.write(b"[")
+        self._count = 0
+
+    def write_items(self, items: List[Dict[str, Any]]) -> None:
+        """
+        追加数据项
+
+        Args:
+            items: 数据项列表
+        """
+        for item in items:
+            self._file.write(b",\n" if self._count else b"\n")
+            text = self.codec.dumps(item, indent=True)
+            self._file.write(b"  " + text.replace(b"\n", b"\n  "))
+            self._count += 1
+
+    def close(self) -> None:
+        """结束数组并关闭文件"""
+        self._file.write(b"\n]" if self._count else b"]")
+        self._file.close()
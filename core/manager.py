@@ -3,11 +3,25 @@
 统一管理所有爬虫的注册、运行和调度
 """
 import logging
-from typing import Dict, List, Optional, Type
+import random
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, Type
 from datetime import datetime
 
 from crawler.config.config import Config
 from crawler.core.base import BaseCrawler
+from crawler.core.browser_crawler import BrowserCrawler
+from crawler.core.browser_pool import BrowserPool
+from crawler.core.rate_limiter import RateLimiter
+from crawler.core.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from crawler.core.cron import CronExpression
+from crawler.core.proxy_pool import ProxyPool
+from crawler.core.singleflight import SingleFlight
 
 
 class CrawlerManager:
@@ -24,17 +38,44 @@ class CrawlerManager:
         self.crawlers: Dict[str, BaseCrawler] = {}
         self.logger = logging.getLogger("CrawlerManager")
         
+        # 所有爬虫共享的按主机限流器
+        self.rate_limiter = RateLimiter.from_config(self.config.crawler)
+        
+        # 所有爬虫共享的熔断器集合（未启用时为 None）
+        self.circuit_breaker = CircuitBreakerRegistry.from_config(self.config.crawler)
+        
+        # 所有爬虫共享的代理池（健康评分在爬虫之间共享；未配置代理时为 None）
+        self.proxy_pool = ProxyPool.from_config(self.config.crawler)
+        
+        # 所有爬虫共享的并发请求合并
+        self.single_flight = SingleFlight() if self.config.crawler.single_flight else None
+        
+        # 所有浏览器爬虫共享的浏览器池（第一次拦截时才启动浏览器）
+        self.browser_pool = BrowserPool.from_config(self.config.crawler)
+        
+        # 定时调度（run_scheduler() 时才启动）
+        self.scheduler = CrawlerScheduler(self)
+        
         # 验证配置
         if not self.config.validate():
             self.logger.warning("配置验证失败，某些功能可能无法使用")
     
-    def register(self, crawler: BaseCrawler) -> None:
+    def register(self, crawler: BaseCrawler, depends_on: Optional[List[str]] = None) -> None:
         """
         注册爬虫
         
         Args:
             crawler: 爬虫实例
+            depends_on: 依赖的爬虫名称（覆盖爬虫自身的 depends_on），run_all 在它们成功后才运行该爬虫
         """
+        if depends_on is not None:
+            crawler.depends_on = list(depends_on)
+        crawler.rate_limiter = self.rate_limiter
+        crawler.circuit_breaker = self.circuit_breaker
+        crawler.proxy_pool = self.proxy_pool
+        crawler.single_flight = self.single_flight
+        if isinstance(crawler, BrowserCrawler):
+            crawler.browser_pool = self.browser_pool
         self.crawlers[crawler.name] = crawler
         self.logger.info(f"注册爬虫: {crawler.name}")
     
@@ -42,6 +83,7 @@ class CrawlerManager:
         self,
         crawler_class: Type[BaseCrawler],
         name: Optional[str] = None,
+        depends_on: Optional[List[str]] = None,
         **kwargs
     ) -> BaseCrawler:
         """
@@ -50,6 +92,7 @@ class CrawlerManager:
         Args:
             crawler_class: 爬虫类
             name: 爬虫名称（如果为 None，使用类名）
+            depends_on: 依赖的爬虫名称（覆盖爬虫自身的 depends_on）
             **kwargs: 传递给爬虫构造函数的参数
             
         Returns:
@@ -59,7 +102,7 @@ class CrawlerManager:
             name = crawler_class.__name__
         
         crawler = crawler_class(config=self.config, name=name, **kwargs)
-        self.register(crawler)
+        self.register(crawler, depends_on)
         return crawler
     
     def get_crawler(self, name: str) -> Optional[BaseCrawler]:
@@ -100,23 +143,216 @@ class CrawlerManager:
                 "error": f"爬虫 '{name}' 未注册"
             }
         
+        # 上游处于熔断中：不运行，直接返回失败
+        if self.circuit_breaker and crawler.target_url:
+            retry_after = self.circuit_breaker.retry_after(crawler.target_url)
+            if retry_after > 0:
+                error = str(CircuitOpenError(self.circuit_breaker.get_key(crawler.target_url), retry_after))
+                self.logger.warning(f"跳过爬虫 {name}: {error}")
+                return {
+                    "crawler_name": name,
+                    "success": False,
+                    "status": "circuit_open",
+                    "error": error
+                }
+        
         self.logger.info(f"运行爬虫: {name}")
         result = crawler.run()
         return result
     
-    def run_all(self) -> Dict[str, Dict]:
+    def get_page_groups(self) -> List[List[BrowserCrawler]]:
         """
-        运行所有已注册的爬虫
+        按页面分组可以共用页面加载的浏览器爬虫
         
         Returns:
-            所有爬虫的运行结果字典
+            爬虫分组列表（只包含两个及以上爬虫访问同一页面的分组）
+        """
+        groups: Dict[str, List[BrowserCrawler]] = {}
+        for crawler in self.crawlers.values():
+            if isinstance(crawler, BrowserCrawler) and crawler.can_share_page_load():
+                groups.setdefault(crawler.page_url, []).append(crawler)
+        return [group for group in groups.values() if len(group) > 1]
+    
+    def run_page_group(self, crawlers: List[BrowserCrawler]) -> Dict[str, Dict]:
+        """
+        一次页面加载运行访问同一页面的多个浏览器爬虫
+        由第一个爬虫拦截所有爬虫的 API 模式，拦截到的数据交给对应爬虫的 process() 处理
+        
+        Args:
+            crawlers: 访问同一页面的浏览器爬虫
+            
+        Returns:
+            {爬虫名称: 运行结果字典}
         """
+        leader = crawlers[0]
+        names = [crawler.name for crawler in crawlers]
+        
+        if self.circuit_breaker:
+            retry_after = self.circuit_breaker.retry_after(leader.page_url)
+            if retry_after > 0:
+                error = str(CircuitOpenError(self.circuit_breaker.get_key(leader.page_url), retry_after))
+                self.logger.warning(f"跳过爬虫 {', '.join(names)}: {error}")
+                return {
+                    name: {"crawler_name": name, "success": False, "status": "circuit_open", "error": error}
+                    for name in names
+                }
+        
+        self.logger.info(f"运行爬虫: {', '.join(names)}（共用页面 {leader.page_url}）")
+        for crawler in crawlers:
+            crawler.begin_sync()
+        try:
+            payloads = leader.intercept_apis({crawler.name: crawler.api_pattern for crawler in crawlers})
+        except Exception as e:
+            for crawler in crawlers:
+                crawler.finish_sync({"success": False, "error": str(e)})
+            raise
+        
         results = {}
+        for crawler in crawlers:
+            payload = payloads.get(crawler.name)
+            results[crawler.name] = crawler.process(crawler.extract_items(payload) if payload else None)
+            crawler.finish_sync(results[crawler.name])
+        return results
+    
+    def build_graph(self) -> Tuple[Dict[str, List[BaseCrawler]], Dict[str, Set[str]]]:
+        """
+        按 depends_on 构建运行图
+        访问同一页面的浏览器爬虫合并为一个节点（共用一次页面加载），除非它们之间互相依赖
+        
+        Returns:
+            (节点: {节点名: 爬虫列表}, 依赖: {节点名: 依赖的节点名集合})，节点按注册顺序排列
+            
+        Raises:
+            ValueError: 依赖关系存在环
+        """
+        groups = {crawler.name: group for group in self.get_page_groups() for crawler in group}
+        node_of: Dict[str, str] = {}
+        nodes: Dict[str, List[BaseCrawler]] = {}
+        for name, crawler in self.crawlers.items():
+            if name in node_of:
+                continue
+            group = groups.get(name, [crawler])
+            members = {member.name for member in group}
+            if len(group) > 1 and any(dep in members for member in group for dep in member.depends_on):
+                group = [crawler]
+            nodes[name] = group
+            for member in group:
+                node_of[member.name] = name
+        
+        deps: Dict[str, Set[str]] = {}
+        for node, group in nodes.items():
+            deps[node] = set()
+            for crawler in group:
+                for dep in crawler.depends_on:
+                    if dep not in node_of:
+                        self.logger.warning(f"爬虫 {crawler.name} 依赖的 {dep} 未注册，忽略该依赖")
+                    elif node_of[dep] != node:
+                        deps[node].add(node_of[dep])
+        
+        # 检查环（拓扑排序后仍有剩余节点即存在环）
+        remaining = {node: set(d) for node, d in deps.items()}
+        while remaining:
+            ready = [node for node, d in remaining.items() if not d]
+            if not ready:
+                raise ValueError(f"爬虫依赖关系存在环: {', '.join(sorted(remaining))}")
+            for node in ready:
+                del remaining[node]
+            for d in remaining.values():
+                d.difference_update(ready)
+        
+        return nodes, deps
+    
+    def _run_node(self, crawlers: List[BaseCrawler]) -> Dict[str, Dict]:
+        """运行一个节点（单个爬虫或共用页面加载的一组浏览器爬虫）"""
+        try:
+            if len(crawlers) > 1:
+                return self.run_page_group(crawlers)
+            return {crawlers[0].name: self.run_crawler(crawlers[0].name)}
+        except Exception as e:
+            self.logger.error(f"爬虫运行失败: {', '.join(c.name for c in crawlers)}, 错误: {e}", exc_info=True)
+            return {c.name: {"crawler_name": c.name, "success": False, "error": str(e)} for c in crawlers}
+    
+    def iter_run_all(self, parallelism: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        按依赖关系并发运行所有已注册的爬虫，每个爬虫完成后立即返回其结果
+        
+        依赖的爬虫全部成功后才运行；上游失败时，所有直接或间接依赖它的爬虫不再运行，
+        以 status 为 "skipped" 的结果返回。
+        
+        Args:
+            parallelism: 同时运行的爬虫数，None 使用配置中的 crawler_parallelism
+            
+        Yields:
+            (爬虫名称, 运行结果字典)，按完成顺序
+            
+        Raises:
+            ValueError: 依赖关系存在环（在运行任何爬虫之前检查）
+        """
+        nodes, deps = self.build_graph()
+        parallelism = max(1, parallelism or self.config.crawler.crawler_parallelism)
+        dependents: Dict[str, Set[str]] = {node: set() for node in nodes}
+        for node, d in deps.items():
+            for dep in d:
+                dependents[dep].add(node)
+        
+        waiting = {node: set(d) for node, d in deps.items()}
+        running: Dict[Future, str] = {}
         
-        self.logger.info(f"开始运行所有爬虫，共 {len(self.crawlers)} 个")
+        self.logger.info(f"开始运行所有爬虫，共 {len(self.crawlers)} 个（并行 {parallelism}）")
         
-        for name in self.crawlers:
-            results[name] = self.run_crawler(name)
+        executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="CrawlerManager")
+        try:
+            while waiting or running:
+                # 提交依赖已满足的节点（按注册顺序）
+                for node in [node for node, d in waiting.items() if not d]:
+                    del waiting[node]
+                    running[executor.submit(self._run_node, nodes[node])] = node
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    node_results = future.result()
+                    yield from node_results.items()
+                    
+                    if all(result.get("success") for result in node_results.values()):
+                        for dependent in dependents[node]:
+                            if dependent in waiting:
+                                waiting[dependent].discard(node)
+                        continue
+                    
+                    # 上游失败：取消所有下游节点
+                    stack = list(dependents[node])
+                    while stack:
+                        dependent = stack.pop()
+                        if dependent not in waiting:
+                            continue
+                        del waiting[dependent]
+                        stack.extend(dependents[dependent])
+                        for crawler in nodes[dependent]:
+                            error = f"上游爬虫 {node} 失败，未运行"
+                            self.logger.warning(f"跳过爬虫 {crawler.name}: {error}")
+                            yield crawler.name, {
+                                "crawler_name": crawler.name,
+                                "success": False,
+                                "status": "skipped",
+                                "error": error
+                            }
+        finally:
+            # 调用方提前停止迭代时不再提交新节点，等待正在运行的爬虫结束
+            executor.shutdown(wait=True)
+    
+    def run_all(self, parallelism: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        运行所有已注册的爬虫（按依赖关系并发调度，见 iter_run_all）
+        
+        Args:
+            parallelism: 同时运行的爬虫数，None 使用配置中的 crawler_parallelism
+            
+        Returns:
+            所有爬虫的运行结果字典（按注册顺序）
+        """
+        results = dict(self.iter_run_all(parallelism))
+        results = {name: results[name] for name in self.crawlers if name in results}
         
         # 统计
         success_count = sum(1 for r in results.values() if r.get("success"))
@@ -138,8 +374,302 @@ class CrawlerManager:
             "crawlers": list(self.crawlers.keys()),
             "config_valid": self.config.validate(),
             "supabase_configured": self.config.supabase is not None,
+            "circuit_breakers": self.circuit_breaker.states() if self.circuit_breaker else {},
+            "proxies": self.proxy_pool.stats() if self.proxy_pool else [],
+            "browser_pool": self.browser_pool.stats(),
+            "schedule": self.scheduler.status(),
             "timestamp": datetime.now().isoformat()
         }
+    
+    def schedule(
+        self,
+        name: str,
+        interval: Optional[float] = None,
+        cron: Optional[str] = None,
+        jitter: float = 0.0,
+        overlap: str = "skip"
+    ) -> "ScheduledJob":
+        """
+        定时运行爬虫（见 CrawlerScheduler.add）
+        
+        Args:
+            name: 爬虫名称
+            interval: 运行间隔（秒），与 cron 二选一
+            cron: cron 表达式（如 "0 */6 * * *"），与 interval 二选一
+            jitter: 每次触发时随机延后 0~jitter 秒，错开多个爬虫的启动时间
+            overlap: 上次运行尚未结束时的处理方式: skip（跳过本次）或 queue（结束后立即补跑一次）
+            
+        Returns:
+            定时任务
+        """
+        return self.scheduler.add(name, interval=interval, cron=cron, jitter=jitter, overlap=overlap)
+    
+    def run_scheduler(self, max_concurrency: Optional[int] = None) -> None:
+        """
+        在当前线程运行调度器，直到 stop_scheduler() 被调用或收到 SIGINT / SIGTERM
+        退出时等待正在运行的爬虫结束，并关闭共享资源
+        
+        Args:
+            max_concurrency: 同时运行的爬虫数，None 使用配置中的 crawler_parallelism
+        """
+        try:
+            self.scheduler.run(max_concurrency)
+        finally:
+            self.close()
+    
+    def stop_scheduler(self) -> None:
+        """停止调度器（不再触发新的运行，正在运行的爬虫继续完成）"""
+        self.scheduler.stop()
+    
+    def close(self) -> None:
+        """关闭共享资源（浏览器池中的浏览器）"""
+        self.browser_pool.close()
 
 
+@dataclass
+class ScheduledJob:
+    """爬虫定时任务"""
+    name: str
+    interval: Optional[float] = None  # 运行间隔（秒）
+    cron: Optional[CronExpression] = None
+    jitter: float = 0.0  # 随机延后的最大秒数
+    overlap: str = "skip"  # skip / queue
+    next_run: float = 0.0  # 下一次计划触发时间（Unix 时间戳，不含抖动）
+    fire_at: float = 0.0  # 下一次实际触发时间（含抖动）
+    running: bool = False
+    queued: bool = False  # 运行结束后是否立即补跑一次
+    run_count: int = 0
+    skipped_count: int = 0
+    last_started: Optional[float] = None
+    last_result: Optional[Dict[str, Any]] = None
+    
+    def schedule_next(self, now: float) -> None:
+        """
+        计算下一次触发时间（间隔任务以上次计划时间为基准，错过的触发不补跑）
+        
+        Args:
+            now: 当前时间（Unix 时间戳）
+        """
+        if self.cron:
+            self.next_run = self.cron.next_after(datetime.fromtimestamp(now)).timestamp()
+        else:
+            self.next_run += self.interval
+            if self.next_run <= now:
+                missed = int((now - self.next_run) // self.interval) + 1
+                self.next_run += missed * self.interval
+        self.fire_at = self.next_run + random.uniform(0, self.jitter)
+
 
+class CrawlerScheduler:
+    """
+    爬虫调度器
+    
+    在一个常驻进程中按间隔或 cron 表达式反复运行已注册的爬虫，
+    爬虫之间共享的会话、缓存和浏览器池在多次运行之间保持。
+    同一爬虫不会重叠运行；同时运行的爬虫数不超过 max_concurrency，
+    超出时到期的爬虫按触发顺序排队等待。
+    """
+    
+    def __init__(self, manager: CrawlerManager, on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """
+        初始化调度器
+        
+        Args:
+            manager: 爬虫管理器
+            on_result: 每次运行结束后的回调，参数为 (爬虫名称, 运行结果字典)
+        """
+        self.manager = manager
+        self.on_result = on_result
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.logger = logging.getLogger("CrawlerScheduler")
+        
+        self._ready: Deque[str] = deque()
+        self._active = 0
+        self._stopping = False
+        self._wakeup = threading.Condition()
+    
+    def add(
+        self,
+        name: str,
+        interval: Optional[float] = None,
+        cron: Optional[str] = None,
+        jitter: float = 0.0,
+        overlap: str = "skip"
+    ) -> ScheduledJob:
+        """
+        添加定时任务（同名任务会被替换）
+        
+        间隔任务在调度器启动时立即运行第一次，cron 任务在下一个匹配时间运行。
+        
+        Args:
+            name: 爬虫名称（必须已注册）
+            interval: 运行间隔（秒），与 cron 二选一
+            cron: cron 表达式，与 interval 二选一
+            jitter: 每次触发时随机延后 0~jitter 秒
+            overlap: 上次运行尚未结束时的处理方式: skip 或 queue
+            
+        Returns:
+            定时任务
+            
+        Raises:
+            ValueError: 参数无效或爬虫未注册
+        """
+        if name not in self.manager.crawlers:
+            raise ValueError(f"爬虫 '{name}' 未注册")
+        if (interval is None) == (cron is None):
+            raise ValueError("interval 和 cron 必须且只能指定一个")
+        if interval is not None and interval <= 0:
+            raise ValueError(f"运行间隔必须大于 0: {interval}")
+        if overlap not in ("skip", "queue"):
+            raise ValueError(f"overlap 只能是 skip 或 queue: {overlap}")
+        
+        job = ScheduledJob(
+            name=name,
+            interval=interval,
+            cron=CronExpression(cron) if cron else None,
+            jitter=max(0.0, jitter),
+            overlap=overlap
+        )
+        now = time.time()
+        if job.cron:
+            job.schedule_next(now)
+        else:
+            job.next_run = now
+            job.fire_at = now + random.uniform(0, job.jitter)
+        
+        with self._wakeup:
+            self.jobs[name] = job
+            self._wakeup.notify()
+        self.logger.info(f"添加定时任务: {name}（{f'每 {interval}s' if interval else f'cron {cron}'}，"
+                         f"抖动 {job.jitter}s，重叠时 {overlap}）")
+        return job
+    
+    def remove(self, name: str) -> None:
+        """
+        移除定时任务（正在运行的不受影响）
+        
+        Args:
+            name: 爬虫名称
+        """
+        with self._wakeup:
+            self.jobs.pop(name, None)
+    
+    def stop(self) -> None:
+        """
+        停止调度（不再触发新的运行，run() 在正在运行的爬虫结束后返回）
+        
+        停止是永久的：在 run() 开始之前调用时 run() 立即返回，停止后的调度器不能再次运行。
+        """
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify()
+    
+    def run(self, max_concurrency: Optional[int] = None) -> None:
+        """
+        运行调度循环（阻塞），直到 stop() 被调用或收到 SIGINT / SIGTERM
+        
+        Args:
+            max_concurrency: 同时运行的爬虫数，None 使用配置中的 crawler_parallelism
+        """
+        max_concurrency = max(1, max_concurrency or self.manager.config.crawler.crawler_parallelism)
+        
+        # 在主线程运行时把 SIGTERM 当作优雅退出
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        
+        self.logger.info(f"调度器已启动: {len(self.jobs)} 个定时任务，最多同时运行 {max_concurrency} 个爬虫")
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="CrawlerScheduler")
+        try:
+            with self._wakeup:
+                while not self._stopping:
+                    now = time.time()
+                    self._collect_due(now)
+                    while self._ready and self._active < max_concurrency:
+                        job = self.jobs.get(self._ready.popleft())
+                        if job is None:
+                            continue
+                        job.running = True
+                        job.last_started = now
+                        self._active += 1
+                        executor.submit(self._run_job, job)
+                    
+                    timeout = min((job.fire_at for job in self.jobs.values()), default=now + 60) - now
+                    self._wakeup.wait(max(timeout, 0.0) if not self._ready else None)
+        except KeyboardInterrupt:
+            self.logger.info("收到中断信号")
+        finally:
+            self.logger.info("调度器正在停止，等待正在运行的爬虫结束...")
+            with self._wakeup:
+                self._stopping = True
+                self._ready.clear()
+            executor.shutdown(wait=True)
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            self.logger.info("调度器已停止")
+    
+    def _collect_due(self, now: float) -> None:
+        """把到期的任务放入待运行队列（调用方持有锁）"""
+        for job in self.jobs.values():
+            if job.fire_at > now:
+                continue
+            job.schedule_next(now)
+            
+            if job.name in self._ready:
+                # 上次触发还在等待空闲名额，本次与之合并
+                continue
+            if job.running:
+                if job.overlap == "queue":
+                    job.queued = True
+                else:
+                    job.skipped_count += 1
+                    self.logger.warning(f"爬虫 {job.name} 上次运行尚未结束，跳过本次")
+                continue
+            self._ready.append(job.name)
+    
+    def _run_job(self, job: ScheduledJob) -> None:
+        """在工作线程中运行一次爬虫"""
+        try:
+            result = self.manager.run_crawler(job.name)
+        except Exception as e:
+            self.logger.error(f"爬虫运行失败: {job.name}, 错误: {e}", exc_info=True)
+            result = {"crawler_name": job.name, "success": False, "error": str(e)}
+        
+        with self._wakeup:
+            job.running = False
+            job.run_count += 1
+            job.last_result = result
+            self._active -= 1
+            if job.queued:
+                job.queued = False
+                if not self._stopping and self.jobs.get(job.name) is job:
+                    self._ready.append(job.name)
+            self._wakeup.notify()
+        
+        if self.on_result:
+            try:
+                self.on_result(job.name, result)
+            except Exception as e:
+                self.logger.error(f"运行结果回调失败: {job.name}, 错误: {e}")
+    
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        获取定时任务状态
+        
+        Returns:
+            每个任务的下次运行时间、是否正在运行、运行/跳过次数和上次结果
+        """
+        with self._wakeup:
+            return [
+                {
+                    "name": job.name,
+                    "schedule": job.cron.expression if job.cron else f"every {job.interval}s",
+                    "next_run": datetime.fromtimestamp(job.fire_at).isoformat(),
+                    "running": job.running,
+                    "queued": job.queued,
+                    "run_count": job.run_count,
+                    "skipped_count": job.skipped_count,
+                    "last_success": job.last_result.get("success") if job.last_result else None,
+                }
+                for job in self.jobs.values()
+            ]
@@ -0,0 +1,175 @@
+"""
+分页模块
+描述分页接口的翻页方式（页码、偏移量、游标），由 APICrawler.fetch_pages 驱动
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List
+
+
+def get_path(data: Any, path: str) -> Any:
+    """
+    按点分路径读取嵌套字段，如 "data.next_cursor"
+
+    Args:
+        data: 解析后的响应数据
+        path: 点分路径
+
+    Returns:
+        字段值，不存在返回 None
+    """
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+class Paginator(ABC):
+    """
+    分页策略
+
+    first_page() 给出第一页的分页参数；每取到一页后由 next_page() 根据响应计算下一页的参数，
+    返回 None 表示没有下一页。分页参数在 GET 请求中放入 URL 参数，在 POST 请求中放入请求体。
+    """
+
+    def __init__(self, items_path: Optional[str] = None, max_pages: Optional[int] = None):
+        """
+        Args:
+            items_path: 数据列表在响应中的点分路径，None 表示使用 BaseCrawler.extract_items 的规则
+            max_pages: 最多获取的页数，None 表示不限制
+        """
+        self.items_path = items_path
+        self.max_pages = max_pages
+
+    @abstractmethod
+    def first_page(self) -> Dict[str, Any]:
+        """
+        第一页的分页参数
+
+        Returns:
+            分页参数
+        """
+        pass
+
+    @abstractmethod
+    def next_page(
+        self,
+        page_args: Dict[str, Any],
+        data: Any,
+        items: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        计算下一页的分页参数
+
+        Args:
+            page_args: 当前页的分页参数
+            data: 当前页解析后的响应
+            items: 当前页的数据列表
+
+        Returns:
+            下一页的分页参数，没有下一页返回 None
+        """
+        pass
+
+
+class PageNumberPaginator(Paginator):
+    """页码分页：?page=1&size=100，返回条数不足一页时结束"""
+
+    def __init__(
+        self,
+        page_size: int = 100,
+        page_param: str = "page",
+        size_param: str = "size",
+        start_page: int = 1,
+        **kwargs
+    ):
+        """
+        Args:
+            page_size: 每页条数
+            page_param: 页码参数名
+            size_param: 每页条数参数名
+            start_page: 起始页码
+            **kwargs: 见 Paginator
+        """
+        super().__init__(**kwargs)
+        self.page_size = page_size
+        self.page_param = page_param
+        self.size_param = size_param
+        self.start_page = start_page
+
+    def first_page(self) -> Dict[str, Any]:
+        return {self.page_param: self.start_page, self.size_param: self.page_size}
+
+    def next_page(self, page_args, data, items):
+        if len(items) < self.page_size:
+            return None
+        return {**page_args, self.page_param: page_args[self.page_param] + 1}
+
+
+class OffsetPaginator(Paginator):
+    """偏移量分页：?offset=0&limit=100，返回条数不足 limit 时结束"""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        offset_param: str = "offset",
+        limit_param: str = "limit",
+        start_offset: int = 0,
+        **kwargs
+    ):
+        """
+        Args:
+            limit: 每页条数
+            offset_param: 偏移量参数名
+            limit_param: 每页条数参数名
+            start_offset: 起始偏移量
+            **kwargs: 见 Paginator
+        """
+        super().__init__(**kwargs)
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.start_offset = start_offset
+
+    def first_page(self) -> Dict[str, Any]:
+        return {self.offset_param: self.start_offset, self.limit_param: self.limit}
+
+    def next_page(self, page_args, data, items):
+        if len(items) < self.limit:
+            return None
+        return {**page_args, self.offset_param: page_args[self.offset_param] + len(items)}
+
+
+class CursorPaginator(Paginator):
+    """游标分页：下一页的游标从响应中读取，游标为空或不变时结束"""
+
+    def __init__(
+        self,
+        cursor_path: str = "next_cursor",
+        cursor_param: str = "cursor",
+        page_size: Optional[int] = None,
+        size_param: str = "size",
+        **kwargs
+    ):
+        """
+        Args:
+            cursor_path: 下一页游标在响应中的点分路径
+            cursor_param: 游标参数名
+            page_size: 每页条数，None 表示不传
+            size_param: 每页条数参数名
+            **kwargs: 见 Paginator
+        """
+        super().__init__(**kwargs)
+        self.cursor_path = cursor_path
+        self.cursor_param = cursor_param
+        self.page_size = page_size
+        self.size_param = size_param
+
+    def first_page(self) -> Dict[str, Any]:
+        return {self.size_param: self.page_size} if self.page_size else {}
+
+    def next_page(self, page_args, data, items):
+        cursor = get_path(data, self.cursor_path)
+        if cursor in (None, "") or cursor == page_args.get(self.cursor_param):
+            return None
+        return {**page_args, self.cursor_param: cursor}
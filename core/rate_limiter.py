@@ -0,0 +1,193 @@
+"""
+限流模块
+按主机划分的令牌桶限流器，可在多个爬虫（线程或协程）之间共享
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from crawler.config.config import CrawlerConfig
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多积累 burst 个。
+    采用预约方式取令牌：在锁内扣减令牌并计算需要等待的时间，
+    在锁外等待，因此同步和异步调用方可以共用同一个桶。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（即允许的请求数/秒）
+            burst: 桶容量（允许的突发请求数）
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预约令牌
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            调用方在发起请求前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        阻塞直到获得令牌（线程安全）
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        异步等待直到获得令牌（不阻塞事件循环）
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    按主机限流器
+
+    每个主机一个令牌桶，同一 RateLimiter 实例可被多个爬虫共享，
+    从而共同遵守同一主机的请求预算。
+    per_proxy 为 True 时按"代理出口 + 主机"分桶，每个出口各自拥有一份预算。
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: int = 1,
+        host_rates: Optional[Dict[str, float]] = None,
+        per_proxy: bool = False
+    ):
+        """
+        初始化限流器
+
+        Args:
+            rate: 每个主机默认的请求数/秒，None 或 0 表示不限流
+            burst: 每个主机的突发请求数
+            host_rates: 特定主机的请求数/秒（覆盖默认值）
+            per_proxy: 是否按代理出口分别限流
+        """
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.per_proxy = per_proxy
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> "RateLimiter":
+        """
+        从爬虫配置创建限流器
+        未设置 rate_limit 时，delay 视为每个并发请求的间隔：每个主机 max_concurrency / delay 请求/秒，
+        突发数至少为 max_concurrency，并发获取（run_many、异步爬虫）不会被限流退化成逐个请求
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            限流器实例
+        """
+        rate = config.rate_limit
+        burst = config.rate_limit_burst
+        if rate is None and config.delay > 0:
+            concurrency = max(1, config.max_concurrency)
+            rate = concurrency / config.delay
+            burst = max(burst, concurrency)
+        return cls(
+            rate=rate,
+            burst=burst,
+            host_rates=config.host_rate_limits,
+            per_proxy=config.rate_limit_per_proxy
+        )
+
+    def get_bucket(self, url: str, proxy: Optional[str] = None) -> Optional[TokenBucket]:
+        """
+        获取 URL 所属主机的令牌桶
+
+        Args:
+            url: 请求 URL（或主机名）
+            proxy: 本次请求使用的代理（仅 per_proxy 时参与分桶）
+
+        Returns:
+            令牌桶，不限流时返回 None
+        """
+        host = urlparse(url).netloc or url
+        rate = self.host_rates.get(host, self.rate)
+        if not rate:
+            return None
+
+        key = f"{proxy}|{host}" if self.per_proxy and proxy else host
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(rate, self.burst)
+                    self._buckets[key] = bucket
+        return bucket
+
+    def acquire(self, url: str, proxy: Optional[str] = None) -> float:
+        """
+        阻塞直到允许向 url 发起请求
+
+        Args:
+            url: 请求 URL
+            proxy: 本次请求使用的代理
+
+        Returns:
+            实际等待的秒数
+        """
+        bucket = self.get_bucket(url, proxy)
+        return bucket.acquire() if bucket else 0.0
+
+    async def acquire_async(self, url: str, proxy: Optional[str] = None) -> float:
+        """
+        异步等待直到允许向 url 发起请求
+
+        Args:
+            url: 请求 URL
+            proxy: 本次请求使用的代理
+
+        Returns:
+            实际等待的秒数
+        """
+        bucket = self.get_bucket(url, proxy)
+        return await bucket.acquire_async() if bucket else 0.0
@@ -0,0 +1,282 @@
+"""
+响应缓存模块
+按请求（方法 + URL + 参数 + 请求体）缓存响应，带 TTL 和按容量的 LRU 淘汰，
+用于重复运行、本地开发以及修正映射后重新执行 transform_data
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterator
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from crawler.config.config import CrawlerConfig
+
+
+def make_request_key(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    body: Any = None
+) -> str:
+    """
+    生成请求的缓存键
+
+    Args:
+        method: HTTP 方法
+        url: 请求 URL
+        params: URL 参数
+        body: 请求体
+
+    Returns:
+        缓存键
+    """
+    raw = json.dumps(
+        [method.upper(), url, params or {}, body],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应"""
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    created_at: float = 0.0
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "CachedResponse":
+        """从 requests 响应创建缓存条目"""
+        headers = {}
+        for name in ("Content-Type", "ETag", "Last-Modified"):
+            if name in response.headers:
+                headers[name] = response.headers[name]
+        return cls(
+            url=response.url,
+            status=response.status_code,
+            body=response.content,
+            headers=headers,
+            created_at=time.time()
+        )
+
+    def to_response(self) -> requests.Response:
+        """还原为 requests 响应（from_cache 属性为 True）"""
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.url = self.url
+        response.encoding = "utf-8"
+        response._content = self.body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+
+class ResponseCache(ABC):
+    """响应缓存接口"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的响应，不存在或已过期返回 None
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, response: CachedResponse) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            response: 要缓存的响应
+        """
+        pass
+
+    def close(self) -> None:
+        """释放资源"""
+        pass
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> Optional["ResponseCache"]:
+        """
+        从爬虫配置创建响应缓存
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            响应缓存，未启用时返回 None
+        """
+        if not config.response_cache:
+            return None
+        return DiskResponseCache(
+            config.response_cache_dir,
+            ttl=config.response_cache_ttl,
+            max_bytes=config.response_cache_max_bytes
+        )
+
+
+class DiskResponseCache(ResponseCache):
+    """
+    磁盘响应缓存（SQLite 存储）
+
+    读取时刷新访问时间；写入后总大小超过 max_bytes 时，
+    按最近最少访问的顺序淘汰条目。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: Optional[float] = 3600,
+        max_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        初始化磁盘缓存
+
+        Args:
+            directory: 缓存目录
+            ttl: 条目有效期（秒），None 表示永不过期
+            max_bytes: 缓存总大小上限（字节）
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "responses.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " status INTEGER,"
+            " headers TEXT,"
+            " body BLOB,"
+            " size INTEGER,"
+            " created_at REAL,"
+            " accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)")
+        self._conn.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        """判断条目是否过期"""
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if self._is_expired(row[4], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        return CachedResponse(
+            url=row[0],
+            status=row[1],
+            headers=json.loads(row[2]) if row[2] else {},
+            body=row[3],
+            created_at=row[4]
+        )
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        now = time.time()
+        size = len(response.body)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status, json.dumps(response.headers),
+                 response.body, size, response.created_at or now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """删除过期条目，并按 LRU 淘汰直到总大小不超过上限（调用方持有锁）"""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evict_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evict_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evict_keys)
+
+    def entries(self, url_prefix: str = "", include_expired: bool = False) -> Iterator[CachedResponse]:
+        """
+        遍历缓存条目（用于离线重放，如重新执行 transform_data）
+
+        Args:
+            url_prefix: 只返回 URL 以此开头的条目
+            include_expired: 是否包含已过期的条目
+
+        Yields:
+            缓存的响应
+        """
+        now = time.time()
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute(
+                "SELECT key FROM responses WHERE url LIKE ? ESCAPE '\\' ORDER BY created_at",
+                (url_prefix.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_") + "%",)
+            )]
+
+        for key in keys:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT url, status, headers, body, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            if not row or (not include_expired and self._is_expired(row[4], now)):
+                continue
+            yield CachedResponse(
+                url=row[0],
+                status=row[1],
+                headers=json.loads(row[2]) if row[2] else {},
+                body=row[3],
+                created_at=row[4]
+            )
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
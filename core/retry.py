@@ -0,0 +1,202 @@
+"""
+重试策略模块
+错误分类、带完全抖动的指数退避、Retry-After 处理和每次运行的重试预算
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Set
+
+import requests
+
+from crawler.config.config import CrawlerConfig
+
+
+# 错误分类
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+SERVER_ERROR = "server_error"
+RATE_LIMITED = "rate_limited"
+
+
+class RetryBudget:
+    """
+    重试预算
+    限制一次运行内的总重试次数，避免上游整体故障时重试放大流量
+    """
+
+    def __init__(self, max_retries: Optional[int] = None):
+        """
+        初始化重试预算
+
+        Args:
+            max_retries: 一次运行内允许的总重试次数，None 表示不限制
+        """
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_consume(self) -> bool:
+        """
+        尝试消耗一次重试
+
+        Returns:
+            预算充足返回 True，否则返回 False
+        """
+        with self._lock:
+            if self.max_retries is not None and self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+    def reset(self) -> None:
+        """重置预算（每次运行开始时调用）"""
+        with self._lock:
+            self.used = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """剩余重试次数，不限制时返回 None"""
+        if self.max_retries is None:
+            return None
+        return max(0, self.max_retries - self.used)
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    可重试的错误：超时、连接错误、5xx 和 429。
+    退避时间为 [0, min(backoff_max, backoff_base * 2^attempt)] 内的随机值（完全抖动）；
+    响应带 Retry-After 时以服务端给出的时间为准，超过 backoff_max 则放弃重试。
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_statuses: Optional[Set[int]] = None,
+        budget: Optional[RetryBudget] = None
+    ):
+        """
+        初始化重试策略
+
+        Args:
+            max_retries: 单个请求的最大重试次数
+            backoff_base: 退避基数（秒）
+            backoff_max: 单次退避的最大等待时间（秒）
+            retry_statuses: 可重试的 HTTP 状态码
+            budget: 重试预算（可在多个请求间共享）
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses) if retry_statuses else self.RETRY_STATUSES
+        self.budget = budget or RetryBudget()
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> "RetryPolicy":
+        """
+        从爬虫配置创建重试策略
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            重试策略实例（带独立的重试预算）
+        """
+        return cls(
+            max_retries=config.max_retries,
+            backoff_base=config.retry_backoff_base,
+            backoff_max=config.retry_backoff_max,
+            budget=RetryBudget(config.retry_budget)
+        )
+
+    def classify_exception(self, exc: BaseException) -> Optional[str]:
+        """
+        对异常分类
+
+        Args:
+            exc: 请求抛出的异常
+
+        Returns:
+            错误分类，不可重试时返回 None
+        """
+        if isinstance(exc, (requests.Timeout, asyncio.TimeoutError, TimeoutError)):
+            return TIMEOUT
+        if isinstance(exc, (requests.ConnectionError, ConnectionError)):
+            return CONNECTION
+        return None
+
+    def classify_status(self, status: int) -> Optional[str]:
+        """
+        对 HTTP 状态码分类
+
+        Args:
+            status: HTTP 状态码
+
+        Returns:
+            错误分类，不可重试时返回 None
+        """
+        if status not in self.retry_statuses:
+            return None
+        return RATE_LIMITED if status == 429 else SERVER_ERROR
+
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        计算第 attempt 次重试前的等待时间
+
+        Args:
+            attempt: 已重试次数（从 0 开始）
+            retry_after: 响应头 Retry-After 的值
+
+        Returns:
+            等待秒数；Retry-After 超过 backoff_max 时返回 None（放弃重试）
+        """
+        server_delay = self.parse_retry_after(retry_after)
+        if server_delay is not None:
+            return server_delay if server_delay <= self.backoff_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def should_retry(self, reason: Optional[str], attempt: int) -> bool:
+        """
+        判断是否应重试（会消耗重试预算）
+
+        Args:
+            reason: 错误分类
+            attempt: 已重试次数
+
+        Returns:
+            是否重试
+        """
+        if reason is None or attempt >= self.max_retries:
+            return False
+        return self.budget.try_consume()
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        解析 Retry-After 响应头（秒数或 HTTP 日期）
+
+        Args:
+            value: 响应头的值
+
+        Returns:
+            等待秒数，无法解析时返回 None
+        """
+        if not value:
+            return None
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
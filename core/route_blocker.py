@@ -0,0 +1,290 @@
+"""
+浏览器请求拦截模块
+浏览器拦截只需要一个 JSON 响应，按资源类型和 URL 模式拦截页面上不需要的请求
+（图片、字体、样式、统计脚本等），减少页面加载时间和代理流量
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, Tuple, Union
+
+from crawler.config.config import CrawlerConfig
+
+# 必须放行的 URL 模式：单个或多个
+KeepPatterns = Union[str, Iterable[str]]
+
+# 默认拦截的资源类型（Playwright 的 request.resource_type）
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet"]
+
+# 轻量模式额外拦截的资源类型
+LIGHTWEIGHT_BLOCKED_RESOURCE_TYPES = ["texttrack", "eventsource", "manifest"]
+
+# 默认拦截的 URL（统计、广告脚本），按子串匹配
+DEFAULT_BLOCKED_URL_PATTERNS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "hm.baidu.com",
+    "cnzz.com",
+    "clarity.ms",
+]
+
+# 各资源类型的默认估计大小（字节），被拦截的请求没有同 URL 记录、也没学到该类型的平均大小时使用
+DEFAULT_RESOURCE_SIZES = {
+    "image": 30 * 1024,
+    "media": 500 * 1024,
+    "font": 40 * 1024,
+    "stylesheet": 20 * 1024,
+    "script": 30 * 1024,
+    "texttrack": 5 * 1024,
+    "manifest": 1024,
+}
+
+
+@dataclass
+class RouteStats:
+    """一次拦截中的请求统计"""
+    allowed: int = 0
+    blocked: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+    bytes_loaded: int = 0  # 放行的响应的 Content-Length 之和（没有该头的响应不计入）
+    bytes_saved: int = 0  # 被拦截请求的估计大小（同 URL 见过的 Content-Length，否则按资源类型估计）
+    estimated: int = 0  # 按资源类型估计大小的被拦截请求数
+    unknown_size: int = 0  # 被拦截且无法估计大小的请求数（不计入 bytes_saved）
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved": self.bytes_saved,
+            "estimated": self.estimated,
+            "unknown_size": self.unknown_size,
+        }
+
+
+class RouteBlocker:
+    """
+    浏览器请求拦截规则
+
+    判断顺序：目标 API 和主文档永远放行 → 命中 allow 模式放行 → 命中 deny 模式拦截
+    → 资源类型在拦截列表中拦截 → 其余放行。URL 模式按子串匹配（不区分大小写），与 api_pattern 一致。
+
+    被拦截的请求不会下载，无法得知其大小；bytes_saved 优先按之前放行时见过的同一 URL 的
+    Content-Length 估计，其次按放行响应中同类型资源的平均大小，最后按 DEFAULT_RESOURCE_SIZES，
+    仍无法估计的（如 xhr、other）计入 unknown_size。
+    """
+
+    def __init__(
+        self,
+        blocked_resource_types: Optional[Iterable[str]] = None,
+        block_url_patterns: Optional[Iterable[str]] = None,
+        allow_url_patterns: Optional[Iterable[str]] = None,
+        lightweight: bool = False,
+        max_size_hints: int = 10000,
+        resource_sizes: Optional[Dict[str, int]] = None,
+        enabled: bool = True
+    ):
+        """
+        初始化拦截规则
+
+        Args:
+            blocked_resource_types: 拦截的资源类型，None 表示 DEFAULT_BLOCKED_RESOURCE_TYPES
+            block_url_patterns: 拦截的 URL 模式，None 表示 DEFAULT_BLOCKED_URL_PATTERNS
+            allow_url_patterns: 始终放行的 URL 模式（优先于拦截规则）
+            lightweight: 轻量模式（额外拦截 LIGHTWEIGHT_BLOCKED_RESOURCE_TYPES，并屏蔽 Service Worker 等）
+            max_size_hints: 最多记录多少个 URL 的大小
+            resource_sizes: 各资源类型的默认估计大小（字节），None 表示 DEFAULT_RESOURCE_SIZES
+            enabled: 是否拦截（关闭时只统计流量并记录各 URL 的大小）
+        """
+        self.enabled = enabled
+        types = DEFAULT_BLOCKED_RESOURCE_TYPES if blocked_resource_types is None else blocked_resource_types
+        self.blocked_resource_types = set(types)
+        if lightweight:
+            self.blocked_resource_types.update(LIGHTWEIGHT_BLOCKED_RESOURCE_TYPES)
+        patterns = DEFAULT_BLOCKED_URL_PATTERNS if block_url_patterns is None else block_url_patterns
+        self.block_url_patterns = [p.lower() for p in patterns]
+        self.allow_url_patterns = [p.lower() for p in (allow_url_patterns or [])]
+        self.lightweight = lightweight
+        self.max_size_hints = max_size_hints
+        self.resource_sizes = dict(DEFAULT_RESOURCE_SIZES if resource_sizes is None else resource_sizes)
+        self._size_hints: Dict[str, int] = {}
+        self._type_sizes: Dict[str, Tuple[int, int]] = {}  # 资源类型 -> (放行响应的总字节数, 响应数)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: CrawlerConfig) -> "RouteBlocker":
+        """
+        从爬虫配置创建拦截规则
+
+        Args:
+            config: 爬虫配置
+
+        Returns:
+            拦截规则（未启用拦截时只统计流量）
+        """
+        return cls(
+            blocked_resource_types=config.browser_blocked_resource_types,
+            block_url_patterns=config.browser_block_url_patterns,
+            allow_url_patterns=config.browser_allow_url_patterns,
+            lightweight=config.browser_lightweight,
+            enabled=config.browser_block_resources
+        )
+
+    def context_options(self) -> Dict[str, Any]:
+        """
+        创建浏览器上下文时附加的选项
+
+        Returns:
+            上下文选项（屏蔽 Service Worker，否则其发出的请求不经过路由；轻量模式下减少动画）
+        """
+        if not self.enabled:
+            return {}
+        options: Dict[str, Any] = {"service_workers": "block"}
+        if self.lightweight:
+            options["reduced_motion"] = "reduce"
+        return options
+
+    def should_block(self, url: str, resource_type: str, keep_patterns: KeepPatterns = ()) -> bool:
+        """
+        判断请求是否拦截
+
+        Args:
+            url: 请求 URL
+            resource_type: 资源类型
+            keep_patterns: 必须放行的 URL 模式（目标 API），单个或多个
+
+        Returns:
+            是否拦截
+        """
+        url = url.lower()
+        if isinstance(keep_patterns, str):
+            keep_patterns = (keep_patterns,)
+        if resource_type == "document" or any(p and p.lower() in url for p in keep_patterns):
+            return False
+        if any(p in url for p in self.allow_url_patterns):
+            return False
+        if any(p in url for p in self.block_url_patterns):
+            return True
+        return resource_type in self.blocked_resource_types
+
+    def remember_size(self, url: str, size: int, resource_type: Optional[str] = None) -> None:
+        """记录放行的响应大小，用于估计之后拦截同一 URL（或同类型资源）节省的流量"""
+        with self._lock:
+            if url not in self._size_hints and len(self._size_hints) >= self.max_size_hints:
+                self._size_hints.pop(next(iter(self._size_hints)))
+            self._size_hints[url] = size
+            if resource_type:
+                total, count = self._type_sizes.get(resource_type, (0, 0))
+                self._type_sizes[resource_type] = (total + size, count + 1)
+
+    def size_hint(self, url: str) -> Optional[int]:
+        with self._lock:
+            return self._size_hints.get(url)
+
+    def estimate_size(self, resource_type: str) -> Optional[int]:
+        """
+        按资源类型估计请求大小
+
+        Args:
+            resource_type: 资源类型
+
+        Returns:
+            放行响应中同类型资源的平均大小，没有时为默认估计大小，都没有时为 None
+        """
+        with self._lock:
+            total, count = self._type_sizes.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return self.resource_sizes.get(resource_type)
+
+    def _record_request(
+        self,
+        url: str,
+        resource_type: str,
+        keep_patterns: KeepPatterns,
+        stats: RouteStats
+    ) -> bool:
+        """判断请求是否拦截并更新统计"""
+        if not self.should_block(url, resource_type, keep_patterns):
+            stats.allowed += 1
+            return False
+        stats.blocked += 1
+        stats.blocked_by_type[resource_type] = stats.blocked_by_type.get(resource_type, 0) + 1
+        size = self.size_hint(url)
+        if size is None:
+            size = self.estimate_size(resource_type)
+            if size is None:
+                stats.unknown_size += 1
+                return True
+            stats.estimated += 1
+        stats.bytes_saved += size
+        return True
+
+    def _record_response(self, response: Any, stats: RouteStats) -> None:
+        """统计放行的响应大小"""
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            stats.bytes_loaded += int(length)
+            request = getattr(response, "request", None)
+            self.remember_size(response.url, int(length), getattr(request, "resource_type", None))
+
+    def install(
+        self,
+        page: Any,
+        keep_patterns: KeepPatterns = (),
+        stats: Optional[RouteStats] = None
+    ) -> RouteStats:
+        """
+        在页面上安装路由拦截（Playwright 同步 API）
+
+        Args:
+            page: Playwright 页面
+            keep_patterns: 必须放行的 URL 模式（目标 API），单个或多个
+            stats: 写入统计的对象，None 表示新建
+
+        Returns:
+            本页面的请求统计（随页面加载原地更新）
+        """
+        stats = stats if stats is not None else RouteStats()
+
+        def handle_route(route, request):
+            if self._record_request(request.url, request.resource_type, keep_patterns, stats):
+                route.abort("blockedbyclient")
+            else:
+                route.continue_()
+
+        if self.enabled:
+            page.route("**/*", handle_route)
+        page.on("response", lambda response: self._record_response(response, stats))
+        return stats
+
+    async def install_async(
+        self,
+        page: Any,
+        keep_patterns: KeepPatterns = (),
+        stats: Optional[RouteStats] = None
+    ) -> RouteStats:
+        """
+        install() 的 Playwright 异步 API 版本
+
+        Args:
+            page: Playwright 异步页面
+            keep_patterns: 必须放行的 URL 模式（目标 API），单个或多个
+            stats: 写入统计的对象，None 表示新建
+
+        Returns:
+            本页面的请求统计
+        """
+        stats = stats if stats is not None else RouteStats()
+
+        async def handle_route(route, request):
+            if self._record_request(request.url, request.resource_type, keep_patterns, stats):
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+
+        if self.enabled:
+            await page.route("**/*", handle_route)
+        page.on("response", lambda response: self._record_response(response, stats))
+        return stats
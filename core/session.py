@@ -0,0 +1,312 @@
+"""
+爬虫 HTTP 会话
+在 requests.Session 之上统一处理限流和重试，
+并提供共享连接池的会话工厂
+"""
+import importlib.util
+import logging
+import threading
+import time
+from typing import Optional, Dict, Tuple, TYPE_CHECKING
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.request import ACCEPT_ENCODING
+
+# httpx 导入较慢，只检查是否安装（HTTP/2 支持依赖 h2），创建适配器时再导入
+HTTP2_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("httpx", "h2"))
+
+if TYPE_CHECKING:
+    import httpx
+
+from crawler.config.config import Config, CrawlerConfig
+from crawler.core.rate_limiter import RateLimiter
+from crawler.core.retry import RetryPolicy
+from crawler.core.circuit_breaker import CircuitBreakerRegistry
+from crawler.core.proxy_pool import ProxyPool, to_requests_proxies
+
+
+class CrawlerSession(requests.Session):
+    """
+    爬虫会话
+
+    每次请求（包括重试）前先检查熔断器、从代理池选择出口、再向限流器取令牌；
+    超时、连接错误、5xx 和 429 按 RetryPolicy 自动重试（重试时重新选择代理）。
+    熔断打开时抛出 CircuitOpenError，不再重试。
+    """
+
+    def __init__(
+        self,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreakerRegistry] = None,
+        proxy_pool: Optional[ProxyPool] = None
+    ):
+        """
+        初始化会话
+
+        Args:
+            retry_policy: 重试策略，None 表示不重试
+            rate_limiter: 限流器，None 表示不限流
+            circuit_breaker: 熔断器集合，None 表示不熔断
+            proxy_pool: 代理池，None 表示使用 session.proxies
+        """
+        super().__init__()
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.proxy_pool = proxy_pool
+        self.logger = logging.getLogger("CrawlerSession")
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        """发送请求（带熔断、代理轮换、限流和重试）"""
+        attempt = 0
+        while True:
+            if self.circuit_breaker:
+                self.circuit_breaker.before_request(url)
+
+            # 调用方显式指定 proxies 时不使用代理池
+            proxy = None
+            request_kwargs = kwargs
+            if self.proxy_pool and kwargs.get("proxies") is None:
+                proxy = self.proxy_pool.choose()
+                request_kwargs = dict(kwargs, proxies=to_requests_proxies(proxy))
+
+            if self.rate_limiter:
+                self.rate_limiter.acquire(url, proxy)
+
+            try:
+                response = super().request(method, url, *args, **request_kwargs)
+            except requests.RequestException as e:
+                if proxy and isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    self.proxy_pool.report(proxy, False)
+                if self.circuit_breaker:
+                    self.circuit_breaker.record(url, False)
+                if not self.retry_policy:
+                    raise
+                reason = self.retry_policy.classify_exception(e)
+                if not self.retry_policy.should_retry(reason, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                self.logger.warning(f"请求失败（{reason}），{delay:.2f}s 后重试 [{attempt + 1}/{self.retry_policy.max_retries}]: {e}")
+            else:
+                if proxy:
+                    # 407 表示代理认证失败，其余状态码说明代理本身工作正常
+                    self.proxy_pool.report(
+                        proxy, response.status_code != 407, response.elapsed.total_seconds()
+                    )
+                if self.circuit_breaker and response.status_code != 429:
+                    self.circuit_breaker.record(url, response.status_code < 500)
+                if not self.retry_policy:
+                    return response
+                reason = self.retry_policy.classify_status(response.status_code)
+                if reason is None:
+                    return response
+                delay = self.retry_policy.get_delay(attempt, response.headers.get("Retry-After"))
+                if delay is None or not self.retry_policy.should_retry(reason, attempt):
+                    return response
+                self.logger.warning(f"请求返回 {response.status_code}（{reason}），{delay:.2f}s 后重试 "
+                                    f"[{attempt + 1}/{self.retry_policy.max_retries}]: {url}")
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """关闭会话（共享的连接池不随单个会话关闭）"""
+        for prefix, adapter in list(self.adapters.items()):
+            if getattr(adapter, "shared", False):
+                del self.adapters[prefix]
+        super().close()
+
+
+# HTTP/2 禁止携带的逐跳请求头
+HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"})
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    基于 httpx 的 HTTP/2 传输适配器
+    挂载到 requests.Session 上，对调用方保持 requests 接口不变
+    （需要安装 httpx[http2]；响应体会一次性读入内存）
+    """
+
+    def __init__(self, max_connections: int = 10, max_keepalive_connections: int = 10):
+        """
+        初始化适配器
+
+        Args:
+            max_connections: 最大连接数
+            max_keepalive_connections: 最大保持的空闲连接数
+        """
+        super().__init__()
+        import httpx
+        self._httpx = httpx
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        # httpx 的代理是客户端级别的，每个代理一个客户端
+        self._clients: Dict[Optional[str], "httpx.Client"] = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self, proxy: Optional[str]) -> "httpx.Client":
+        """获取（必要时创建）指定代理的 httpx 客户端"""
+        with self._lock:
+            client = self._clients.get(proxy)
+            if client is None:
+                client = self._httpx.Client(http2=True, limits=self.limits, proxy=proxy)
+                self._clients[proxy] = client
+            return client
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """发送请求并转换为 requests.Response"""
+        proxy = None
+        if proxies:
+            scheme = request.url.split(":", 1)[0]
+            proxy = proxies.get(scheme) or proxies.get("all")
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            timeout = self._httpx.Timeout(read_timeout, connect=connect_timeout)
+
+        try:
+            r = self._get_client(proxy).request(
+                request.method,
+                request.url,
+                headers={
+                    k: v for k, v in request.headers.items()
+                    if k.lower() not in HOP_BY_HOP_HEADERS
+                },
+                content=request.body,
+                timeout=timeout
+            )
+        except self._httpx.ConnectTimeout as e:
+            raise requests.ConnectTimeout(e, request=request)
+        except self._httpx.TimeoutException as e:
+            raise requests.ReadTimeout(e, request=request)
+        except self._httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = r.status_code
+        response.headers = CaseInsensitiveDict(r.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = r.reason_phrase
+        response.url = str(r.url)
+        response.elapsed = r.elapsed
+        response.request = request
+        response.connection = self
+        # httpx 已解压响应体
+        response._content = r.content
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        """关闭所有 httpx 客户端"""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+# 按连接池配置共享的传输适配器（跨爬虫实例复用已建立的 TLS 连接）
+_shared_adapters: Dict[Tuple, BaseAdapter] = {}
+_shared_adapters_lock = threading.Lock()
+
+
+def get_shared_adapter(config: CrawlerConfig) -> BaseAdapter:
+    """
+    获取共享的传输适配器
+    连接池配置相同的会话共用同一个适配器（即同一组连接池）
+
+    Args:
+        config: 爬虫配置
+
+    Returns:
+        传输适配器
+    """
+    use_http2 = config.http2 and HTTP2_AVAILABLE
+    key = (config.pool_connections, config.pool_maxsize, config.pool_block, use_http2)
+
+    if config.http2 and not HTTP2_AVAILABLE:
+        logging.getLogger("CrawlerSession").warning("HTTP/2 需要安装 httpx[http2]，已回退到 HTTP/1.1")
+
+    with _shared_adapters_lock:
+        adapter = _shared_adapters.get(key)
+        if adapter is None:
+            if use_http2:
+                adapter = HTTP2Adapter(
+                    max_connections=config.pool_connections * config.pool_maxsize,
+                    max_keepalive_connections=config.pool_maxsize
+                )
+            else:
+                # 重试由 CrawlerSession 负责，适配器本身不重试
+                adapter = HTTPAdapter(
+                    pool_connections=config.pool_connections,
+                    pool_maxsize=config.pool_maxsize,
+                    pool_block=config.pool_block,
+                    max_retries=0
+                )
+            adapter.shared = True
+            _shared_adapters[key] = adapter
+        return adapter
+
+
+def create_session(
+    config: Config,
+    headers: Optional[Dict[str, str]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    circuit_breaker: Optional[CircuitBreakerRegistry] = None,
+    proxy_pool: Optional[ProxyPool] = None
+) -> CrawlerSession:
+    """
+    创建爬虫会话
+    挂载共享连接池，并设置默认请求头、压缩、keep-alive 和代理
+
+    Args:
+        config: 全局配置对象
+        headers: 额外的请求头
+        retry_policy: 重试策略
+        rate_limiter: 限流器
+        circuit_breaker: 熔断器集合
+        proxy_pool: 代理池（提供时每次请求从池中选择代理，否则使用 config.crawler.proxy）
+
+    Returns:
+        爬虫会话
+    """
+    crawler_config = config.crawler
+    session = CrawlerSession(
+        retry_policy=retry_policy,
+        rate_limiter=rate_limiter,
+        circuit_breaker=circuit_breaker,
+        proxy_pool=proxy_pool
+    )
+
+    adapter = get_shared_adapter(crawler_config)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # 配置固定代理（未使用代理池时）
+    if crawler_config.proxy and not proxy_pool:
+        session.proxies = {
+            "http": crawler_config.proxy,
+            "https": crawler_config.proxy
+        }
+
+    default_headers = {
+        "User-Agent": config.csqaq.user_agent,
+        "Accept": "application/json",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        # urllib3 会根据已安装的解码库（brotli 等）给出可解压的编码
+        "Accept-Encoding": ACCEPT_ENCODING if crawler_config.compression else "identity",
+        "Connection": "keep-alive" if crawler_config.keep_alive else "close",
+    }
+    if headers:
+        default_headers.update(headers)
+    session.headers.update(default_headers)
+
+    return session
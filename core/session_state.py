@@ -0,0 +1,99 @@
+"""
+会话状态模块
+从浏览器拦截到的请求中提取 Cookie、请求头和请求模板，
+交给 HTTP 会话直接调用 API，凭证过期后再回退到浏览器
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
+
+from requests.cookies import RequestsCookieJar
+
+# 不随会话状态传递的请求头：由 HTTP 客户端自行生成，或由 Cookie 单独传递
+EXCLUDED_HEADERS = frozenset({
+    "host", "content-length", "cookie", "connection", "keep-alive", "proxy-connection",
+    "transfer-encoding", "upgrade", "accept-encoding",
+})
+
+
+@dataclass
+class SessionState:
+    """从浏览器中获取的请求凭证和请求模板"""
+    url: str  # 拦截到的 API 请求 URL（含页面生成的查询参数）
+    method: str = "GET"
+    headers: Dict[str, str] = field(default_factory=dict)  # 页面发出请求时携带的请求头（含授权头）
+    body: Optional[str] = None  # 请求体模板
+    cookies: List[Dict[str, Any]] = field(default_factory=list)  # Playwright 格式的 Cookie
+    captured_at: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None  # 过期时间（Unix 时间戳），None 表示不过期
+
+    @classmethod
+    def from_playwright(
+        cls,
+        request: Any,
+        cookies: List[Dict[str, Any]],
+        ttl: Optional[float] = None
+    ) -> "SessionState":
+        """
+        从 Playwright 请求对象创建会话状态
+
+        Args:
+            request: 拦截到的请求（playwright Request，同步 API）
+            cookies: 适用于该请求 URL 的 Cookie（context.cookies(url)）
+            ttl: 会话状态的最长有效期（秒），None 表示只按 Cookie 过期时间判断
+
+        Returns:
+            会话状态
+        """
+        headers = {
+            name: value for name, value in request.all_headers().items()
+            if not name.startswith(":") and name.lower() not in EXCLUDED_HEADERS
+        }
+        captured_at = time.time()
+
+        # 有效期取 ttl 和 Cookie 最早过期时间中较早者（expires 为 -1 的会话 Cookie 不参与）
+        deadlines = [cookie["expires"] for cookie in cookies if cookie.get("expires", -1) > 0]
+        if ttl is not None:
+            deadlines.append(captured_at + ttl)
+
+        return cls(
+            url=request.url,
+            method=request.method,
+            headers=headers,
+            body=request.post_data,
+            cookies=list(cookies),
+            captured_at=captured_at,
+            expires_at=min(deadlines) if deadlines else None
+        )
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """
+        会话状态是否已过期
+
+        Args:
+            now: 当前时间（Unix 时间戳），默认为 time.time()
+
+        Returns:
+            是否已过期
+        """
+        if self.expires_at is None:
+            return False
+        return (now if now is not None else time.time()) >= self.expires_at
+
+    def cookie_jar(self) -> RequestsCookieJar:
+        """
+        转换为 requests 的 Cookie
+
+        Returns:
+            CookieJar（保留域名和路径）
+        """
+        jar = RequestsCookieJar()
+        for cookie in self.cookies:
+            jar.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+                secure=cookie.get("secure", False)
+            )
+        return jar
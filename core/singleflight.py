@@ -0,0 +1,115 @@
+"""
+并发请求合并
+相同键的并发调用只执行一次，其余调用方等待并共享同一个结果（线程和协程均可用）
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    并发请求合并
+
+    同一时刻相同键的调用只有第一个（leader）真正执行，其余调用方阻塞等待并拿到同一个结果
+    （或同一个异常）。调用结束后立即移除，之后的调用重新执行，因此不是缓存。
+    共享的结果是同一个对象，调用方不应修改它。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行（或等待进行中的）同键调用
+
+        Args:
+            key: 调用键
+            fn: 实际执行的函数
+
+        Returns:
+            (结果, 是否为共享的结果)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        do() 的协程版本（只在同一个事件循环内合并）
+
+        Args:
+            key: 调用键
+            fn: 返回协程的函数
+
+        Returns:
+            (结果, 是否为共享的结果)
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        # 不同线程中的事件循环共用同一个字典，读写都要持有锁
+        with self._lock:
+            task = self._async_calls.get(loop_key)
+            leader = task is None
+            if leader:
+                # 实际调用在独立的任务中执行，不受任何一个调用方被取消的影响
+                task = loop.create_task(fn())
+                self._async_calls[loop_key] = task
+                task.add_done_callback(lambda done: self._finish_async(loop_key, done))
+
+        # shield: 某个调用方（包括 leader）被取消时只取消它自己的等待，其他调用方照常拿到结果
+        return await asyncio.shield(task), not leader
+
+    def _finish_async(self, loop_key: Tuple[int, Hashable], task: "asyncio.Task") -> None:
+        """协程调用结束：移除记录（之后的调用重新执行）"""
+        with self._lock:
+            if self._async_calls.get(loop_key) is task:
+                del self._async_calls[loop_key]
+        if not task.cancelled():
+            task.exception()  # 所有调用方都已取消时避免 "exception was never retrieved" 警告
+
+    def in_flight(self) -> int:
+        """
+        进行中的调用数
+
+        Returns:
+            线程和协程调用的总数
+        """
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
@@ -0,0 +1,155 @@
+"""
+HTTP 校验器缓存
+按请求（方法 + URL + 参数 + 请求体）保存 ETag / Last-Modified，用于发送条件请求
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable
+
+from crawler.core.response_cache import make_request_key
+
+
+class ValidatorCache:
+    """
+    校验器缓存（SQLite 存储）
+
+    新获取的校验器先放入待提交区，只有数据处理成功后才提交，
+    避免"拿到 304 但上次数据其实没保存成功"的情况。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化校验器缓存
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS validators ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " updated_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None
+    ) -> str:
+        """
+        生成请求的缓存键
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            params: URL 参数
+            body: 请求体
+
+        Returns:
+            缓存键
+        """
+        return make_request_key(method, url, params, body)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        获取已提交的校验器
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            {"etag": ..., "last_modified": ...}，不存在返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM validators WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1]}
+
+    def get_conditional_headers(self, key: str) -> Dict[str, str]:
+        """
+        生成条件请求头
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            If-None-Match / If-Modified-Since 请求头
+        """
+        validators = self.get(key)
+        headers = {}
+        if validators:
+            if validators["etag"]:
+                headers["If-None-Match"] = validators["etag"]
+            if validators["last_modified"]:
+                headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def remember(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        记录待提交的校验器
+
+        Args:
+            key: 缓存键
+            url: 请求 URL
+            etag: 响应头 ETag
+            last_modified: 响应头 Last-Modified
+        """
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._pending[key] = {"url": url, "etag": etag, "last_modified": last_modified}
+
+    def commit(self, keys: Optional[Iterable[str]] = None) -> int:
+        """
+        提交待提交的校验器
+
+        Args:
+            keys: 要提交的缓存键，None 表示全部
+
+        Returns:
+            提交的条数
+        """
+        with self._lock:
+            if keys is None:
+                keys = list(self._pending.keys())
+            rows = []
+            for key in keys:
+                entry = self._pending.pop(key, None)
+                if entry:
+                    rows.append((key, entry["url"], entry["etag"], entry["last_modified"], time.time()))
+            if rows:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO validators (key, url, etag, last_modified, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        return len(rows)
+
+    def discard(self) -> None:
+        """丢弃所有待提交的校验器（运行失败时调用）"""
+        with self._lock:
+            self._pending.clear()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
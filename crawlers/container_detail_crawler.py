@@ -2,10 +2,19 @@
 箱子详情爬虫
 获取箱子内的枪皮和刀/手套信息
 """
-from typing import List, Dict, Any, Optional
+import os
+import socket
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from crawler.core.api_crawler import APICrawler
+from crawler.core.base import NOT_MODIFIED
+from crawler.core.circuit_breaker import CircuitOpenError
+from crawler.core.fingerprint import FingerprintStore
+from crawler.core.job_queue import JobQueue, Job
 from crawler.config.config import Config
 
 
@@ -33,6 +42,11 @@ class ContainerDetailCrawler(APICrawler):
                 "ApiToken": self.token  # API 使用 ApiToken 头，不是 Authorization
             }
         )
+        
+        # 箱子列表来自容器爬虫写入的 boxes 表
+        self.depends_on = ["container"]
+        # 增量模式下记录每个箱子详情成功保存时的箱子数据指纹（未启用 skip_unchanged 时按需创建）
+        self._box_fingerprint_store: Optional[FingerprintStore] = None
     
     def fetch_data(self, qaq_id: int) -> Optional[List[Dict[str, Any]]]:
         """
@@ -42,16 +56,16 @@ class ContainerDetailCrawler(APICrawler):
             qaq_id: 箱子的 qaq_id
             
         Returns:
-            API 返回的数据列表
+            API 返回的数据列表；数据未变化（304）时返回 NOT_MODIFIED
         """
         try:
-            response = self.session.get(
-                self.api_url,
-                params={"id": qaq_id},  # API 使用 id 参数，不是 qaq_id
-                timeout=self.config.crawler.timeout
+            data = self.request_json(
+                "GET",
+                params={"id": qaq_id}  # API 使用 id 参数，不是 qaq_id
             )
-            response.raise_for_status()
-            data = response.json()
+            if data is NOT_MODIFIED:
+                self.logger.info(f"箱子 {qaq_id} 数据未变化（304）")
+                return NOT_MODIFIED
             
             # 检查响应状态
             if data.get("code") != 200:
@@ -66,6 +80,9 @@ class ContainerDetailCrawler(APICrawler):
             
             return items
             
+        except CircuitOpenError as e:
+            self.logger.warning(f"跳过箱子 qaq_id={qaq_id}: {e}")
+            return None
         except Exception as e:
             self.logger.error(f"获取箱子详情失败 qaq_id={qaq_id}: {e}")
             return None
@@ -248,13 +265,92 @@ class ContainerDetailCrawler(APICrawler):
         
         return rarity_map.get(rln)
     
-    def get_filtered_boxes(self) -> List[Dict[str, Any]]:
+    def get_filtered_boxes(self, only_changed: bool = False) -> List[Dict[str, Any]]:
         """
         获取符合条件的箱子列表（名字中包含"武器箱"或"收藏品"）
         
+        Args:
+            only_changed: 只返回还没有任何关系数据、或箱子数据与上次成功保存详情时不同的箱子
+            
+        Returns:
+            箱子列表，包含 id、qaq_id、name、obtain_method 和 created_at
+        """
+        boxes = self._query_filtered_boxes()
+        if not only_changed or not boxes:
+            return boxes
+        
+        try:
+            changed = self._filter_changed_boxes(boxes)
+        except Exception as e:
+            self.logger.warning(f"筛选有变化的箱子失败，处理全部箱子: {e}")
+            return boxes
+        self.logger.info(f"增量模式: {len(changed)}/{len(boxes)} 个箱子有变化或还没有关系数据")
+        return changed
+    
+    def _filter_changed_boxes(self, boxes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        筛选箱子数据有变化或还没有关系数据的箱子
+        
+        boxes.updated_at 在每次写入时都会更新（即使数据没变），不能用来判断变化；
+        这里比较箱子数据本身的指纹，有变化的箱子记录待提交的新指纹，由 finish_box_fingerprints 提交
+        
+        Args:
+            boxes: 箱子列表
+            
         Returns:
-            箱子列表，包含 id 和 qaq_id
+            有变化的箱子列表
+        """
+        box_ids = [box["id"] for box in boxes if box.get("id") is not None]
+        with_relations = set()
+        for table in ("box_gun_skin_relations", "box_knife_glove_relations"):
+            with_relations.update(
+                row["box_id"] for row in self.supabase.query_in(table, "box_id", box_ids, columns="box_id")
+            )
+        
+        store = self._get_box_fingerprint_store()
+        changed = []
+        for box in boxes:
+            digest = self._box_digest(box)
+            if store.check(self._box_fingerprint_namespace, str(box.get("qaq_id")), digest) \
+                    or box.get("id") not in with_relations:
+                changed.append(box)
+        return changed
+    
+    @property
+    def _box_fingerprint_namespace(self) -> str:
+        """箱子数据指纹在指纹存储中使用的名称（与原始数据指纹区分）"""
+        return f"{self.name}:boxes"
+    
+    def _get_box_fingerprint_store(self) -> FingerprintStore:
+        """获取记录箱子数据指纹的存储（优先与原始数据指纹共用）"""
+        if self.fingerprint_store:
+            return self.fingerprint_store
+        if self._box_fingerprint_store is None:
+            self._box_fingerprint_store = FingerprintStore(self.config.crawler.fingerprint_path)
+        return self._box_fingerprint_store
+    
+    def _box_digest(self, box: Dict[str, Any]) -> str:
+        """箱子数据的指纹（不含 updated_at）"""
+        return FingerprintStore.digest(
+            {key: value for key, value in box.items() if key != "updated_at"}, self.json_codec
+        )
+    
+    def finish_box_fingerprints(self, box_qaq_ids: Iterable[int]) -> None:
+        """
+        提交详情已成功保存（或未变化）的箱子的数据指纹，丢弃其余箱子的待提交指纹，
+        处理失败的箱子在下次增量运行中重新处理
+        
+        Args:
+            box_qaq_ids: 已成功处理的箱子 qaq_id
         """
+        store = self.fingerprint_store or self._box_fingerprint_store
+        if store is None:
+            return
+        store.commit(self._box_fingerprint_namespace, [str(box_qaq_id) for box_qaq_id in box_qaq_ids])
+        store.discard(self._box_fingerprint_namespace)
+    
+    def _query_filtered_boxes(self) -> List[Dict[str, Any]]:
+        """查询名字中包含"武器箱"或"收藏品"的箱子"""
         if not self.supabase:
             self.logger.error("Supabase 客户端未初始化")
             return []
@@ -262,7 +358,7 @@ class ContainerDetailCrawler(APICrawler):
         try:
             # 使用 Supabase 的 or 和 ilike 查询
             # 查询名字中包含"武器箱"或"收藏品"的箱子
-            result = self.supabase.client.table("boxes").select("id,qaq_id,name").or_(
+            result = self.supabase.client.table("boxes").select("id,qaq_id,name,obtain_method,created_at").or_(
                 "name.ilike.*武器箱*,name.ilike.*收藏品*"
             ).execute()
             
@@ -274,8 +370,8 @@ class ContainerDetailCrawler(APICrawler):
             self.logger.error(f"查询箱子列表失败: {e}")
             # 如果 or_ 语法不支持，尝试分别查询然后合并
             try:
-                result1 = self.supabase.client.table("boxes").select("id,qaq_id,name").ilike("name", "%武器箱%").execute()
-                result2 = self.supabase.client.table("boxes").select("id,qaq_id,name").ilike("name", "%收藏品%").execute()
+                result1 = self.supabase.client.table("boxes").select("id,qaq_id,name,obtain_method,created_at").ilike("name", "%武器箱%").execute()
+                result2 = self.supabase.client.table("boxes").select("id,qaq_id,name,obtain_method,created_at").ilike("name", "%收藏品%").execute()
                 
                 boxes1 = result1.data if result1.data else []
                 boxes2 = result2.data if result2.data else []
@@ -307,6 +403,23 @@ class ContainerDetailCrawler(APICrawler):
             transformed_data: 转换后的数据
             box_qaq_id: 箱子的 qaq_id
             
+        Returns:
+            统计信息字典
+        """
+        return self.save_many_to_database({box_qaq_id: transformed_data})
+    
+    def save_many_to_database(
+        self,
+        transformed_by_box: Dict[int, Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        批量保存多个箱子的数据到数据库
+        所有箱子的枪皮、刀/手套和关系合并后分表批量 upsert，
+        每张表只需少量请求，而不是每个箱子四次往返
+        
+        Args:
+            transformed_by_box: box_qaq_id -> 转换后数据 的字典
+            
         Returns:
             统计信息字典
         """
@@ -322,125 +435,179 @@ class ContainerDetailCrawler(APICrawler):
             "failed": 0
         }
         
-        # 1. 获取 box_id（通过 qaq_id 查找，且名字必须包含"武器箱"或"收藏品"）
+        if not transformed_by_box:
+            return stats
+        
+        batch_size = self.config.crawler.batch_size
+        
+        # 1. 一次性查询所有箱子的 box_id（名字必须包含"武器箱"或"收藏品"）
         try:
-            self.logger.info(f"查询箱子信息: qaq_id={box_qaq_id}")
-            # 先查询箱子是否存在
-            box_result = self.supabase.query_data(
+            box_qaq_ids = list(transformed_by_box.keys())
+            self.logger.info(f"查询箱子信息: {len(box_qaq_ids)} 个")
+            boxes = self.supabase.query_in(
                 table="boxes",
-                filters={"qaq_id": box_qaq_id},
-                limit=1
+                column="qaq_id",
+                values=box_qaq_ids,
+                columns="id,qaq_id,name",
+                batch_size=batch_size
             )
-            
-            if not box_result:
-                self.logger.error(f"未找到 qaq_id={box_qaq_id} 的箱子")
-                stats["failed"] = 1
-                return stats
-            
-            box = box_result[0]
-            box_name = box.get("name", "")
-            
-            # 检查名字是否包含"武器箱"或"收藏品"
-            if "武器箱" not in box_name and "收藏品" not in box_name:
-                self.logger.warning(f"箱子 qaq_id={box_qaq_id} 名字不包含'武器箱'或'收藏品'，跳过: {box_name}")
-                stats["failed"] = 1
-                return stats
-            
-            box_id = box["id"]
-            self.logger.info(f"找到箱子: {box_name} (id={box_id})")
         except Exception as e:
             self.logger.error(f"查询箱子失败: {e}")
-            stats["failed"] = 1
+            stats["failed"] = len(transformed_by_box)
             return stats
         
-        # 2. 批量保存枪皮（使用 upsert，避免唯一约束冲突）
-        gun_skins_list = transformed_data.get("gun_skins", [])
-        total_gun_skins = len(gun_skins_list)
-        if total_gun_skins > 0:
-            self.logger.info(f"开始批量保存 {total_gun_skins} 个枪皮...")
-            try:
-                # 使用 upsert，如果 qaq_id 已存在则更新，不存在则插入
-                result = self.supabase.client.table("gun_skins").upsert(
-                    gun_skins_list,
-                    on_conflict="qaq_id"
-                ).execute()
-                
-                if result.data:
-                    stats["gun_skins"] = len(result.data)
-                    self.logger.info(f"成功保存 {stats['gun_skins']} 个枪皮（插入或更新）")
-                    
-                    # 构建 qaq_id 到 id 的映射
-                    qaq_id_to_id = {item["qaq_id"]: item["id"] for item in result.data}
-                    
-                    # 批量插入关系（使用 upsert 避免重复）
-                    relations = [
-                        {"box_id": box_id, "gun_skin_id": qaq_id_to_id[gun_skin["qaq_id"]]}
-                        for gun_skin in gun_skins_list
-                        if gun_skin["qaq_id"] in qaq_id_to_id
-                    ]
-                    
-                    if relations:
-                        relation_result = self.supabase.client.table("box_gun_skin_relations").upsert(
-                            relations,
-                            on_conflict="box_id,gun_skin_id"
-                        ).execute()
-                        stats["gun_skin_relations"] = len(relation_result.data) if relation_result.data else 0
-                        self.logger.info(f"成功保存 {stats['gun_skin_relations']} 个枪皮关系")
-                else:
-                    self.logger.warning("枪皮 upsert 未返回数据")
-                    stats["failed"] = total_gun_skins
-                    
-            except Exception as e:
-                self.logger.error(f"批量保存枪皮失败: {e}")
-                stats["failed"] = total_gun_skins
-        
-        # 3. 批量保存刀/手套（使用 upsert，避免唯一约束冲突）
-        knife_gloves_list = transformed_data.get("knife_gloves", [])
-        total_knife_gloves = len(knife_gloves_list)
-        if total_knife_gloves > 0:
-            self.logger.info(f"开始批量保存 {total_knife_gloves} 个刀/手套...")
-            try:
-                # 使用 upsert，如果 qaq_id 已存在则更新，不存在则插入
-                result = self.supabase.client.table("knife_gloves").upsert(
-                    knife_gloves_list,
-                    on_conflict="qaq_id"
-                ).execute()
-                
-                if result.data:
-                    stats["knife_gloves"] = len(result.data)
-                    self.logger.info(f"成功保存 {stats['knife_gloves']} 个刀/手套（插入或更新）")
-                    
-                    # 构建 qaq_id 到 id 的映射
-                    qaq_id_to_id = {item["qaq_id"]: item["id"] for item in result.data}
-                    
-                    # 批量插入关系（使用 upsert 避免重复）
-                    relations = [
-                        {"box_id": box_id, "knife_glove_id": qaq_id_to_id[knife_glove["qaq_id"]]}
-                        for knife_glove in knife_gloves_list
-                        if knife_glove["qaq_id"] in qaq_id_to_id
-                    ]
-                    
-                    if relations:
-                        relation_result = self.supabase.client.table("box_knife_glove_relations").upsert(
-                            relations,
-                            on_conflict="box_id,knife_glove_id"
-                        ).execute()
-                        stats["knife_glove_relations"] = len(relation_result.data) if relation_result.data else 0
-                        self.logger.info(f"成功保存 {stats['knife_glove_relations']} 个刀/手套关系")
-                else:
-                    self.logger.warning("刀/手套 upsert 未返回数据")
-                    stats["failed"] = total_knife_gloves
-                    
-            except Exception as e:
-                self.logger.error(f"批量保存刀/手套失败: {e}")
-                stats["failed"] = total_knife_gloves
+        qaq_id_to_box_id = {}
+        for box in boxes:
+            box_name = box.get("name", "")
+            if "武器箱" not in box_name and "收藏品" not in box_name:
+                self.logger.warning(f"箱子 qaq_id={box['qaq_id']} 名字不包含'武器箱'或'收藏品'，跳过: {box_name}")
+                continue
+            qaq_id_to_box_id[box["qaq_id"]] = box["id"]
+        
+        for box_qaq_id in transformed_by_box:
+            if box_qaq_id not in qaq_id_to_box_id:
+                self.logger.error(f"未找到 qaq_id={box_qaq_id} 的有效箱子")
+                stats["failed"] += 1
+        
+        valid_boxes = {
+            qaq_id: data for qaq_id, data in transformed_by_box.items()
+            if qaq_id in qaq_id_to_box_id
+        }
+        
+        # 2. 批量保存枪皮及关系
+        self._save_items_with_relations(
+            valid_boxes, qaq_id_to_box_id, stats,
+            items_key="gun_skins",
+            relations_key="gun_skin_relations",
+            relation_table="box_gun_skin_relations",
+            relation_column="gun_skin_id",
+            label="枪皮"
+        )
+        
+        # 3. 批量保存刀/手套及关系
+        self._save_items_with_relations(
+            valid_boxes, qaq_id_to_box_id, stats,
+            items_key="knife_gloves",
+            relations_key="knife_glove_relations",
+            relation_table="box_knife_glove_relations",
+            relation_column="knife_glove_id",
+            label="刀/手套"
+        )
         
         return stats
     
-    def run(self, box_qaq_id: int) -> Dict[str, Any]:
+    def _save_items_with_relations(
+        self,
+        transformed_by_box: Dict[int, Dict[str, Any]],
+        qaq_id_to_box_id: Dict[int, int],
+        stats: Dict[str, int],
+        items_key: str,
+        relations_key: str,
+        relation_table: str,
+        relation_column: str,
+        label: str
+    ) -> None:
+        """
+        合并多个箱子的物品，批量 upsert 物品表和关系表
+        
+        Args:
+            transformed_by_box: box_qaq_id -> 转换后数据 的字典
+            qaq_id_to_box_id: 箱子 qaq_id -> 数据库 id 的映射
+            stats: 统计信息字典（原地更新）
+            items_key: 物品表名（同时是转换结果中的键）
+            relations_key: 统计中关系数量的键
+            relation_table: 关系表名
+            relation_column: 关系表中物品 id 字段名
+            label: 日志中的物品名称
+        """
+        # 合并并按 qaq_id 去重（同一物品可能出现在多个箱子中）
+        items_by_qaq_id = {}
+        for data in transformed_by_box.values():
+            for item in data.get(items_key, []):
+                items_by_qaq_id[item["qaq_id"]] = item
+        
+        items = list(items_by_qaq_id.values())
+        if not items:
+            return
+        
+        batch_size = self.config.crawler.batch_size
+        self.logger.info(f"开始批量保存 {len(items)} 个{label}...")
+        try:
+            # 使用 upsert，如果 qaq_id 已存在则更新，不存在则插入
+            saved = self.supabase.upsert_batch(items_key, items, on_conflict="qaq_id", batch_size=batch_size)
+            if not saved:
+                self.logger.warning(f"{label} upsert 未返回数据")
+                stats["failed"] += len(items)
+                return
+            
+            stats[items_key] = len(saved)
+            self.logger.info(f"成功保存 {stats[items_key]} 个{label}（插入或更新）")
+            
+            # 构建 qaq_id 到 id 的映射
+            qaq_id_to_id = {item["qaq_id"]: item["id"] for item in saved}
+            
+            # 批量插入关系（使用 upsert 避免重复）
+            relations = []
+            seen = set()
+            for box_qaq_id, data in transformed_by_box.items():
+                box_id = qaq_id_to_box_id[box_qaq_id]
+                for item in data.get(items_key, []):
+                    item_id = qaq_id_to_id.get(item["qaq_id"])
+                    if item_id is None or (box_id, item_id) in seen:
+                        continue
+                    seen.add((box_id, item_id))
+                    relations.append({"box_id": box_id, relation_column: item_id})
+            
+            if relations:
+                saved_relations = self.supabase.upsert_batch(
+                    relation_table,
+                    relations,
+                    on_conflict=f"box_id,{relation_column}",
+                    batch_size=batch_size
+                )
+                stats[relations_key] = len(saved_relations)
+                self.logger.info(f"成功保存 {stats[relations_key]} 个{label}关系")
+                
+        except Exception as e:
+            self.logger.error(f"批量保存{label}失败: {e}")
+            stats["failed"] += len(items)
+    
+    def run(self, box_qaq_id: Optional[int] = None) -> Dict[str, Any]:
         """
         运行爬虫（主流程）
         
+        Args:
+            box_qaq_id: 箱子的 qaq_id，None 表示批量处理所有符合条件的箱子（供 CrawlerManager 调用，
+                记录同步状态；增量模式下只处理有变化或还没有关系数据的箱子）
+            
+        Returns:
+            运行结果字典
+        """
+        if box_qaq_id is None:
+            self.begin_sync()
+            incremental = self.config.crawler.incremental
+            boxes = self.get_filtered_boxes(only_changed=incremental)
+            if incremental and not boxes:
+                self.logger.info("增量模式: 没有需要更新的箱子")
+                result = {"crawler_name": self.name, "box_count": 0, "success": True, "status": "unchanged",
+                          "data_count": 0, "saved_count": 0, "changed_count": 0, "skipped_count": 0, "error": None}
+            else:
+                result = self.run_many([box["qaq_id"] for box in boxes if box.get("qaq_id")])
+                self.finish_box_fingerprints(result["success_boxes"] + result["unchanged_boxes"])
+            # 只有所有选中的箱子都处理成功时 result["success"] 为 True，才会推进 last_sync_time
+            self.finish_sync(result)
+            return result
+        
+        self.retry_policy.budget.reset()
+        result = self._run_box(box_qaq_id)
+        self.finish_validators(result["success"])
+        self.finish_fingerprints(result["success"])
+        return result
+    
+    def _run_box(self, box_qaq_id: int) -> Dict[str, Any]:
+        """
+        单个箱子的获取、转换和保存流程
+        
         Args:
             box_qaq_id: 箱子的 qaq_id
             
@@ -455,6 +622,8 @@ class ContainerDetailCrawler(APICrawler):
             "success": False,
             "data_count": 0,
             "saved_count": 0,
+            "changed_count": 0,
+            "skipped_count": 0,
             "error": None
         }
         
@@ -465,6 +634,12 @@ class ContainerDetailCrawler(APICrawler):
                 result["error"] = "未能获取数据"
                 return result
             
+            if raw_data is NOT_MODIFIED or self.is_unchanged(raw_data, box_qaq_id):
+                result["success"] = True
+                result["status"] = "unchanged"
+                result["skipped_count"] = 1
+                return result
+            
             # 2. 转换数据
             self.logger.info(f"开始转换数据，原始数据项数: {len(raw_data)}")
             transformed_data = self.transform_data(raw_data, box_qaq_id)
@@ -492,10 +667,15 @@ class ContainerDetailCrawler(APICrawler):
                 self.logger.info(f"数据库保存完成: 新增枪皮 {db_stats['gun_skins']} 个, 新增刀/手套 {db_stats['knife_gloves']} 个, "
                                f"关系 {db_stats['gun_skin_relations'] + db_stats['knife_glove_relations']} 个, "
                                f"失败 {db_stats['failed']} 个")
+                if db_stats["failed"]:
+                    result["error"] = f"保存失败 {db_stats['failed']} 条"
+                    return result
             elif self.config.crawler.save_to_db and not self.supabase:
                 self.logger.warning("数据库保存已启用但 Supabase 未初始化")
             
             result["success"] = True
+            result["status"] = "changed"
+            result["changed_count"] = 1
             self.logger.info(f"爬虫运行完成: {self.name}, 获取 {result['data_count']} 条数据")
             
         except Exception as e:
@@ -504,3 +684,308 @@ class ContainerDetailCrawler(APICrawler):
         
         return result
 
+    
+    def run_many(
+        self,
+        box_qaq_ids: List[int],
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        批量运行爬虫：并发获取多个箱子的详情，合并后批量保存
+        
+        Args:
+            box_qaq_ids: 箱子 qaq_id 列表
+            workers: 并发获取的线程数，默认使用 max_concurrency
+            
+        Returns:
+            汇总的运行结果字典：success_boxes 为已保存的箱子，unchanged_boxes 为未变化的箱子，
+            failed_boxes 为获取或保存失败的箱子及原因；只有没有失败的箱子时 success 为 True
+        """
+        workers = workers or self.config.crawler.max_concurrency
+        box_qaq_ids = list(dict.fromkeys(box_qaq_ids))  # 去重并保持顺序
+        self.logger.info(f"开始批量获取箱子详情: {len(box_qaq_ids)} 个箱子, {workers} 个线程")
+        self.retry_policy.budget.reset()
+        
+        result = {
+            "crawler_name": self.name,
+            "box_count": len(box_qaq_ids),
+            "success_boxes": [],
+            "unchanged_boxes": [],
+            "failed_boxes": {},
+            "success": False,
+            "data_count": 0,
+            "saved_count": 0,
+            "changed_count": 0,
+            "skipped_count": 0,
+            "error": None
+        }
+        
+        transformed_by_box = {}
+        
+        # 1. 并发获取并转换数据
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._fetch_and_transform, box_qaq_id): box_qaq_id
+                for box_qaq_id in box_qaq_ids
+            }
+            for future in as_completed(futures):
+                box_qaq_id = futures[future]
+                try:
+                    transformed_data, error = future.result()
+                except Exception as e:
+                    transformed_data, error = None, str(e)
+                
+                if error:
+                    result["failed_boxes"][box_qaq_id] = error
+                    self.logger.warning(f"箱子 {box_qaq_id} 处理失败: {error}")
+                    continue
+                
+                if transformed_data is NOT_MODIFIED:
+                    result["unchanged_boxes"].append(box_qaq_id)
+                    continue
+                
+                transformed_by_box[box_qaq_id] = transformed_data
+        
+        gun_skins_count = sum(len(d.get("gun_skins", [])) for d in transformed_by_box.values())
+        knife_gloves_count = sum(len(d.get("knife_gloves", [])) for d in transformed_by_box.values())
+        result["data_count"] = gun_skins_count + knife_gloves_count
+        result["skipped_count"] = len(result["unchanged_boxes"])
+        self.logger.info(f"获取完成: 成功 {len(transformed_by_box)} 个箱子, 未变化 {len(result['unchanged_boxes'])} 个, "
+                         f"失败 {len(result['failed_boxes'])} 个, "
+                         f"枪皮 {gun_skins_count} 个, 刀/手套 {knife_gloves_count} 个")
+        
+        if not transformed_by_box:
+            if result["failed_boxes"] and not result["unchanged_boxes"]:
+                result["error"] = "所有箱子均未获取到有效数据"
+            self._finish_many(result)
+            self.finish_validators(False)
+            self.finish_fingerprints(False)
+            return result
+        
+        try:
+            # 2. 保存到文件（如果启用）
+            if self.config.crawler.save_to_file:
+                self.save_to_file(
+                    [{"box_qaq_id": box_qaq_id, **data} for box_qaq_id, data in transformed_by_box.items()],
+                    f"container_detail_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                )
+            
+            # 3. 批量保存到数据库（如果启用）
+            if self.config.crawler.save_to_db and self.supabase:
+                self.logger.info("开始批量保存数据到数据库...")
+                db_stats = self.save_many_to_database(transformed_by_box)
+                result["saved_count"] = db_stats["gun_skins"] + db_stats["knife_gloves"]
+                result["db_stats"] = db_stats
+                self.logger.info(f"数据库保存完成: 枪皮 {db_stats['gun_skins']} 个, 刀/手套 {db_stats['knife_gloves']} 个, "
+                                 f"关系 {db_stats['gun_skin_relations'] + db_stats['knife_glove_relations']} 个, "
+                                 f"失败 {db_stats['failed']} 个")
+            elif self.config.crawler.save_to_db and not self.supabase:
+                self.logger.warning("数据库保存已启用但 Supabase 未初始化")
+            
+            db_failed = result.get("db_stats", {}).get("failed", 0)
+            if db_failed:
+                # 批量保存有失败时无法区分具体箱子，本批已获取的箱子都视为失败（upsert 可重复执行）
+                for box_qaq_id in transformed_by_box:
+                    result["failed_boxes"][box_qaq_id] = f"批量保存失败 {db_failed} 条"
+            else:
+                result["success_boxes"] = list(transformed_by_box.keys())
+                result["changed_count"] = len(transformed_by_box)
+                # 只为已成功保存的箱子提交校验器和数据指纹
+                if self.validator_cache:
+                    self.finish_validators(True, [self._validator_key(box_qaq_id) for box_qaq_id in transformed_by_box])
+                self.finish_fingerprints(True, transformed_by_box.keys())
+            
+        except Exception as e:
+            for box_qaq_id in transformed_by_box:
+                result["failed_boxes"][box_qaq_id] = str(e)
+            self.logger.error(f"批量运行失败: {self.name}, 错误: {e}", exc_info=True)
+        
+        self._finish_many(result)
+        self.finish_validators(False)
+        self.finish_fingerprints(False)
+        return result
+    
+    def _finish_many(self, result: Dict[str, Any]) -> None:
+        """根据失败的箱子设置批量运行的 success 和 error"""
+        failed = len(result["failed_boxes"])
+        result["success"] = failed == 0
+        if failed and not result["error"]:
+            result["error"] = f"{failed}/{result['box_count']} 个箱子处理失败"
+    
+    def get_job_queue(self) -> JobQueue:
+        """
+        获取箱子详情任务队列（按配置创建，队列名为爬虫名称）
+        
+        Returns:
+            任务队列
+        """
+        return JobQueue.from_config(self.config.crawler, name=self.name)
+    
+    def enqueue_boxes(self, queue: JobQueue, box_qaq_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        把箱子详情任务放入队列（每个箱子一个任务，等待或处理中的箱子不会重复入队）
+        
+        入队不代表箱子已处理，因此不更新 data_sources 中的同步状态；所有符合条件的箱子入队时，
+        任务附带箱子数据指纹，由工作进程在确认任务后提交，之后的增量入队不再包括这些箱子。
+        
+        Args:
+            queue: 任务队列
+            box_qaq_ids: 箱子 qaq_id 列表，None 表示所有符合条件的箱子（增量模式下只包括有变化的箱子）
+            
+        Returns:
+            实际入队的任务数
+        """
+        if box_qaq_ids is None:
+            boxes = self.get_filtered_boxes(only_changed=self.config.crawler.incremental)
+            # 待提交的指纹由工作进程在确认任务后提交，这里丢弃
+            self.finish_box_fingerprints(())
+            payloads = {
+                box["qaq_id"]: {"box_qaq_id": box["qaq_id"], "box_digest": self._box_digest(box)}
+                for box in boxes if box.get("qaq_id")
+            }
+        else:
+            payloads = {box_qaq_id: {"box_qaq_id": box_qaq_id} for box_qaq_id in box_qaq_ids}
+        
+        added = queue.enqueue_many(
+            (payload, f"{self.name}:{box_qaq_id}") for box_qaq_id, payload in payloads.items()
+        )
+        self.logger.info(f"箱子详情任务入队: {added} 个（跳过已在队列中的 {len(payloads) - added} 个）")
+        return added
+    
+    def run_worker(
+        self,
+        queue: JobQueue,
+        batch_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        poll_interval: float = 5.0,
+        retry_delay: float = 30.0,
+        stop_event: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
+        """
+        作为工作进程从队列领取箱子任务并处理
+        
+        每次领取 batch_size 个任务交给 run_many() 并发获取、批量保存；
+        成功（含未变化）的任务确认完成，失败的放回队列由其他工作进程重试。
+        任意多个工作进程可以同时处理同一个队列（默认的 SQLite 队列只支持同一台机器上的进程）。
+        
+        Args:
+            queue: 任务队列
+            batch_size: 每次领取的任务数，默认使用 max_concurrency
+            idle_timeout: 队列持续为空多少秒后退出，None 表示一直运行
+            poll_interval: 队列为空时的轮询间隔（秒）
+            retry_delay: 失败任务放回后的等待时间（秒），按已领取次数线性增加
+            stop_event: 设置后在当前批次处理完后退出
+            
+        Returns:
+            汇总结果（处理批次数、确认 / 放回的任务数）
+        """
+        batch_size = batch_size or self.config.crawler.max_concurrency
+        stop_event = stop_event or threading.Event()
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        summary = {"crawler_name": self.name, "worker": worker_id, "batches": 0, "acked": 0, "nacked": 0}
+        self.logger.info(f"工作进程 {worker_id} 开始处理箱子详情任务（每批 {batch_size} 个）")
+        
+        idle_since = time.monotonic()
+        while not stop_event.is_set():
+            jobs = queue.lease(batch_size)
+            if not jobs:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    self.logger.info(f"队列已空闲 {idle_timeout}s，工作进程退出")
+                    break
+                stop_event.wait(poll_interval)
+                continue
+            
+            acked, nacked = self._process_jobs(queue, jobs, retry_delay)
+            summary["batches"] += 1
+            summary["acked"] += acked
+            summary["nacked"] += nacked
+            idle_since = time.monotonic()
+        
+        self.logger.info(f"工作进程 {worker_id} 结束: 确认 {summary['acked']} 个任务，放回 {summary['nacked']} 个")
+        return summary
+    
+    def _process_jobs(self, queue: JobQueue, jobs: List[Job], retry_delay: float = 0.0) -> Tuple[int, int]:
+        """
+        处理一批箱子任务并确认 / 放回
+        
+        Args:
+            queue: 任务队列
+            jobs: 已领取的任务
+            retry_delay: 失败任务放回后的等待时间（秒），按已领取次数线性增加
+            
+        Returns:
+            (确认数, 放回数)
+        """
+        jobs_by_box: Dict[int, List[Job]] = {}
+        for job in jobs:
+            jobs_by_box.setdefault(job.payload["box_qaq_id"], []).append(job)
+        
+        try:
+            result = self.run_many(list(jobs_by_box))
+        except Exception as e:
+            self.logger.error(f"处理箱子任务失败: {e}", exc_info=True)
+            result = {"success": False, "error": str(e), "failed_boxes": {}}
+        
+        done = set(result.get("unchanged_boxes", [])) | set(result.get("success_boxes", []))
+        
+        acked = nacked = 0
+        acked_digests: Dict[int, str] = {}
+        for box_qaq_id, box_jobs in jobs_by_box.items():
+            for job in box_jobs:
+                if box_qaq_id in done:
+                    ok = queue.ack(job)
+                    acked += ok
+                    if ok and job.payload.get("box_digest"):
+                        acked_digests[box_qaq_id] = job.payload["box_digest"]
+                else:
+                    error = result.get("failed_boxes", {}).get(box_qaq_id) or result.get("error") or "保存失败"
+                    ok = queue.nack(job, error, delay=retry_delay * job.attempts)
+                    nacked += ok
+                if not ok:
+                    self.logger.warning(f"箱子 {box_qaq_id} 的任务租约已失效（处理时间超过可见性超时？）")
+        
+        if acked_digests:
+            self._commit_box_digests(acked_digests)
+        return acked, nacked
+    
+    def _commit_box_digests(self, digests: Dict[int, str]) -> None:
+        """
+        提交工作进程已确认的箱子的数据指纹（指纹在入队时计算，随任务传递）
+        
+        Args:
+            digests: {箱子 qaq_id: 箱子数据指纹}
+        """
+        store = self._get_box_fingerprint_store()
+        namespace = self._box_fingerprint_namespace
+        for box_qaq_id, digest in digests.items():
+            store.check(namespace, str(box_qaq_id), digest)
+        store.commit(namespace, [str(box_qaq_id) for box_qaq_id in digests])
+    
+    def _validator_key(self, box_qaq_id: int) -> str:
+        """箱子详情请求的校验器缓存键"""
+        return self.validator_cache.make_key("GET", self.api_url, {"id": box_qaq_id})
+    
+    def _fetch_and_transform(self, box_qaq_id: int) -> Tuple[Any, Optional[str]]:
+        """
+        获取并转换单个箱子的数据（在工作线程中执行）
+        
+        Args:
+            box_qaq_id: 箱子的 qaq_id
+            
+        Returns:
+            (转换后的数据, 错误信息)，成功时错误信息为 None；
+            数据未变化（304 或数据指纹相同）时转换后的数据为 NOT_MODIFIED
+        """
+        raw_data = self.fetch_data(box_qaq_id)
+        if not raw_data:
+            return None, "未能获取数据"
+        
+        if raw_data is NOT_MODIFIED or self.is_unchanged(raw_data, box_qaq_id):
+            return NOT_MODIFIED, None
+        
+        transformed_data = self.transform_data(raw_data, box_qaq_id)
+        total_items = len(transformed_data.get("gun_skins", [])) + len(transformed_data.get("knife_gloves", []))
+        if total_items == 0:
+            return None, "转换后无有效数据"
+        
+        return transformed_data, None
@@ -2,13 +2,33 @@
 数据库模型定义
 用于类型提示和数据验证
 """
-from typing import Optional
-from datetime import datetime
+from typing import Optional, Any
+from datetime import datetime, timezone
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from decimal import Decimal
 
 
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    解析数据库返回的时间戳（TIMESTAMPTZ 的 ISO 字符串）
+    
+    Args:
+        value: ISO 格式字符串或 datetime
+        
+    Returns:
+        带时区的 datetime（不带时区的按 UTC 处理），无法解析时返回 None
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 # ============================================
 # 枚举类型
 # ============================================
@@ -466,3 +486,14 @@ class DataSource:
             data["last_sync_time"] = data["last_sync_time"].isoformat()
         return data
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "DataSource":
+        """从数据库查询结果创建（时间字段解析为 datetime）"""
+        names = {f.name for f in fields(cls)}
+        source = cls(**{key: value for key, value in data.items() if key in names})
+        source.last_sync_time = parse_timestamp(source.last_sync_time)
+        source.created_at = parse_timestamp(source.created_at)
+        source.updated_at = parse_timestamp(source.updated_at)
+        source.total_synced = source.total_synced or 0
+        return source
+
@@ -2,8 +2,12 @@
 Supabase 客户端配置和工具函数
 """
 import os
-from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+
+from crawler.database.models import DataSource
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 class SupabaseManager:
@@ -25,7 +29,9 @@ class SupabaseManager:
                 "Supabase URL 和 Key 必须提供，可以通过参数或环境变量 SUPABASE_URL 和 SUPABASE_KEY 设置"
             )
         
-        self.client: Client = create_client(self.url, self.key)
+        # supabase 导入较慢，只在真正创建客户端时导入
+        from supabase import create_client
+        self.client: "Client" = create_client(self.url, self.key)
     
     def insert_data(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -55,6 +61,77 @@ class SupabaseManager:
         result = self.client.table(table).insert(data).execute()
         return result.data if result.data else []
     
+    def upsert_batch(
+        self,
+        table: str,
+        data: List[Dict[str, Any]],
+        on_conflict: str,
+        batch_size: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        分批 upsert 数据（每批一次请求）
+        
+        Args:
+            table: 表名
+            data: 要 upsert 的数据列表
+            on_conflict: 冲突判断字段，多个字段用逗号分隔
+            batch_size: 每批数据条数
+            
+        Returns:
+            upsert 后的数据列表
+        """
+        rows = []
+        for start in range(0, len(data), batch_size):
+            result = self.client.table(table).upsert(
+                data[start:start + batch_size],
+                on_conflict=on_conflict
+            ).execute()
+            if result.data:
+                rows.extend(result.data)
+        return rows
+    
+    def query_in(
+        self,
+        table: str,
+        column: str,
+        values: List[Any],
+        columns: str = "*",
+        batch_size: int = 200,
+        page_size: int = 1000,
+        order: str = "id"
+    ) -> List[Dict[str, Any]]:
+        """
+        按字段值列表批量查询（column IN values）
+        
+        每批的结果按 order 排序后分页读取，一批匹配的行数超过 PostgREST 的单次返回上限
+        （默认 1000 行）时不会被截断。
+        
+        Args:
+            table: 表名
+            column: 过滤字段
+            values: 字段值列表
+            columns: 返回的字段
+            batch_size: 每次查询的值个数（避免 URL 过长）
+            page_size: 每页行数（不能超过服务端的 max-rows）
+            order: 分页排序字段（应唯一，保证分页稳定）
+            
+        Returns:
+            查询结果列表
+        """
+        rows = []
+        for start in range(0, len(values), batch_size):
+            offset = 0
+            while True:
+                result = self.client.table(table).select(columns).in_(
+                    column, values[start:start + batch_size]
+                ).order(order).range(offset, offset + page_size - 1).execute()
+                page = result.data or []
+                rows.extend(page)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        return rows
+    
     def query_data(
         self, 
         table: str, 
@@ -109,6 +186,36 @@ class SupabaseManager:
         result = query.execute()
         return result.data if result.data else []
     
+    def get_data_source(self, source_name: str) -> Optional[DataSource]:
+        """
+        查询数据源的同步状态
+        
+        Args:
+            source_name: 数据源名称
+            
+        Returns:
+            数据源记录，不存在时返回 None
+        """
+        result = self.client.table("data_sources").select("*").eq("source_name", source_name).limit(1).execute()
+        return DataSource.from_dict(result.data[0]) if result.data else None
+    
+    def upsert_data_source(self, source_name: str, **fields: Any) -> Optional[DataSource]:
+        """
+        写入数据源的同步状态（只更新传入的字段，记录不存在时创建）
+        
+        Args:
+            source_name: 数据源名称
+            **fields: 要写入的字段（sync_status、last_sync_time、error_message 等）
+            
+        Returns:
+            写入后的数据源记录
+        """
+        result = self.client.table("data_sources").upsert(
+            {"source_name": source_name, **fields},
+            on_conflict="source_name"
+        ).execute()
+        return DataSource.from_dict(result.data[0]) if result.data else None
+    
     def delete_data(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         删除数据
@@ -2,7 +2,6 @@
 箱子详情爬虫使用示例
 """
 import sys
-import time
 from crawler.config.config import Config
 from crawler.crawlers.container_detail_crawler import ContainerDetailCrawler
 
@@ -47,31 +46,30 @@ def main():
             print("未找到符合条件的箱子")
             sys.exit(0)
         
-        print(f"找到 {len(boxes)} 个箱子，开始处理...\n")
+        print(f"找到 {len(boxes)} 个箱子，开始批量处理...\n")
         
-        success_count = 0
-        failed_count = 0
+        # 并发数由 max_concurrency 决定；未设置 rate_limit 时限流速率为 max_concurrency / delay 请求/秒，
+        # 调大并发时限流会随之放宽（上游限制总速率时请显式设置 rate_limit）
+        result = crawler.run_many([box["qaq_id"] for box in boxes])
         
-        for i, box in enumerate(boxes):
-            box_qaq_id = box["qaq_id"]
-            box_name = box.get("name", "Unknown")
-            print(f"处理箱子 [{i+1}/{len(boxes)}]: {box_name} (qaq_id: {box_qaq_id})")
-            
-            result = crawler.run(box_qaq_id)
-            
-            if result["success"]:
-                success_count += 1
-                print(f"  ✅ 成功: {result['data_count']} 条数据")
-            else:
-                failed_count += 1
-                print(f"  ❌ 失败: {result.get('error', 'Unknown error')}")
-            print()
-            
-            # 每个请求间隔 1 秒（最后一个不需要等待）
-            if i < len(boxes) - 1:
-                time.sleep(1)
+        failed_boxes = result["failed_boxes"]
+        box_names = {box["qaq_id"]: box.get("name", "Unknown") for box in boxes}
+        for box_qaq_id, error in failed_boxes.items():
+            print(f"  ❌ {box_names.get(box_qaq_id, 'Unknown')} (qaq_id: {box_qaq_id}): {error}")
         
-        print(f"\n处理完成: 成功 {success_count}/{len(boxes)}, 失败 {failed_count}/{len(boxes)}")
+        success_count = len(boxes) - len(failed_boxes)
+        print(f"\n处理完成: 成功 {success_count}/{len(boxes)}, 失败 {len(failed_boxes)}/{len(boxes)}")
+        print(f"   有变化: {result['changed_count']} 个箱子, 未变化跳过: {result['skipped_count']} 个箱子")
+        print(f"   数据条数: {result['data_count']}")
+        print(f"   保存条数: {result['saved_count']}")
+        if "db_stats" in result:
+            stats = result["db_stats"]
+            print(f"   枪皮: {stats['gun_skins']} 条")
+            print(f"   刀/手套: {stats['knife_gloves']} 条")
+            print(f"   关系: {stats['gun_skin_relations'] + stats['knife_glove_relations']} 条")
+        if not result["success"]:
+            print(f"\n❌ 批量处理失败: {result.get('error', 'Unknown error')}")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+箱子详情多进程处理示例
+一个进程把箱子任务放入队列，同一台机器上任意多个工作进程领取并处理
+
+用法:
+    python3 -m crawler.examples.container_detail_worker enqueue [box_qaq_id ...]
+    python3 -m crawler.examples.container_detail_worker work [--idle-timeout 秒]
+    python3 -m crawler.examples.container_detail_worker stats
+"""
+import argparse
+import signal
+import sys
+import threading
+
+from crawler.config.config import Config
+from crawler.crawlers.container_detail_crawler import ContainerDetailCrawler
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="箱子详情多进程处理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="把箱子任务放入队列")
+    enqueue_parser.add_argument("box_qaq_ids", nargs="*", type=int, help="箱子 qaq_id（默认为所有符合条件的箱子）")
+
+    work_parser = subparsers.add_parser("work", help="作为工作进程处理队列中的任务")
+    work_parser.add_argument("--batch-size", type=int, default=None, help="每次领取的任务数（默认 max_concurrency）")
+    work_parser.add_argument("--idle-timeout", type=float, default=None, help="队列空闲多少秒后退出（默认一直运行）")
+
+    subparsers.add_parser("stats", help="查看队列中各状态的任务数")
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    crawler = ContainerDetailCrawler(config, name="container_detail")
+    queue = crawler.get_job_queue()
+
+    try:
+        if args.command == "enqueue":
+            added = crawler.enqueue_boxes(queue, args.box_qaq_ids or None)
+            print(f"已入队 {added} 个箱子任务")
+
+        elif args.command == "work":
+            # Ctrl+C / SIGTERM：处理完当前批次后退出，未处理的任务留在队列中
+            stop_event = threading.Event()
+            signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+            summary = crawler.run_worker(
+                queue,
+                batch_size=args.batch_size,
+                idle_timeout=args.idle_timeout,
+                stop_event=stop_event
+            )
+            print(f"\n处理完成: {summary['batches']} 批, 确认 {summary['acked']} 个任务, 放回 {summary['nacked']} 个")
+
+        print(f"队列状态: {queue.stats()}")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())